@@ -0,0 +1,70 @@
+"""
+Shared HTTP session for the agents' Supabase REST calls.
+
+One pooled requests.Session per process instead of a fresh TCP/TLS handshake
+for every module-level requests.get:
+- Keep-alive connection pool (HTTP_POOL_SIZE connections per host)
+- gzip/deflate responses
+- Default (connect, read) timeout applied to any call that doesn't set one
+- Idempotent GETs retried on connection errors and 502/503/504
+"""
+
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (
+    float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05")),
+    float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+)
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+
+class PooledSession(requests.Session):
+    """requests.Session with a default timeout."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+_session: Optional[PooledSession] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PooledSession:
+    """Process-wide pooled session, created on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = PooledSession()
+                retry = Retry(
+                    total=2,
+                    backoff_factor=0.3,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset({"GET", "HEAD"})
+                )
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+                _session = session
+    return _session
+
+
+def close_session() -> None:
+    """Close pooled connections (e.g. on shutdown)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
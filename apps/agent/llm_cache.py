@@ -0,0 +1,197 @@
+"""
+Response cache for the agent's LLM calls.
+
+Classification, parameter extraction and market filtering are asked the same
+handful of questions over and over ("recommend one", "any crypto bets?"), so
+their answers are cached by normalized query:
+- Memory tier: LRU with a TTL, shared by every call site
+- Disk tier (optional): SQLite file so answers survive restarts
+
+Keys are (namespace, normalized query, version). Call sites whose answer
+depends on the market catalog pass the catalog version, so a catalog change
+invalidates them automatically; pure classifications pass no version.
+Values must be JSON-serialisable.
+
+Coroutines use the *_async methods, which move disk-tier reads and writes to a
+worker thread so SQLite I/O never runs on the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+_NON_WORD = re.compile(r"[^a-z0-9$%]+")
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace ("Recommend one!" == "recommend  one")."""
+    return " ".join(_NON_WORD.sub(" ", (text or "").lower()).split())
+
+
+def fingerprint(values) -> str:
+    """Short stable hash of an iterable (e.g. the candidate market ids shown to the LLM)."""
+    return hashlib.sha1(",".join(map(str, sorted(values))).encode()).hexdigest()[:16]
+
+
+class LLMResponseCache:
+    """Thread-safe TTL LRU with an optional SQLite tier."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, disk_path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Entries kept in memory before evicting the least recently used
+            ttl: Seconds an answer stays valid (both tiers)
+            disk_path: SQLite file for the persistent tier (None keeps it memory-only)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if disk_path:
+            try:
+                self._db = sqlite3.connect(disk_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, expires_at REAL, value TEXT)"
+                )
+                self._db.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ LLM cache disk tier disabled ({disk_path}): {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(namespace: str, query: str, version: Any = None) -> str:
+        return f"{namespace}|{version if version is not None else '-'}|{normalize_query(query)}"
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, namespace: str, query: str, version: Any = None) -> Tuple[bool, Any]:
+        """
+        Look up a cached answer.
+
+        Returns:
+            (hit, value); value is None on a miss
+        """
+        key = self.make_key(namespace, query, version)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT expires_at, value FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"⚠️ LLM cache disk read failed: {e}")
+                    row = None
+                if row is not None and row[0] > now:
+                    value = json.loads(row[1])
+                    self._remember(key, row[0], value)
+                    self.hits += 1
+                    return True, value
+
+            self.misses += 1
+            return False, None
+
+    def set(self, namespace: str, query: str, value: Any, version: Any = None) -> None:
+        """Store an answer in memory (and on disk when enabled)."""
+        key = self.make_key(namespace, query, version)
+        expires_at = time.time() + self.ttl
+
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                        (key, expires_at, json.dumps(value))
+                    )
+                    self._db.commit()
+                except (sqlite3.Error, TypeError, ValueError) as e:
+                    print(f"⚠️ LLM cache disk write failed: {e}")
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        query: str,
+        compute: Callable[[], Any],
+        version: Any = None
+    ) -> Any:
+        """
+        Return the cached answer or compute and cache it.
+
+        compute() should raise on failure so errors are never cached.
+        """
+        hit, value = self.get(namespace, query, version)
+        if hit:
+            return value
+        value = compute()
+        self.set(namespace, query, value, version)
+        return value
+
+    async def get_or_compute_async(
+        self,
+        namespace: str,
+        query: str,
+        compute: Callable[[], Awaitable[Any]],
+        version: Any = None
+    ) -> Any:
+        """get_or_compute() for coroutine producers (e.g. AsyncOpenAI calls)."""
+        hit, value = await self.get_async(namespace, query, version)
+        if hit:
+            return value
+        value = await compute()
+        await self.set_async(namespace, query, value, version)
+        return value
+
+    async def get_async(self, namespace: str, query: str, version: Any = None) -> Tuple[bool, Any]:
+        """get() for coroutines: memory-only caches answer inline, the disk tier is read in a worker thread."""
+        if self._db is None:
+            return self.get(namespace, query, version)
+        return await asyncio.to_thread(self.get, namespace, query, version)
+
+    async def set_async(self, namespace: str, query: str, value: Any, version: Any = None) -> None:
+        """set() for coroutines: the disk-tier write runs in a worker thread."""
+        if self._db is None:
+            self.set(namespace, query, value, version)
+        else:
+            await asyncio.to_thread(self.set, namespace, query, value, version)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
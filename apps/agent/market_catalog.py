@@ -0,0 +1,204 @@
+"""
+In-process market catalog for the PolyBet agents.
+
+Keeps the `markets` and `external_markets` tables in memory so a chat message
+no longer pays for two full-table downloads:
+- Fresh (younger than ttl): served straight from memory
+- Stale (older than ttl, younger than max_stale): served from memory while a
+  background thread refreshes (stale-while-revalidate)
+- Expired or empty: refreshed inline before answering
+
+Both tables are fetched concurrently, and async callers (the uAgents handlers)
+use get_markets_async() so an inline refresh never blocks the event loop.
+
+Refreshes are incremental: neither table has an `updated_at` column and
+PostgREST does not emit ETags, so new rows are fetched with `id=gt.<highest id
+seen>`. A full reload every full_refresh_interval picks up edits and deletes.
+
+Fetchers stream pages: incremental pages and the pages of a cold load are
+published as they arrive (so the first answers don't wait for the whole
+table), while a full reload of a warm table is swapped in only once complete.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# fetch(since_id) -> pages of rows with id > since_id (all rows when since_id is None),
+# ordered by id; raises on errors
+Fetcher = Callable[[Optional[int]], Iterable[List[Dict[str, Any]]]]
+
+
+class CatalogTable:
+    """Rows of one table keyed by id, plus the high-water mark for incremental fetches."""
+
+    def __init__(self, name: str, fetch: Fetcher):
+        self.name = name
+        self.fetch = fetch
+        self.rows: Dict[Any, Dict[str, Any]] = {}
+        self.max_id: Optional[int] = None
+        self.last_full_refresh = 0.0
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return list(self.rows.values())
+
+    def _publish(self, rows: Dict[Any, Dict[str, Any]]) -> None:
+        # Swap in a new dict so concurrent snapshots never see a half-applied update
+        self.rows = rows
+        numeric_ids = [row_id for row_id in rows if isinstance(row_id, int)]
+        self.max_id = max(numeric_ids) if numeric_ids else None
+
+    def refresh(self, full: bool) -> bool:
+        """Fetch new (or all) rows; returns True if the table contents changed."""
+        full = full or self.max_id is None
+        pages = self.fetch(None if full else self.max_id)
+
+        if full:
+            # A failed reload raises before the swap, so it never wipes a warm table
+            stream = not self.rows
+            new_rows: Dict[Any, Dict[str, Any]] = {}
+            for page in pages:
+                new_rows.update((row.get("id"), row) for row in page)
+                if stream:
+                    self._publish(dict(new_rows))
+            if not new_rows and self.rows:
+                print(f"⚠️ Full refresh of {self.name} returned no rows, keeping {len(self.rows)} cached")
+                return False
+            changed = (stream and bool(new_rows)) or new_rows != self.rows
+            self._publish(new_rows)
+            self.last_full_refresh = time.time()
+            return changed
+
+        changed = False
+        for page in pages:
+            new_rows = dict(self.rows)
+            for row in page:
+                if new_rows.get(row.get("id")) != row:
+                    new_rows[row.get("id")] = row
+                    changed = True
+            self._publish(new_rows)
+        return changed
+
+
+class MarketCatalog:
+    """Cached internal + external markets with TTL and background refresh."""
+
+    def __init__(
+        self,
+        fetch_internal: Fetcher,
+        fetch_external: Fetcher,
+        ttl: float = 60.0,
+        max_stale: float = 900.0,
+        full_refresh_interval: float = 600.0
+    ):
+        """
+        Args:
+            fetch_internal: Fetcher for the markets table
+            fetch_external: Fetcher for the external_markets table
+            ttl: Seconds a refresh stays fresh
+            max_stale: Seconds stale data may still be served while revalidating
+            full_refresh_interval: Seconds between full reloads (catches edits/deletes)
+        """
+        self.tables = {
+            "internal": CatalogTable("markets", fetch_internal),
+            "external": CatalogTable("external_markets", fetch_external),
+        }
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.full_refresh_interval = full_refresh_interval
+        self.version = 0  # Bumped whenever the contents change
+        self.last_refresh = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._background_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def _age(self) -> float:
+        return time.time() - self.last_refresh
+
+    def refresh(self, full: Optional[bool] = None) -> bool:
+        """
+        Refresh both tables now (one refresh at a time).
+
+        Args:
+            full: Force a full (True) or incremental (False) refresh; by default a
+                table is fully reloaded once its full_refresh_interval has passed
+
+        Returns:
+            True if the catalog contents changed
+        """
+        def refresh_table(table: CatalogTable) -> bool:
+            table_full = full if full is not None else (
+                time.time() - table.last_full_refresh >= self.full_refresh_interval
+            )
+            try:
+                return table.refresh(table_full)
+            except Exception as e:
+                print(f"❌ Error refreshing {table.name}: {e}")
+                return False
+
+        with self._refresh_lock:
+            # Tables are independent, so fetch them side by side
+            with ThreadPoolExecutor(max_workers=len(self.tables)) as pool:
+                changed = any(list(pool.map(refresh_table, self.tables.values())))
+
+            with self._lock:
+                if changed:
+                    self.version += 1
+                self.last_refresh = time.time()
+            return changed
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_lock.locked():
+            return  # A refresh is already running
+        threading.Thread(target=self.refresh, daemon=True).start()
+
+    def get_markets(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Return (internal_markets, external_markets), refreshing as needed.
+
+        Returns:
+            Snapshots of both tables (safe to shuffle or filter)
+        """
+        age = self._age()
+        never_loaded = self.last_refresh == 0.0
+
+        if never_loaded and self._refresh_lock.locked() and any(t.rows for t in self.tables.values()):
+            pass  # First load is streaming in; answer from the pages received so far
+        elif never_loaded or age >= self.max_stale:
+            self.refresh()
+        elif age >= self.ttl:
+            self._refresh_in_background()
+
+        with self._lock:
+            return self.tables["internal"].snapshot(), self.tables["external"].snapshot()
+
+    async def get_markets_async(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """get_markets() for coroutines: an inline refresh runs in a worker thread."""
+        if self.last_refresh == 0.0 or self._age() >= self.max_stale:
+            return await asyncio.to_thread(self.get_markets)
+        return self.get_markets()
+
+    def get_table(self, market_type: str) -> Tuple[List[Dict[str, Any]], int]:
+        """Return (rows, version) of one table ("internal" or "external") without refreshing."""
+        with self._lock:
+            return self.tables[market_type].snapshot(), self.version
+
+    def start_background_refresh(self, interval: Optional[float] = None) -> None:
+        """Refresh every `interval` seconds (default: ttl) from a daemon thread."""
+        if self._background_thread and self._background_thread.is_alive():
+            return
+        interval = interval or self.ttl
+        self._stop_event.clear()
+
+        def loop():
+            while not self._stop_event.wait(interval):
+                self.refresh()
+
+        self._background_thread = threading.Thread(target=loop, daemon=True)
+        self._background_thread.start()
+
+    def stop_background_refresh(self) -> None:
+        self._stop_event.set()
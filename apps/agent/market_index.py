@@ -0,0 +1,210 @@
+"""
+Local BM25 retrieval over market questions.
+
+Shortlists the top-K markets for a query so the LLM filter only sees a small
+candidate set (or is skipped entirely for confident keyword matches). The
+index is a compact inverted file in NumPy arrays:
+- postings_docs / postings_weights: concatenated (doc, BM25 weight) per term
+- offsets: start of each term's postings
+Scoring a query is one np.add.at per query term, so cost scales with the
+postings touched rather than the catalog size.
+"""
+
+import asyncio
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Function words plus phrasing that appears in almost every recommendation request
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his
+how i if in into is it its itself just me more most my no nor not now of off on once only or other our ours out
+over own same she should so some such than that the their them then there these they this those through to too
+under until up very was we were what when where which while who whom why will with would you your yours
+bet bets betting market markets recommend recommendation recommendations suggest suggestion show give find
+provide want looking please one any something anything prediction predictions odds tell know
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with stopwords removed."""
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+def internal_market_text(market: Dict[str, Any]) -> str:
+    options = market.get("options") or []
+    return f"{market.get('common_question', '')} {' '.join(map(str, options))}"
+
+
+def external_market_text(market: Dict[str, Any]) -> str:
+    marketplace = market.get("marketplaces") or {}
+    return f"{market.get('question', '')} {marketplace.get('name', '')}"
+
+
+class MarketIndex:
+    """BM25 index over a list of market dicts."""
+
+    def __init__(
+        self,
+        markets: Iterable[Dict[str, Any]],
+        text_fn: Callable[[Dict[str, Any]], str],
+        k1: float = 1.5,
+        b: float = 0.75
+    ):
+        """
+        Args:
+            markets: Market rows to index (must carry an 'id')
+            text_fn: Extracts the searchable text of a market
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalisation
+        """
+        self.markets = list(markets)
+        self.ids = [market.get("id") for market in self.markets]
+        self.vocabulary: Dict[str, int] = {}
+
+        doc_terms: List[Dict[int, int]] = []
+        for market in self.markets:
+            counts: Dict[int, int] = {}
+            for token in tokenize(text_fn(market)):
+                term_id = self.vocabulary.setdefault(token, len(self.vocabulary))
+                counts[term_id] = counts.get(term_id, 0) + 1
+            doc_terms.append(counts)
+
+        num_docs = len(self.markets)
+        doc_lengths = np.array([sum(counts.values()) for counts in doc_terms], dtype=np.float32)
+        avg_length = float(doc_lengths.mean()) if num_docs and doc_lengths.sum() > 0 else 1.0
+
+        # Gather postings per term
+        postings: List[List[Tuple[int, int]]] = [[] for _ in range(len(self.vocabulary))]
+        for doc_id, counts in enumerate(doc_terms):
+            for term_id, tf in counts.items():
+                postings[term_id].append((doc_id, tf))
+
+        self.offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        docs, weights = [], []
+        for term_id, term_postings in enumerate(postings):
+            df = len(term_postings)
+            idf = np.log(1.0 + (num_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in term_postings:
+                norm = k1 * (1.0 - b + b * doc_lengths[doc_id] / avg_length)
+                docs.append(doc_id)
+                weights.append(idf * tf * (k1 + 1.0) / (tf + norm))
+            self.offsets[term_id + 1] = self.offsets[term_id] + df
+
+        self.postings_docs = np.array(docs, dtype=np.int32)
+        self.postings_weights = np.array(weights, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def query_terms(self, query: str) -> List[int]:
+        """Distinct indexed term ids of a query."""
+        return list(dict.fromkeys(
+            self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary
+        ))
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 20,
+        allowed_ids: Optional[Iterable[Any]] = None
+    ) -> List[Tuple[Dict[str, Any], float, float]]:
+        """
+        Rank markets for a query.
+
+        Args:
+            query: Free-text user query
+            top_k: Maximum number of results
+            allowed_ids: Restrict results to these market ids (e.g. unseen markets)
+
+        Returns:
+            [(market, bm25_score, coverage)] best first, where coverage is the
+            fraction of the query's content words found in the market
+        """
+        query_tokens = set(tokenize(query))
+        term_ids = self.query_terms(query)
+        if not term_ids or not self.markets:
+            return []
+
+        scores = np.zeros(len(self.markets), dtype=np.float32)
+        matched = np.zeros(len(self.markets), dtype=np.int32)
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            np.add.at(scores, self.postings_docs[start:end], self.postings_weights[start:end])
+            np.add.at(matched, self.postings_docs[start:end], 1)
+
+        if allowed_ids is not None:
+            allowed = set(allowed_ids)
+            scores[[i for i, market_id in enumerate(self.ids) if market_id not in allowed]] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if candidates.size > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [
+            (self.markets[i], float(scores[i]), float(matched[i]) / len(query_tokens))
+            for i in ranked
+        ]
+
+
+class VersionedIndexes:
+    """
+    Rebuilds a market type's index only when the catalog version changes.
+
+    Async callers use get_async(): building an index over a large catalog takes
+    seconds, so rebuilds run in a worker thread and the previous index keeps
+    answering until the new one is ready.
+    """
+
+    def __init__(self, text_fns: Dict[str, Callable[[Dict[str, Any]], str]]):
+        self.text_fns = text_fns
+        self._indexes: Dict[str, Tuple[Any, MarketIndex]] = {}
+        self._rebuilds: Dict[str, "asyncio.Task"] = {}
+
+    def get(self, market_type: str, markets: List[Dict[str, Any]], version: Any) -> MarketIndex:
+        cached = self._indexes.get(market_type)
+        if cached is None or cached[0] != version:
+            cached = (version, MarketIndex(markets, self.text_fns[market_type]))
+            self._indexes[market_type] = cached
+        return cached[1]
+
+    async def get_async(self, market_type: str, markets: List[Dict[str, Any]], version: Any) -> MarketIndex:
+        """
+        get() for coroutines: builds off the event loop.
+
+        Only the first build of a market type is awaited; after a version change
+        the current index is returned while a rebuild runs in the background.
+        One rebuild runs per market type at a time, so the index catches up to
+        the newest version on the next call after it finishes.
+        """
+        cached = self._indexes.get(market_type)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        rebuild = self._rebuilds.get(market_type)
+        if rebuild is None:
+            rebuild = asyncio.create_task(self._rebuild(market_type, markets, version))
+            self._rebuilds[market_type] = rebuild
+
+        if cached is not None:
+            return cached[1]
+        index = await asyncio.shield(rebuild)
+        if index is None:
+            raise RuntimeError(f"{market_type} market index is unavailable")
+        return index
+
+    async def _rebuild(self, market_type: str, markets: List[Dict[str, Any]], version: Any) -> Optional[MarketIndex]:
+        try:
+            index = await asyncio.to_thread(MarketIndex, markets, self.text_fns[market_type])
+            self._indexes[market_type] = (version, index)
+            return index
+        except Exception as e:
+            print(f"❌ Error building {market_type} market index: {e}")
+            return None
+        finally:
+            del self._rebuilds[market_type]
@@ -0,0 +1,715 @@
+"""
+Shared core of the PolyBet market agents.
+
+polybet_agent.py, polybet_agent_v2.py and polybet_agent_v3.py are thin entry
+points over this module: they pick RecommendationEngine options and the chat
+protocol they speak, then call run_agent().
+
+Nothing here touches the network at import time. The agent, its funding
+check, the Supabase probe, the market catalog, the caches and the OpenAI
+client are all created on first use, so importing the core (or an entry
+point) is cheap and side-effect free.
+"""
+
+import asyncio
+import os
+import random
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from uuid import uuid4
+
+from dotenv import load_dotenv
+from uagents import Agent, Context, Model, Protocol
+
+from http_client import get_session
+from llm_cache import LLMResponseCache, fingerprint
+from market_catalog import MarketCatalog
+from rate_limiter import RateLimiter
+from shown_markets import ShownMarketsStore
+
+# Load environment variables
+load_dotenv()
+
+# Only the columns the agent reads; PostgREST embeds the marketplace name
+INTERNAL_MARKET_COLUMNS = "id,common_question,options,url"
+EXTERNAL_MARKET_COLUMNS = "id,question,url,marketplaces(name)"
+
+NOT_MARKET_RELATED_MESSAGE = "👋 Hello! I'm here to help you find betting markets. Please ask me about specific topics you'd like to bet on, such as:\n• Sports events or outcomes\n• Political predictions\n• Cryptocurrency prices\n• Entertainment predictions\n\nExample: 'Show me markets about Bitcoin price' or 'What sports betting markets are available?'"
+HEALTH_MESSAGE = "PolyBet Market Agent is healthy and ready to help with betting market recommendations!"
+RATE_LIMITED_MESSAGE = "Rate limit exceeded. Please try again later."
+
+
+class StructuredQuery(Model):
+    query: str
+    parameters: Optional[Dict[str, Any]] = None
+
+
+class PolyBetResponse(Model):
+    recommendations: List[Dict[str, str]]
+    message: str
+    type: str = "polybet_response"
+
+
+def internal_recommendation(market: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "question": market.get("common_question", "Unknown question"),
+        "url": market.get("url") or "#",
+        "type": "PolyBets Platform",
+        "options": ", ".join(market.get("options", []) if market.get("options") else [])
+    }
+
+
+def external_recommendation(market: Dict[str, Any]) -> Dict[str, str]:
+    marketplace_name = market.get("marketplaces", {}).get("name", "Unknown") if market.get("marketplaces") else "Unknown"
+    return {
+        "question": market.get("question", "Unknown question"),
+        "url": market.get("url") or "#",
+        "type": f"External - {marketplace_name}",
+        "options": "Variable"
+    }
+
+
+def format_chat_reply(response: PolyBetResponse) -> str:
+    """Render a PolyBetResponse as a plain-text chat message"""
+    formatted_message = f"{response.message}\n"
+    if response.recommendations:
+        for i, rec in enumerate(response.recommendations[:5], 1):  # Limit to 5 results
+            formatted_message += f"{i}. {rec['question']} ({rec['type']})\n"
+            if rec['url'] != "#":
+                formatted_message += f"   Link: {rec['url']}\n"
+    return formatted_message
+
+
+class RecommendationEngine:
+    """
+    Market recommendation pipeline: catalog -> unseen filter -> local shortlist
+    -> (cached) LLM filter -> formatted recommendations.
+
+    Every collaborator is a cached_property, built on first use.
+    """
+
+    def __init__(
+        self,
+        check_relevance: bool = True,
+        remember_shown: bool = True,
+        debug_preview: bool = False
+    ):
+        """
+        Args:
+            check_relevance: Answer greetings/off-topic messages without searching
+            remember_shown: Avoid repeating markets already shown to a user
+            debug_preview: Skip filtering and return the first few markets of each
+                table (the v2 debugging behaviour)
+        """
+        self.check_relevance = check_relevance
+        self.remember_shown = remember_shown
+        self.debug_preview = debug_preview
+
+        self.supabase_url = os.getenv("SUPABASE_URL")
+        self.supabase_key = os.getenv("SUPABASE_SERVICE_KEY")
+        self.page_size = int(os.getenv("SUPABASE_PAGE_SIZE", "1000"))
+        # Local BM25 shortlisting in front of the LLM filter
+        self.shortlist_size = int(os.getenv("MARKET_SHORTLIST_SIZE", "20"))
+        # Fraction of the query's content words a market must contain to skip the LLM
+        self.confident_coverage = float(os.getenv("CONFIDENT_MATCH_COVERAGE", "1.0"))
+
+        # Supabase REST API headers - only create if we have the key
+        self.supabase_headers: Dict[str, str] = {}
+        if self.supabase_key:
+            self.supabase_headers = {
+                "apikey": self.supabase_key,
+                "Authorization": f"Bearer {self.supabase_key}",
+                "Content-Type": "application/json",
+                "Prefer": "return=representation"
+            }
+
+    # ------------------------------------------------------------------
+    # Lazily built collaborators
+    # ------------------------------------------------------------------
+
+    @cached_property
+    def rate_limiter(self) -> RateLimiter:
+        return RateLimiter()
+
+    @cached_property
+    def catalog(self) -> MarketCatalog:
+        """In-memory catalog of both market tables, refreshed in the background"""
+        return MarketCatalog(
+            self.get_markets_from_supabase,
+            self.get_external_markets_from_supabase,
+            ttl=float(os.getenv("MARKET_CATALOG_TTL", "60")),
+            max_stale=float(os.getenv("MARKET_CATALOG_MAX_STALE", "900"))
+        )
+
+    @cached_property
+    def llm_cache(self) -> LLMResponseCache:
+        """Cached LLM answers, keyed by normalized query (+ catalog version where it matters)"""
+        return LLMResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("LLM_CACHE_TTL", "3600")),
+            disk_path=os.getenv("LLM_CACHE_PATH") or None
+        )
+
+    @cached_property
+    def market_indexes(self):
+        # NumPy is only needed once the first query is shortlisted
+        from market_index import VersionedIndexes, external_market_text, internal_market_text
+        return VersionedIndexes({"internal": internal_market_text, "external": external_market_text})
+
+    @cached_property
+    def shown_markets(self) -> ShownMarketsStore:
+        """Shown markets per user (bounded; SHOWN_MARKETS_DB persists it)"""
+        return ShownMarketsStore(
+            per_user_capacity=int(os.getenv("SHOWN_MARKETS_PER_USER", "500")),
+            max_users=int(os.getenv("SHOWN_MARKETS_MAX_USERS", "10000")),
+            db_path=os.getenv("SHOWN_MARKETS_DB") or None
+        )
+
+    @cached_property
+    def openai_client(self):
+        """Shared AsyncOpenAI client, created on first use so it binds to the agent's event loop"""
+        import openai
+        return openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    # ------------------------------------------------------------------
+    # Supabase
+    # ------------------------------------------------------------------
+
+    def print_environment(self) -> None:
+        print(f"🔧 Environment check:")
+        print(f"   Supabase URL: {'✅ Set' if self.supabase_url else '❌ Missing'}")
+        print(f"   Supabase Key: {'✅ Set' if self.supabase_key else '❌ Missing'}")
+        print(f"   OpenAI Key: {'✅ Set' if os.getenv('OPENAI_API_KEY') else '❌ Missing'}")
+
+    def test_supabase_connection(self) -> bool:
+        """Test Supabase connection and return True if successful"""
+        try:
+            if not self.supabase_url or not self.supabase_key:
+                print("❌ Cannot test connection - missing Supabase configuration")
+                return False
+
+            # Test with a simple query
+            url = f"{self.supabase_url}/rest/v1/"
+            response = get_session().get(url, headers=self.supabase_headers)
+
+            if response.status_code == 200:
+                print("✅ Supabase connection successful")
+                return True
+            else:
+                print(f"❌ Supabase connection failed with status: {response.status_code}")
+                return False
+        except Exception as e:
+            print(f"❌ Supabase connection test failed: {e}")
+            return False
+
+    def fetch_supabase_pages(self, table: str, select: str, since_id: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield pages of a table ordered by id, using Range headers for pagination.
+
+        Raises on HTTP/JSON errors so a partially streamed refresh is never mistaken
+        for a complete one.
+        """
+        if not self.supabase_url or not self.supabase_key:
+            raise RuntimeError("Supabase configuration missing - URL or key not set")
+
+        url = f"{self.supabase_url}/rest/v1/{table}"
+        params = {"select": select, "order": "id.asc"}
+        if since_id is not None:
+            params["id"] = f"gt.{since_id}"
+        print(f"🔍 Fetching {table} from: {url} (select={select})")
+
+        start = 0
+        total = 0
+        while True:
+            headers = {
+                **self.supabase_headers,
+                "Range-Unit": "items",
+                "Range": f"{start}-{start + self.page_size - 1}"
+            }
+            response = get_session().get(url, headers=headers, params=params)
+
+            if response.status_code == 401:
+                raise RuntimeError("Authentication failed - check SUPABASE_SERVICE_KEY")
+            elif response.status_code == 404:
+                raise RuntimeError(f"{table} table not found - check table name")
+            elif response.status_code == 416:
+                break  # Range starts past the last row
+
+            response.raise_for_status()
+            page = response.json()
+            if not isinstance(page, list):
+                raise ValueError(f"Unexpected data format: expected list, got {type(page)}")
+
+            if page:
+                total += len(page)
+                yield page
+            if len(page) < self.page_size:
+                break
+            start += self.page_size
+
+        print(f"📈 Found {total} rows in {table}")
+
+    def get_markets_from_supabase(self, since_id: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Stream pages of markets (only ids above since_id if given)"""
+        return self.fetch_supabase_pages("markets", INTERNAL_MARKET_COLUMNS, since_id)
+
+    def get_external_markets_from_supabase(self, since_id: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Stream pages of external markets with their marketplace name (only ids above since_id if given)"""
+        return self.fetch_supabase_pages("external_markets", EXTERNAL_MARKET_COLUMNS, since_id)
+
+    async def startup(self) -> None:
+        """Probe Supabase, warm the catalog and keep it fresh in the background"""
+        self.print_environment()
+        print("🔌 Testing Supabase connection...")
+        if await asyncio.to_thread(self.test_supabase_connection):
+            print("📊 Loading market catalog...")
+            await asyncio.to_thread(self.catalog.refresh, True)
+            internal_markets, external_markets = await self.catalog.get_markets_async()
+            print(f"✅ Catalog loaded - Internal: {len(internal_markets)}, External: {len(external_markets)}")
+        self.catalog.start_background_refresh()
+
+    # ------------------------------------------------------------------
+    # LLM
+    # ------------------------------------------------------------------
+
+    async def shortlist_markets(self, user_query: str, markets: List[Dict[str, Any]], market_type: str):
+        """Rank markets locally; returns [(market, score, coverage)] restricted to `markets`"""
+        catalog_markets, version = self.catalog.get_table(market_type)
+        # Index builds run in a worker thread; the previous index answers meanwhile
+        index = await self.market_indexes.get_async(market_type, catalog_markets, version)
+        return index.search(
+            user_query,
+            top_k=self.shortlist_size,
+            allowed_ids={market.get('id') for market in markets}
+        )
+
+    async def filter_markets_with_llm(self, user_query: str, markets: List[Dict[str, Any]], market_type: str) -> List[Dict[str, Any]]:
+        """Use LLM to filter markets based on user query"""
+        try:
+            if not markets:
+                return []
+
+            # Shortlist locally; confident keyword matches don't need the LLM at all
+            shortlist = await self.shortlist_markets(user_query, markets, market_type)
+            if shortlist and shortlist[0][2] >= self.confident_coverage:
+                confident = [market for market, _, coverage in shortlist if coverage >= self.confident_coverage]
+                print(f"🎯 {len(confident)} confident {market_type} matches for '{user_query}' (LLM skipped)")
+                return confident
+
+            # The LLM only sees the shortlist (or a bounded sample for general queries)
+            candidates = [market for market, _, _ in shortlist] or markets[:self.shortlist_size]
+
+            # ALL/NONE verdicts hold for any candidate set; id lists only for the same candidates
+            version = self.catalog.version
+            verdict_namespace = f"filter_verdict:{market_type}"
+            ids_namespace = f"filter_ids:{market_type}:{fingerprint(market['id'] for market in candidates)}"
+            hit, result = await self.llm_cache.get_async(verdict_namespace, user_query, version)
+            if not hit:
+                hit, result = await self.llm_cache.get_async(ids_namespace, user_query, version)
+            if hit:
+                print(f"💾 Cached LLM filtering result for '{user_query}': {result}")
+            else:
+                print(f"🔎 Sending {len(candidates)}/{len(markets)} {market_type} markets to the LLM")
+                result = await self.request_market_filter(user_query, candidates, market_type)
+                print(f"🤖 LLM filtering result for '{user_query}': {result}")
+                await self.llm_cache.set_async(verdict_namespace if result in ("ALL", "NONE") else ids_namespace, user_query, result, version)
+
+            if result == "NONE":
+                return []
+            elif result == "ALL":
+                if shortlist:
+                    print(f"🎯 Returning all {len(candidates)} shortlisted {market_type} markets")
+                    return candidates
+                print(f"🎯 Returning all {len(markets)} {market_type} markets for general recommendation")
+                return markets
+
+            # Parse the result and filter markets
+            relevant_ids = [int(id.strip()) for id in result.split(",") if id.strip().isdigit()]
+            filtered_markets = [market for market in candidates if market['id'] in relevant_ids]
+            print(f"🎯 Filtered to {len(filtered_markets)} {market_type} markets")
+
+            return filtered_markets
+
+        except Exception as e:
+            print(f"Error filtering markets with LLM: {e}")
+            return []
+
+    async def request_market_filter(self, user_query: str, candidates: List[Dict[str, Any]], market_type: str) -> str:
+        """Ask the LLM which candidates match; returns "ALL", "NONE" or comma-separated ids"""
+        # Prepare market descriptions for LLM
+        market_descriptions = []
+        for market in candidates:
+            if market_type == "internal":
+                desc = f"ID: {market['id']}, Question: {market['common_question']}, Options: {market['options']}"
+            else:
+                desc = f"ID: {market['id']}, Question: {market['question']}, Marketplace: {market.get('marketplaces', {}).get('name', 'Unknown')}"
+            market_descriptions.append(desc)
+
+        prompt = f"""
+        User query: "{user_query}"
+
+        The user is asking for betting market recommendations. If they're asking for general recommendations like "provide one", "recommend one", "suggest markets", or "show me something to bet on", you should return ALL available markets.
+
+        Here are available {market_type} markets:
+        {chr(10).join(market_descriptions)}
+
+        Rules:
+        - If user asks for general recommendations/suggestions without specific topics, return ALL market IDs
+        - If user mentions specific topics (like "Trump", "sports", "crypto"), return only relevant markets
+        - Return market IDs separated by commas, or "ALL" for general recommendations
+        - Only return "NONE" if the user clearly wants something unrelated to betting
+        """
+
+        # Use OpenAI to filter markets
+        response = await self.openai_client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that matches betting markets to user queries."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=150,
+            temperature=0.3
+        )
+
+        return response.choices[0].message.content.strip()
+
+    async def is_market_related_query(self, user_query: str) -> bool:
+        """Check if user query is related to betting markets using LLM"""
+        try:
+            # Quick checks for obvious greetings/non-market queries
+            greeting_words = ["hello", "hi", "hola", "hey", "good morning", "good afternoon", "good evening"]
+            simple_greetings = ["thanks", "thank you", "bye", "goodbye"]
+
+            query_lower = user_query.lower().strip()
+
+            # If it's just a greeting or very short non-market text
+            if (query_lower in greeting_words or
+                query_lower in simple_greetings or
+                len(query_lower) < 3 or
+                query_lower in ["yes", "no", "ok", "okay"]):
+                return False
+
+            # Check for market-related keywords that indicate betting intent
+            market_keywords = [
+                "recommend", "invest", "bet", "market", "prediction", "odds", "one", "show me",
+                "give me", "find", "suggest", "what", "which", "how much", "price", "outcome",
+                "sports", "politics", "crypto", "bitcoin", "trump", "election", "win", "lose"
+            ]
+
+            # If query contains market-related keywords, it's likely market-related
+            if any(keyword in query_lower for keyword in market_keywords):
+                return True
+
+            # Use LLM for more complex cases
+            async def classify() -> bool:
+                response = await self.openai_client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": """Determine if the user's message is asking about betting markets, predictions, wants recommendations, or investment advice.
+                        Return only 'YES' if it's market-related (including requests for recommendations, suggestions, or investment advice),
+                        'NO' if it's only a greeting, general conversation, or completely unrelated question."""},
+                        {"role": "user", "content": user_query}
+                    ],
+                    max_tokens=10,
+                    temperature=0.1
+                )
+                return response.choices[0].message.content.strip().upper() == "YES"
+
+            return await self.llm_cache.get_or_compute_async("is_market_related", user_query, classify)
+
+        except Exception as e:
+            print(f"Error checking market relevance: {e}")
+            # If LLM fails, assume it's market-related to avoid blocking legitimate queries
+            return True
+
+    async def extract_query_parameters(self, text: str) -> Dict[str, Any]:
+        """Extract structured parameters from natural language using LLM"""
+        try:
+            async def extract() -> Dict[str, Any]:
+                response = await self.openai_client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": """Extract betting market query parameters from user text.
+                        Return JSON with: market_type (sports/crypto/politics/weather/etc), timeframe, specific_terms, confidence_level.
+                        If unclear, set to null."""},
+                        {"role": "user", "content": text}
+                    ],
+                    max_tokens=200,
+                    temperature=0.1
+                )
+
+                import json
+                result = response.choices[0].message.content.strip()
+                return json.loads(result)
+
+            # Copy so callers can't mutate the cached answer
+            return dict(await self.llm_cache.get_or_compute_async("extract_query_parameters", text, extract))
+        except Exception as e:
+            print(f"Error extracting parameters: {e}")
+            return {}
+
+    # ------------------------------------------------------------------
+    # Recommendation pipeline
+    # ------------------------------------------------------------------
+
+    def filter_unseen_markets(self, markets: List[Dict[str, Any]], user_id: str) -> List[Dict[str, Any]]:
+        """Filter out markets that have already been shown to this user"""
+        if not self.remember_shown:
+            return markets
+
+        shown_ids = self.shown_markets.get(user_id)
+        unseen_markets = [market for market in markets if market.get('id') not in shown_ids]
+
+        # If all markets have been shown, reset the user's history and show all markets
+        if not unseen_markets and markets:
+            print(f"🔄 Resetting shown markets for user {user_id} - all markets have been seen")
+            self.shown_markets.reset(user_id)
+            unseen_markets = markets
+
+        return unseen_markets
+
+    def track_shown_markets(self, markets: Iterable[Dict[str, Any]], user_id: str) -> None:
+        """Track which markets were shown to this user"""
+        if self.remember_shown:
+            self.shown_markets.add(user_id, [market['id'] for market in markets if 'id' in market])
+
+    def preview_markets(self, internal_markets: List[Dict[str, Any]], external_markets: List[Dict[str, Any]]) -> PolyBetResponse:
+        """Debug response: the first few markets of each table, unfiltered"""
+        recommendations = [internal_recommendation(market) for market in internal_markets[:3]]
+        recommendations += [external_recommendation(market) for market in external_markets[:3]]
+        if not recommendations:
+            return PolyBetResponse(
+                recommendations=[],
+                message="Markets were found in the database but could not be processed. Check the data structure."
+            )
+        return PolyBetResponse(
+            recommendations=recommendations,
+            message="Here are some available markets (Debug mode - showing first few):"
+        )
+
+    async def recommend(self, user_query: str, user_id: str = "default") -> PolyBetResponse:
+        """Process market recommendation request"""
+        try:
+            print(f"🔍 Processing query: {user_query}")
+
+            # Step 0: Check if query is market-related
+            if self.check_relevance and not await self.is_market_related_query(user_query):
+                return PolyBetResponse(recommendations=[], message=NOT_MARKET_RELATED_MESSAGE)
+
+            # Step 1: Get all markets (served from the catalog cache; inline refreshes run off the event loop)
+            internal_markets, external_markets = await self.catalog.get_markets_async()
+
+            print(f"📊 Total markets found - Internal: {len(internal_markets)}, External: {len(external_markets)}")
+
+            # If no markets found at all, provide a different message
+            if not internal_markets and not external_markets:
+                return PolyBetResponse(
+                    recommendations=[],
+                    message="No markets are currently available in the database. Please check your Supabase connection."
+                )
+
+            if self.debug_preview:
+                return self.preview_markets(internal_markets, external_markets)
+
+            # Step 2: Filter out markets already shown to this user
+            fresh_internal = self.filter_unseen_markets(internal_markets, user_id)
+            fresh_external = self.filter_unseen_markets(external_markets, user_id)
+
+            print(f"🆕 Fresh markets - Internal: {len(fresh_internal)}, External: {len(fresh_external)}")
+
+            # Step 3: Filter markets using LLM based on user query (both passes concurrently)
+            relevant_internal, relevant_external = await asyncio.gather(
+                self.filter_markets_with_llm(user_query, fresh_internal, "internal"),
+                self.filter_markets_with_llm(user_query, fresh_external, "external")
+            )
+
+            print(f"🎯 Relevant markets found - Internal: {len(relevant_internal)}, External: {len(relevant_external)}")
+
+            # Check if user wants only one recommendation
+            wants_single = any(phrase in user_query.lower() for phrase in ["only one", "just one", "provide one", "give me one", "single", "one recommendation"])
+            limit = 1 if wants_single else 5
+
+            # Randomize market order for variety
+            random.shuffle(relevant_internal)
+            random.shuffle(relevant_external)
+
+            # Relevant internal markets first, then external ones up to the limit
+            chosen_internal = relevant_internal[:limit]
+            chosen_external = relevant_external[:limit - len(chosen_internal)]
+            shown_markets = chosen_internal + chosen_external
+            recommendations = (
+                [internal_recommendation(market) for market in chosen_internal] +
+                [external_recommendation(market) for market in chosen_external]
+            )
+
+            if recommendations:
+                if wants_single:
+                    message = f"Here's a betting market recommendation for you:"
+                else:
+                    message = f"Here are betting markets relevant to your query '{user_query}':"
+            else:
+                # If no relevant markets found, fall back to general recommendations
+                fallback_count = limit if wants_single else 4
+                internal_ids = {id(market) for market in internal_markets}
+                all_markets = internal_markets + external_markets
+                random.shuffle(all_markets)
+                shown_markets = all_markets[:fallback_count]
+                recommendations = [
+                    internal_recommendation(market) if id(market) in internal_ids else external_recommendation(market)
+                    for market in shown_markets
+                ]
+                message = f"No markets directly matched your query '{user_query}'. Here are some general betting markets:"
+
+            # Track which markets were shown to this user
+            self.track_shown_markets(shown_markets, user_id)
+            print(f"📝 Tracked {len(shown_markets)} markets for user {user_id}")
+
+            return PolyBetResponse(
+                recommendations=recommendations,
+                message=message
+            )
+
+        except Exception as e:
+            print(f"Error processing recommendation: {e}")
+            return PolyBetResponse(
+                recommendations=[],
+                message=f"Sorry, I encountered an error while searching for markets: {str(e)}"
+            )
+
+
+# ----------------------------------------------------------------------
+# Protocols and agent wiring
+# ----------------------------------------------------------------------
+
+def build_structured_protocol(engine: RecommendationEngine) -> Protocol:
+    """StructuredQuery -> PolyBetResponse protocol (all versions)"""
+    structured_protocol = Protocol("StructuredOutput")
+
+    @structured_protocol.on_message(model=StructuredQuery)
+    async def handle_structured_query(ctx: Context, sender: str, msg: StructuredQuery):
+        """Handle structured queries with parameters"""
+        print(f"🔥 STRUCTURED MESSAGE RECEIVED! From: {sender}, Query: {msg.query}")
+        ctx.logger.info(f"Received structured query from {sender}: {msg.query}")
+
+        # Rate limiting
+        if not engine.rate_limiter.is_allowed(sender):
+            await ctx.send(sender, PolyBetResponse(
+                recommendations=[],
+                message=RATE_LIMITED_MESSAGE,
+                type="error"
+            ))
+            return
+
+        # Process the recommendation
+        response = await engine.recommend(msg.query, sender)
+        await ctx.send(sender, response)
+
+        ctx.logger.info(f"Sent {len(response.recommendations)} structured recommendations to {sender}")
+
+    return structured_protocol
+
+
+def build_chat_protocol(engine: RecommendationEngine) -> Protocol:
+    """ASI chat protocol (uagents_core ChatMessage with acknowledgements)"""
+    from uagents_core.contrib.protocols.chat import (
+        ChatMessage,
+        ChatAcknowledgement,
+        TextContent,
+        chat_protocol_spec
+    )
+
+    chat_proto = Protocol(spec=chat_protocol_spec)
+
+    def text_message(text: str) -> ChatMessage:
+        return ChatMessage(
+            timestamp=datetime.utcnow(),
+            msg_id=uuid4(),
+            content=[TextContent(type="text", text=text)]
+        )
+
+    @chat_proto.on_message(model=ChatMessage)
+    async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
+        """Main message handler for all ChatMessage types"""
+        # Extract text from content
+        text_content = ""
+        if msg.content and len(msg.content) > 0:
+            for content in msg.content:
+                if hasattr(content, 'text'):
+                    text_content += content.text + " "
+        text_content = text_content.strip()
+
+        print(f"🔥 MESSAGE RECEIVED! From: {sender}, Text: {text_content}")
+        ctx.logger.info(f"🔥 MESSAGE RECEIVED! From: {sender}, Text: {text_content}")
+
+        # Send acknowledgment
+        ack = ChatAcknowledgement(
+            timestamp=datetime.utcnow(),
+            acknowledged_msg_id=msg.msg_id
+        )
+        await ctx.send(sender, ack)
+
+        # Health check
+        if text_content.lower() in ["health", "status", "ping"]:
+            print(f"💚 Health check request from {sender}")
+            await ctx.send(sender, text_message(HEALTH_MESSAGE))
+            return
+
+        # Regular chat message handling
+        print(f"🎯 Processing betting query from {sender}: {text_content}")
+        ctx.logger.info(f"Received chat message from {sender}: {text_content}")
+
+        # Rate limiting
+        if not engine.rate_limiter.is_allowed(sender):
+            await ctx.send(sender, text_message(RATE_LIMITED_MESSAGE))
+            return
+
+        polybet_response = await engine.recommend(text_content, sender)
+        await ctx.send(sender, text_message(format_chat_reply(polybet_response)))
+        ctx.logger.info(f"Sent {len(polybet_response.recommendations)} recommendations to {sender}")
+
+    # Acknowledgement Handler - Process received acknowledgements
+    @chat_proto.on_message(ChatAcknowledgement)
+    async def handle_acknowledgement(ctx: Context, sender: str, msg: ChatAcknowledgement):
+        ctx.logger.info(f"Received acknowledgement from {sender} for message: {msg.acknowledged_msg_id}")
+
+    return chat_proto
+
+
+def create_agent() -> Agent:
+    """Create the ASI-compatible mailbox agent"""
+    return Agent(
+        name="Polybets-Market-Finder",
+        seed="polybet_market_agent_seed_25",
+        port=8001,
+        endpoint=["http://127.0.0.1:8001/submit"],
+        mailbox=True,
+        agentverse={"api_key": os.getenv("ACCESS_TOKEN")}
+    )
+
+
+def run_agent(engine: RecommendationEngine, protocols: List[Protocol], agent: Optional[Agent] = None) -> None:
+    """Create, fund and run the agent with the given protocols (blocks)"""
+    from uagents.setup import fund_agent_if_low
+
+    agent = agent or create_agent()
+
+    @agent.on_event("startup")
+    async def startup_function(ctx: Context):
+        print("🚀 PolyBet Market Agent starting up...")
+        print(f"📍 Agent address: {agent.address}")
+        print("🏷️  Agent name: Polybets-Market-Finder")
+        await engine.startup()
+        print("✅ Ready to help with betting market recommendations!")
+        print("👀 Waiting for messages...")
+        ctx.logger.info("PolyBet Market Agent starting up...")
+        ctx.logger.info(f"Agent address: {agent.address}")
+        ctx.logger.info("Agent name: Polybets-Market-Finder")
+        ctx.logger.info("Ready to help with betting market recommendations!")
+
+    for protocol in protocols:
+        agent.include(protocol)
+
+    # Fund agent if needed
+    fund_agent_if_low(agent.wallet.address())
+    agent.run()
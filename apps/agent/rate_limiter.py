@@ -0,0 +1,91 @@
+"""
+Sliding-window rate limiter shared by the PolyBet agents.
+
+Each sender keeps a deque of at most max_requests timestamps, so a check only
+pops expired entries from the left and appends one: amortised O(1) instead of
+rebuilding the whole history. Senders are kept in least-recently-seen order,
+which makes evicting idle senders a walk from the front, and max_users caps
+how many are tracked at once. global_max_requests optionally limits the total
+across all senders per window.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        max_requests: int = 30,
+        time_window: float = 3600,
+        max_users: Optional[int] = None,
+        global_max_requests: Optional[int] = None,
+        evict_interval: float = 60
+    ):
+        """
+        Args:
+            max_requests: Requests allowed per sender per window
+            time_window: Window length in seconds
+            max_users: Senders tracked at once; the least recently seen are dropped
+                beyond this (default: RATE_LIMIT_MAX_USERS or 10000)
+            global_max_requests: Requests allowed across all senders per window
+                (default: RATE_LIMIT_GLOBAL_MAX, unlimited when unset)
+            evict_interval: Seconds between sweeps for idle senders
+        """
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.max_users = max_users or int(os.getenv("RATE_LIMIT_MAX_USERS", "10000"))
+        if global_max_requests is None and os.getenv("RATE_LIMIT_GLOBAL_MAX"):
+            global_max_requests = int(os.getenv("RATE_LIMIT_GLOBAL_MAX"))
+        self.global_max_requests = global_max_requests
+        self.evict_interval = evict_interval
+        self.requests: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self.global_requests: Deque[float] = deque()
+        self._last_eviction = time.time()
+        self._lock = threading.Lock()
+
+    def _evict_idle(self, now: float) -> None:
+        # Front of the dict is the least recently seen sender
+        while self.requests:
+            user_id, timestamps = next(iter(self.requests.items()))
+            if timestamps and now - timestamps[-1] < self.time_window:
+                break
+            del self.requests[user_id]
+        self._last_eviction = now
+
+    def is_allowed(self, user_id: str) -> bool:
+        now = time.time()
+        with self._lock:
+            if now - self._last_eviction >= self.evict_interval:
+                self._evict_idle(now)
+
+            timestamps = self.requests.get(user_id)
+            if timestamps is None:
+                timestamps = self.requests[user_id] = deque(maxlen=self.max_requests)
+                while len(self.requests) > self.max_users:
+                    self.requests.popitem(last=False)
+            else:
+                self.requests.move_to_end(user_id)
+
+            # Clean old requests
+            while timestamps and now - timestamps[0] >= self.time_window:
+                timestamps.popleft()
+            if self.global_max_requests is not None:
+                while self.global_requests and now - self.global_requests[0] >= self.time_window:
+                    self.global_requests.popleft()
+
+            if len(timestamps) >= self.max_requests:
+                return False
+            if self.global_max_requests is not None and len(self.global_requests) >= self.global_max_requests:
+                return False
+
+            timestamps.append(now)
+            if self.global_max_requests is not None:
+                self.global_requests.append(now)
+            return True
+
+    def tracked_users(self) -> int:
+        return len(self.requests)
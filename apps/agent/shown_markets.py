@@ -0,0 +1,129 @@
+"""
+Per-user history of markets already recommended.
+
+Replaces the agent's unbounded dict of sets:
+- Each user keeps at most per_user_capacity market ids; the oldest shown drop
+  out first (and so become eligible to be recommended again)
+- At most max_users histories stay in memory; the least recently active user
+  is evicted first
+- With db_path set, history is written through to SQLite and loaded lazily
+  per user, so it survives restarts; rows older than retention are purged on
+  startup
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, FrozenSet, Iterable, Optional
+
+
+class ShownMarketsStore:
+    """Bounded LRU of shown market ids per user with optional SQLite persistence."""
+
+    def __init__(
+        self,
+        per_user_capacity: int = 500,
+        max_users: int = 10000,
+        db_path: Optional[str] = None,
+        retention: float = 30 * 24 * 3600
+    ):
+        """
+        Args:
+            per_user_capacity: Market ids remembered per user
+            max_users: User histories kept in memory
+            db_path: SQLite file for persistence (None keeps history in memory only)
+            retention: Seconds a persisted entry is kept
+        """
+        self.per_user_capacity = per_user_capacity
+        self.max_users = max_users
+        self._users: "OrderedDict[str, OrderedDict[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS shown_markets ("
+                    "user_id TEXT, market_id, shown_at REAL, PRIMARY KEY (user_id, market_id))"
+                )
+                self._db.execute("DELETE FROM shown_markets WHERE shown_at < ?", (time.time() - retention,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Shown-markets persistence disabled ({db_path}): {e}")
+                self._db = None
+
+    def _history(self, user_id: str) -> "OrderedDict[Any, float]":
+        """Return the user's history (oldest first), loading it from disk on first use."""
+        history = self._users.get(user_id)
+        if history is not None:
+            self._users.move_to_end(user_id)
+            return history
+
+        history = OrderedDict()
+        if self._db is not None:
+            try:
+                rows = self._db.execute(
+                    "SELECT market_id, shown_at FROM shown_markets WHERE user_id = ? "
+                    "ORDER BY shown_at DESC LIMIT ?",
+                    (user_id, self.per_user_capacity)
+                ).fetchall()
+                for market_id, shown_at in reversed(rows):
+                    history[market_id] = shown_at
+            except sqlite3.Error as e:
+                print(f"⚠️ Failed to load shown markets for {user_id}: {e}")
+
+        self._users[user_id] = history
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return history
+
+    def get(self, user_id: str) -> FrozenSet[Any]:
+        """Market ids already shown to the user."""
+        with self._lock:
+            return frozenset(self._history(user_id))
+
+    def add(self, user_id: str, market_ids: Iterable[Any]) -> None:
+        """Record market ids as shown, evicting the user's oldest beyond capacity."""
+        now = time.time()
+        with self._lock:
+            history = self._history(user_id)
+            added = []
+            for offset, market_id in enumerate(market_ids):
+                # Strictly increasing stamps keep batch order when reloading/trimming from disk
+                history[market_id] = now + offset * 1e-6
+                history.move_to_end(market_id)
+                added.append((user_id, market_id, history[market_id]))
+            while len(history) > self.per_user_capacity:
+                history.popitem(last=False)
+
+            if self._db is not None and added:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO shown_markets (user_id, market_id, shown_at) VALUES (?, ?, ?)",
+                        added
+                    )
+                    self._db.execute(
+                        "DELETE FROM shown_markets WHERE user_id = ? AND market_id NOT IN ("
+                        "SELECT market_id FROM shown_markets WHERE user_id = ? ORDER BY shown_at DESC LIMIT ?)",
+                        (user_id, user_id, self.per_user_capacity)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Failed to persist shown markets for {user_id}: {e}")
+
+    def reset(self, user_id: str) -> None:
+        """Forget everything shown to the user."""
+        with self._lock:
+            self._users[user_id] = OrderedDict()
+            self._users.move_to_end(user_id)
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM shown_markets WHERE user_id = ?", (user_id,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Failed to reset shown markets for {user_id}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._users)
@@ -0,0 +1,54 @@
+"""
+Quote latency benchmarks for lmsr_calculator (asv conventions: setup/time_*).
+"""
+
+from bet_execution.lmsr_calculator import (
+    calculate_current_prices,
+    calculate_initial_lmsr_params,
+    calculate_shares_to_buy,
+)
+
+from .fixtures import make_pool_states
+
+
+class TimeLMSRCalculator:
+    """Single-pool quotes against a fixed pool state."""
+
+    # Budgets straddle the small-amount linear path (< 10) and the exact path
+    params = [1.0, 100.0, 10_000.0, 1_000_000.0]
+    param_names = ["amount"]
+
+    def setup(self, amount):
+        self.state = make_pool_states(1)[0]
+
+    def time_calculate_initial_lmsr_params(self, amount):
+        calculate_initial_lmsr_params(self.state.initial_liquidity_A, self.state.initial_liquidity_B)
+
+    def time_calculate_current_prices(self, amount):
+        calculate_current_prices(
+            self.state.initial_liquidity_A,
+            self.state.initial_liquidity_B,
+            self.state.current_q_A,
+            self.state.current_q_B
+        )
+
+    def time_calculate_shares_to_buy(self, amount):
+        calculate_shares_to_buy(
+            self.state.initial_liquidity_A,
+            self.state.initial_liquidity_B,
+            self.state.current_q_A,
+            self.state.current_q_B,
+            amount,
+            True
+        )
+
+    def track_shares_to_buy(self, amount):
+        result = calculate_shares_to_buy(
+            self.state.initial_liquidity_A,
+            self.state.initial_liquidity_B,
+            self.state.current_q_A,
+            self.state.current_q_B,
+            amount,
+            True
+        )
+        return float("nan") if isinstance(result, Exception) else result[0]
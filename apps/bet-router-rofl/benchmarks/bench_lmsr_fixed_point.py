@@ -0,0 +1,41 @@
+"""
+Quote latency benchmarks for the fixed-point LMSR engine (asv conventions: setup/time_*).
+"""
+
+import numpy as np
+
+from bet_execution.lmsr_fixed_point import (
+    calculate_fixed_lmsr_params,
+    calculate_fixed_proceeds_for_sell_with_params,
+    calculate_fixed_shares_for_amounts,
+    calculate_fixed_shares_to_buy_with_params,
+)
+
+from .fixtures import make_pool_states
+
+
+class TimeLMSRFixedPoint:
+    """Single-pool integer quotes against a fixed pool state (amounts in micro-USDC)."""
+
+    def setup(self):
+        state = make_pool_states(1)[0]
+        self.liquidity_A = int(state.initial_liquidity_A)
+        self.liquidity_B = int(state.initial_liquidity_B)
+        self.q_A = int(state.current_q_A)
+        self.q_B = int(state.current_q_B)
+        self.lmsr_params = calculate_fixed_lmsr_params(self.liquidity_A, self.liquidity_B)
+        # A grid search's worth of amounts quoted in one call
+        self.amounts = np.linspace(0, 100_000_000, 101).astype(np.int64)
+
+    def time_calculate_fixed_shares_to_buy(self):
+        calculate_fixed_shares_to_buy_with_params(self.lmsr_params, self.q_A, self.q_B, 10_000_000, True)
+
+    def time_calculate_fixed_shares_for_101_amounts(self):
+        calculate_fixed_shares_for_amounts(self.lmsr_params, self.q_A, self.q_B, self.amounts, True)
+
+    def time_calculate_fixed_proceeds_for_sell(self):
+        calculate_fixed_proceeds_for_sell_with_params(self.lmsr_params, self.q_A, self.q_B, self.q_A // 2, True)
+
+    def track_shares_to_buy(self):
+        result = calculate_fixed_shares_to_buy_with_params(self.lmsr_params, self.q_A, self.q_B, 10_000_000, True)
+        return float("nan") if isinstance(result, Exception) else result[0]
@@ -0,0 +1,45 @@
+"""
+Quote latency benchmarks for the n-outcome LMSR engine (asv conventions: setup/time_*).
+"""
+
+import numpy as np
+
+from bet_execution.lmsr_multi import (
+    calculate_multi_current_prices,
+    calculate_multi_lmsr_params,
+    calculate_multi_shares_for_amounts,
+    calculate_multi_shares_to_buy,
+)
+
+from .fixtures import make_categorical_pool_states
+
+
+class TimeLMSRMulti:
+    """Single-pool quotes against a fixed categorical pool state."""
+
+    params = [2, 4, 16]
+    param_names = ["outcomes"]
+
+    def setup(self, outcomes):
+        self.state = make_categorical_pool_states(1, outcomes)[0]
+        self.liquidity = self.state.liquidity_vector()
+        self.q = self.state.q_vector()
+        self.lmsr_params = calculate_multi_lmsr_params(self.liquidity)
+        # A grid search's worth of amounts quoted in one call
+        self.amounts = np.linspace(0, 1_000_000.0, 101)
+
+    def time_calculate_multi_lmsr_params(self, outcomes):
+        calculate_multi_lmsr_params(self.liquidity)
+
+    def time_calculate_multi_current_prices(self, outcomes):
+        calculate_multi_current_prices(self.liquidity, self.q)
+
+    def time_calculate_multi_shares_to_buy(self, outcomes):
+        calculate_multi_shares_to_buy(self.liquidity, self.q, 10_000.0, outcomes - 1)
+
+    def time_calculate_multi_shares_for_101_amounts(self, outcomes):
+        calculate_multi_shares_for_amounts(self.lmsr_params, self.q, self.amounts, outcomes - 1)
+
+    def track_shares_to_buy(self, outcomes):
+        result = calculate_multi_shares_to_buy(self.liquidity, self.q, 10_000.0, outcomes - 1)
+        return float("nan") if isinstance(result, Exception) else result[0]
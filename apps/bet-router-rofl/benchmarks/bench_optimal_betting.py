@@ -0,0 +1,191 @@
+"""
+Optimizer latency and quality benchmarks for find_optimal_allocation.
+
+time_* tracks how long an allocation takes; track_* records the shares it
+achieves so a faster optimizer that quietly gives up shares shows up too.
+"""
+
+import tracemalloc
+
+from bet_execution.optimal_betting import (
+    AllocationResult,
+    LMSRMarket,
+    OptimalAllocation,
+    OptimizationMethod,
+    _AllocationCandidate,
+    build_cost_curve_table,
+    find_optimal_allocation,
+)
+
+from .fixtures import make_pool_fixture
+
+
+class OptimalAllocationSuite:
+    """Every OptimizationMethod across pool counts and budget magnitudes."""
+
+    params = (
+        [method.value for method in OptimizationMethod],
+        [2, 3, 5, 10, 20],
+        [1.0, 100.0, 1_000.0],  # whole USDC, as main.py passes the slip's collateral
+    )
+    param_names = ["method", "num_pools", "budget"]
+    timeout = 300
+
+    def setup(self, method, num_pools, budget):
+        self.pool_configs, self.lmsr_cache = make_pool_fixture(num_pools)
+        self.method = OptimizationMethod(method)
+
+    def _allocate(self, budget):
+        return find_optimal_allocation(
+            self.pool_configs,
+            budget,
+            0,
+            self.method,
+            lmsr_cache=self.lmsr_cache
+        )
+
+    def time_find_optimal_allocation(self, method, num_pools, budget):
+        self._allocate(budget)
+
+    def track_total_shares(self, method, num_pools, budget):
+        result = self._allocate(budget)
+        return float("nan") if isinstance(result, Exception) else result.total_shares
+
+    track_total_shares.unit = "base units"
+
+    def track_efficiency(self, method, num_pools, budget):
+        result = self._allocate(budget)
+        return float("nan") if isinstance(result, Exception) else result.efficiency
+
+    track_efficiency.unit = "base units/USDC"
+
+
+class CostCurveSuite:
+    """Table lookups against exact quotes, and grid search with and without tables."""
+
+    params = ([None, 64, 256, 1024],)
+    param_names = ["resolution"]
+
+    def setup(self, resolution):
+        self.pool_configs, self.lmsr_cache = make_pool_fixture(3)
+        self.resolution = resolution
+        self.market = LMSRMarket(self.lmsr_cache, resolution)
+        if resolution is not None:
+            # Tables are built once per snapshot; time_build_table covers that cost
+            tables = [self.market.get_cost_curve(pool_config, 0, 1_000.0) for pool_config in self.pool_configs]
+            self.table = tables[0]
+
+    def time_quote(self, resolution):
+        self.market.calculate_shares_and_cost(self.pool_configs[0], 437.3, 0)
+
+    def time_table_lookup(self, resolution):
+        if resolution is not None:
+            self.table.lookup(437.3)
+
+    def time_build_table(self, resolution):
+        if resolution is not None:
+            build_cost_curve_table(self.lmsr_cache.get(1000, "canibeton_variant1"), 0, 1_000.0, resolution)
+
+    def time_grid_search(self, resolution):
+        find_optimal_allocation(
+            self.pool_configs, 1_000.0, 0, OptimizationMethod.GRID_SEARCH, 20,
+            lmsr_cache=self.lmsr_cache, cost_curve_resolution=resolution
+        )
+
+    def track_grid_search_shares(self, resolution):
+        result = find_optimal_allocation(
+            self.pool_configs, 1_000.0, 0, OptimizationMethod.GRID_SEARCH, 20,
+            lmsr_cache=self.lmsr_cache, cost_curve_resolution=resolution
+        )
+        return float("nan") if isinstance(result, Exception) else result.total_shares
+
+    track_grid_search_shares.unit = "base units"
+
+
+def _traced_bytes(fn):
+    """(bytes still held, peak bytes) allocated while fn runs."""
+    tracemalloc.start()
+    try:
+        held = fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del held
+    return current, peak
+
+
+class CandidateMemorySuite:
+    """Memory per candidate allocation kept during search, and the search's peak."""
+
+    params = ([2, 3, 10],)
+    param_names = ["num_pools"]
+
+    def setup(self, num_pools):
+        self.pool_configs, self.lmsr_cache = make_pool_fixture(num_pools)
+        self.amounts = tuple(100.0 for _ in self.pool_configs)
+        self.shares = tuple(1_000_000 for _ in self.pool_configs)
+        self.costs = tuple(99.9 for _ in self.pool_configs)
+
+    def _public_candidates(self, count=1_000):
+        # How every candidate was represented before search kept _AllocationCandidates
+        return [
+            OptimalAllocation(
+                total_shares=sum(self.shares),
+                total_cost=sum(self.costs),
+                allocations=[
+                    AllocationResult(pool_config, amount, shares, cost, shares / cost)
+                    for pool_config, amount, shares, cost in zip(self.pool_configs, self.amounts, self.shares, self.costs)
+                ],
+                efficiency=sum(self.shares) / sum(self.costs)
+            )
+            for _ in range(count)
+        ]
+
+    def _slot_candidates(self, count=1_000):
+        return [
+            _AllocationCandidate(tuple(list(self.amounts)), tuple(list(self.shares)), tuple(list(self.costs)))
+            for _ in range(count)
+        ]
+
+    def track_public_candidate_bytes(self, num_pools):
+        return _traced_bytes(self._public_candidates)[0] / 1_000
+
+    track_public_candidate_bytes.unit = "bytes"
+
+    def track_slot_candidate_bytes(self, num_pools):
+        return _traced_bytes(self._slot_candidates)[0] / 1_000
+
+    track_slot_candidate_bytes.unit = "bytes"
+
+    def track_grid_search_peak(self, num_pools):
+        return _traced_bytes(lambda: find_optimal_allocation(
+            self.pool_configs, 1_000.0, 0, OptimizationMethod.GRID_SEARCH, 20, lmsr_cache=self.lmsr_cache
+        ))[1]
+
+    track_grid_search_peak.unit = "bytes"
+
+
+class GridSearchSuite:
+    """Grid search precision against pool count, full lattice vs coarse-to-fine."""
+
+    params = ([3, 20, 100], [3, 10], [False, True])
+    param_names = ["precision", "num_pools", "refine"]
+    timeout = 300
+
+    def setup(self, precision, num_pools, refine):
+        self.pool_configs, self.lmsr_cache = make_pool_fixture(num_pools)
+
+    def _allocate(self, precision, refine):
+        return find_optimal_allocation(
+            self.pool_configs, 1_000.0, 0, OptimizationMethod.GRID_SEARCH, precision,
+            lmsr_cache=self.lmsr_cache, refine_grid=refine
+        )
+
+    def time_grid_search(self, precision, num_pools, refine):
+        self._allocate(precision, refine)
+
+    def track_total_shares(self, precision, num_pools, refine):
+        result = self._allocate(precision, refine)
+        return float("nan") if isinstance(result, Exception) else result.total_shares
+
+    track_total_shares.unit = "base units"
@@ -0,0 +1,65 @@
+"""
+Fixed synthetic LMSR pools for the benchmark suite.
+
+Pools are generated from a seeded RNG so every run (and every commit) quotes
+against exactly the same market state. Liquidity and q values are in token
+base units, like pool_lmsr_data_view.
+"""
+
+import random
+from typing import List
+
+from bet_execution.get_lmsr_data import LMSRData, LMSRDataCache, LMSR_TOKEN_BASE_UNITS
+from bet_execution.optimal_betting import PoolConfig
+
+FIXTURE_SEED = 20250701
+FIXTURE_SCHEMAS = ["canibeton_variant1", "canibeton_variant2"]
+
+
+def make_pool_states(num_pools: int, seed: int = FIXTURE_SEED) -> List[LMSRData]:
+    """Deterministic pool states with a spread of depths and skews."""
+    rng = random.Random(seed)
+    states = []
+    for _ in range(num_pools):
+        liquidity_A = rng.uniform(5, 500) * LMSR_TOKEN_BASE_UNITS
+        liquidity_B = rng.uniform(5, 500) * LMSR_TOKEN_BASE_UNITS
+        states.append(LMSRData(
+            initial_liquidity_A=liquidity_A,
+            initial_liquidity_B=liquidity_B,
+            current_q_A=rng.uniform(0, 0.5) * liquidity_A,
+            current_q_B=rng.uniform(0, 0.5) * liquidity_B
+        ))
+    return states
+
+
+def make_categorical_pool_states(num_pools: int, num_outcomes: int, seed: int = FIXTURE_SEED) -> List[LMSRData]:
+    """Deterministic n-outcome pool states, same depth/skew spread as make_pool_states."""
+    rng = random.Random(seed)
+    states = []
+    for _ in range(num_pools):
+        liquidity = [rng.uniform(5, 500) * LMSR_TOKEN_BASE_UNITS for _ in range(num_outcomes)]
+        states.append(LMSRData.from_outcomes(
+            liquidity,
+            [rng.uniform(0, 0.5) * value for value in liquidity]
+        ))
+    return states
+
+
+def make_pool_fixture(num_pools: int, seed: int = FIXTURE_SEED):
+    """
+    Build pool configs plus a pre-filled LMSRDataCache (no database access).
+
+    Returns:
+        (pool_configs, lmsr_cache)
+    """
+    def no_database(pool_id: int, schema: str):
+        return Exception(f"Benchmark fixture has no pool {pool_id} in {schema}")
+
+    cache = LMSRDataCache(loader=no_database)
+    pool_configs = []
+    for i, state in enumerate(make_pool_states(num_pools, seed)):
+        pool_id = 1000 + i
+        schema = FIXTURE_SCHEMAS[i % len(FIXTURE_SCHEMAS)]
+        cache.put(pool_id, schema, state)
+        pool_configs.append(PoolConfig(pool_id=pool_id, schema=schema, name=f"Fixture pool {pool_id}"))
+    return pool_configs, cache
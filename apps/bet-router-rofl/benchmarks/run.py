@@ -0,0 +1,174 @@
+"""
+Minimal runner for the asv-style suites in this package.
+
+Runs every time_* / track_* method over its parameter grid and writes a JSON
+report (one file per run, stamped with the git commit) so quote latency and
+optimizer quality can be compared across commits. The suites also load
+unchanged under `asv run` if the project is set up for it.
+
+Usage (from apps/bet-router-rofl):
+    python -m benchmarks.run
+    python -m benchmarks.run --filter grid_search --compare benchmarks/results/<old>.json
+"""
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import math
+import os
+import statistics
+import subprocess
+import time
+import timeit
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+SUITE_MODULES = [
+    "benchmarks.bench_lmsr_calculator",
+    "benchmarks.bench_lmsr_fixed_point",
+    "benchmarks.bench_lmsr_multi",
+    "benchmarks.bench_optimal_betting",
+]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _param_grid(suite) -> List[tuple]:
+    params = getattr(suite, "params", None)
+    if params is None:
+        return [()]
+    # asv allows a flat list for a single parameter
+    if not isinstance(params, tuple) and not (params and isinstance(params[0], list)):
+        params = (params,)
+    return list(itertools.product(*params))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def _time_call(fn, min_run_time: float, repeat: int) -> Dict[str, float]:
+    """Autorange like timeit, then take the best and median of `repeat` samples."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_run_time / repeat or number >= 1_000_000:
+            break
+        number *= 10
+    samples = [elapsed / number] + [t / number for t in timer.repeat(repeat=repeat - 1, number=number)]
+    return {"min": min(samples), "median": statistics.median(samples), "number": number}
+
+
+def run_suites(name_filter: str = "", min_run_time: float = 0.2, repeat: int = 5) -> Dict[str, Dict]:
+    """
+    Run every benchmark whose full name contains name_filter.
+
+    Returns:
+        {benchmark_name: {"kind": "time"|"track", ...}}
+    """
+    results: Dict[str, Dict] = {}
+
+    for module_name in SUITE_MODULES:
+        module = importlib.import_module(module_name)
+        for class_name, suite in inspect.getmembers(module, inspect.isclass):
+            if suite.__module__ != module.__name__:
+                continue
+            methods = [
+                name for name in dir(suite)
+                if name.startswith(("time_", "track_")) and callable(getattr(suite, name))
+            ]
+            for args in _param_grid(suite):
+                for method_name in methods:
+                    key = f"{module_name.split('.')[-1]}.{class_name}.{method_name}({', '.join(map(repr, args))})"
+                    if name_filter not in key:
+                        continue
+
+                    instance = suite()
+                    if hasattr(instance, "setup"):
+                        instance.setup(*args)
+                    method = getattr(instance, method_name)
+
+                    if method_name.startswith("time_"):
+                        stats = _time_call(lambda: method(*args), min_run_time, repeat)
+                        results[key] = {"kind": "time", "unit": "seconds", **stats}
+                        print(f"  {key:<100} {stats['median'] * 1000:10.3f} ms")
+                    else:
+                        value = method(*args)
+                        results[key] = {
+                            "kind": "track",
+                            "unit": getattr(method, "unit", "unit"),
+                            "value": value,
+                        }
+                        print(f"  {key:<100} {value:14.4f} {results[key]['unit']}")
+
+                    if hasattr(instance, "teardown"):
+                        instance.teardown(*args)
+
+    return results
+
+
+def compare(current: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Report time regressions above `threshold` (ratio) and any drop in tracked quality."""
+    regressions = []
+    for key, entry in current.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        if entry["kind"] == "time":
+            ratio = entry["median"] / old["median"] if old["median"] > 0 else math.inf
+            if ratio > 1 + threshold:
+                regressions.append(f"{key}: {old['median'] * 1000:.3f} ms → {entry['median'] * 1000:.3f} ms ({ratio:.2f}x)")
+        elif entry["value"] < old["value"] * (1 - 1e-9):
+            regressions.append(f"{key}: {old['value']:.4f} → {entry['value']:.4f} {entry['unit']}")
+    return regressions
+
+
+# Example usage: python -m benchmarks.run --filter OptimalAllocationSuite
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the LMSR/optimizer benchmark suites")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--min-run-time", type=float, default=0.2, help="Seconds per timing sample set")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing samples per benchmark")
+    parser.add_argument("--output", default=None, help="Report path (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown ratio before flagging")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    print(f"=== Benchmarks @ {commit or 'unknown commit'} ===")
+    started = time.perf_counter()
+    results = run_suites(args.filter, args.min_run_time, args.repeat)
+
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "elapsed_seconds": time.perf_counter() - started,
+        "results": results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{commit or 'local'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Wrote {len(results)} results to {output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s):")
+            for line in regressions:
+                print(f"  {line}")
+            raise SystemExit(1)
+        print("✅ No regressions against baseline")
@@ -0,0 +1,275 @@
+"""
+Adapter Reconciliation - replay recorded adapter trades through the LMSR engines.
+
+A recording is a JSON-lines file with one executed trade per line:
+
+    {"side": "buy", "schema": "canibeton_variant1", "pool_id": 161, "option": 0,
+     "amount": 12.5, "fee_bps": 0,
+     "pool": {"initial_liquidity_A": 411600000, "initial_liquidity_B": 597800000,
+              "current_q_A": 91972654, "current_q_B": 45986327},
+     "response": {"transactionId": "...", "sharesMinted": 30.517578}}
+
+- side: "buy" (amount = collateral in whole tokens, response.sharesMinted)
+  or "sell" (amount = shares in whole tokens, response.collateralReceived)
+- pool: the pool state the trade executed against, in micro-USDC / base units
+
+Each trade is re-quoted with lmsr_fixed_point and with the float
+lmsr_calculator; the check passes only if the fixed-point quote matches the
+adapter to the base unit. BetExecutor appends buys it executes when given a
+TradeRecorder.
+
+record_simulated_trades produces a recording from the MarketplaceSimulator.
+A simulator filling with lmsr_fixed_point reproduces the engine's own quotes,
+so that is a self-consistency smoke test of the recording and replay path,
+not evidence about the program's rounding.
+"""
+
+import json
+import random
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .get_lmsr_data import LMSRData
+from .lmsr_calculator import calculate_proceeds_for_sell, calculate_shares_to_buy
+from .lmsr_fixed_point import (
+    base_units_from_tokens,
+    calculate_fixed_proceeds_for_sell,
+    calculate_fixed_shares_to_buy,
+    tokens_to_micro_units,
+)
+
+RESPONSE_FIELDS = {"buy": "sharesMinted", "sell": "collateralReceived"}
+
+
+@dataclass
+class RecordedTrade:
+    side: str  # "buy" or "sell"
+    schema: str
+    pool_id: int
+    option: int
+    amount: float  # collateral (buy) or shares (sell), whole tokens as sent to the adapter
+    pool: LMSRData  # state the trade executed against
+    response: Dict[str, Any]
+    fee_bps: int = 0
+
+    @property
+    def actual_units(self) -> Optional[int]:
+        """sharesMinted / collateralReceived back in integer base units, None if missing."""
+        value = self.response.get(RESPONSE_FIELDS.get(self.side, ""))
+        if value is None:
+            return None
+        return base_units_from_tokens(float(value))
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["pool"] = {
+            "initial_liquidity_A": self.pool.initial_liquidity_A,
+            "initial_liquidity_B": self.pool.initial_liquidity_B,
+            "current_q_A": self.pool.current_q_A,
+            "current_q_B": self.pool.current_q_B,
+        }
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, line: str) -> "RecordedTrade":
+        data = json.loads(line)
+        if data.get("side") not in RESPONSE_FIELDS:
+            raise ValueError(f"Unknown trade side: {data.get('side')!r}")
+        data["pool"] = LMSRData(**data["pool"])
+        return cls(**data)
+
+
+class TradeRecorder:
+    """Thread-safe appender of executed trades to a JSON-lines recording."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, trade: RecordedTrade) -> Optional[Exception]:
+        try:
+            line = trade.to_json()
+            with self._lock, open(self.path, "a") as f:
+                f.write(line + "\n")
+            return None
+        except (OSError, TypeError, ValueError) as e:
+            return Exception(f"Could not record trade to {self.path}: {e}")
+
+
+def load_recorded_trades(path: str) -> Union[List[RecordedTrade], Exception]:
+    """Read a recording, skipping blank lines."""
+    trades = []
+    try:
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    trades.append(RecordedTrade.from_json(line))
+                except (ValueError, TypeError, KeyError) as e:
+                    return Exception(f"{path}:{line_number}: invalid trade record: {e}")
+    except OSError as e:
+        return Exception(f"Could not read recording {path}: {e}")
+    return trades
+
+
+@dataclass
+class ReconciledTrade:
+    trade: RecordedTrade
+    actual: int  # base units reported by the adapter
+    fixed_point: int  # base units predicted by lmsr_fixed_point
+    float_calculator: float  # base units predicted by lmsr_calculator
+
+    @property
+    def fixed_point_delta(self) -> int:
+        return self.fixed_point - self.actual
+
+    @property
+    def float_delta(self) -> float:
+        return self.float_calculator - self.actual
+
+
+@dataclass
+class ReconciliationReport:
+    trades: List[ReconciledTrade] = field(default_factory=list)
+    skipped: int = 0  # trades without a usable response
+
+    @property
+    def fixed_point_mismatches(self) -> List[ReconciledTrade]:
+        return [trade for trade in self.trades if trade.fixed_point_delta != 0]
+
+    @property
+    def float_mismatches(self) -> List[ReconciledTrade]:
+        return [trade for trade in self.trades if int(trade.float_calculator) != trade.actual]
+
+    @property
+    def exact(self) -> bool:
+        return bool(self.trades) and not self.fixed_point_mismatches
+
+    def __str__(self) -> str:
+        total = len(self.trades)
+        result = f"Reconciled {total} trades ({self.skipped} skipped)\n"
+        if not total:
+            return result.strip()
+
+        for name, mismatches, deltas in (
+            ("fixed point", self.fixed_point_mismatches, [abs(t.fixed_point_delta) for t in self.trades]),
+            ("float calculator", self.float_mismatches, [abs(t.float_delta) for t in self.trades]),
+        ):
+            result += (f"  {name}: {total - len(mismatches)}/{total} exact, "
+                       f"max |delta| {max(deltas):.0f} base units\n")
+        for reconciled in self.fixed_point_mismatches[:10]:
+            trade = reconciled.trade
+            result += (f"  ✗ {trade.side} pool {trade.pool_id} ({trade.schema}) option {trade.option} "
+                       f"amount {trade.amount}: adapter {reconciled.actual}, "
+                       f"fixed point {reconciled.fixed_point} ({reconciled.fixed_point_delta:+d})\n")
+        return result.strip()
+
+
+def reconcile_trade(trade: RecordedTrade) -> Union[ReconciledTrade, Exception]:
+    """Re-quote one recorded trade with both engines."""
+    actual = trade.actual_units
+    if actual is None:
+        return Exception(f"Trade on pool {trade.pool_id} has no {RESPONSE_FIELDS[trade.side]} in its response")
+    if trade.option not in (0, 1):
+        return Exception(f"Trade on pool {trade.pool_id} is not on a binary option ({trade.option})")
+
+    pool = trade.pool
+    state = (pool.initial_liquidity_A, pool.initial_liquidity_B, pool.current_q_A, pool.current_q_B)
+    units = tokens_to_micro_units(trade.amount)
+    is_option_A = trade.option == 0
+
+    if trade.side == "buy":
+        fixed_point = calculate_fixed_shares_to_buy(*state, units, is_option_A, fee_bps=trade.fee_bps)
+        float_quote = calculate_shares_to_buy(*state, float(units), is_option_A)
+        if not isinstance(fixed_point, Exception):
+            fixed_point = fixed_point[0]
+        if not isinstance(float_quote, Exception):
+            float_quote = float(float_quote[0])
+    else:
+        fixed_point = calculate_fixed_proceeds_for_sell(*state, units, is_option_A, fee_bps=trade.fee_bps)
+        float_quote = calculate_proceeds_for_sell(*state, float(units), is_option_A)
+
+    for quote in (fixed_point, float_quote):
+        if isinstance(quote, Exception):
+            return Exception(f"Could not re-quote {trade.side} on pool {trade.pool_id}: {quote}")
+
+    return ReconciledTrade(trade=trade, actual=actual, fixed_point=fixed_point, float_calculator=float_quote)
+
+
+def reconcile_trades(trades: Iterable[RecordedTrade]) -> ReconciliationReport:
+    report = ReconciliationReport()
+    for trade in trades:
+        reconciled = reconcile_trade(trade)
+        if isinstance(reconciled, Exception):
+            report.skipped += 1
+            continue
+        report.trades.append(reconciled)
+    return report
+
+
+def record_simulated_trades(
+    simulator,
+    pools_by_schema: Dict[str, Iterable[int]],
+    num_trades: int,
+    seed: Optional[int] = None,
+    recorder: Optional[TradeRecorder] = None
+) -> List[RecordedTrade]:
+    """
+    Trade against a MarketplaceSimulator and record every fill with its pre-trade state.
+
+    Roughly a third of the trades sell back part of an earlier fill. Only useful
+    as a smoke test: the simulator fills with one of the engines being checked.
+
+    Returns:
+        The recorded trades, in execution order
+    """
+    rng = random.Random(seed)
+    pools = [(schema, pool_id) for schema, ids in pools_by_schema.items() for pool_id in ids]
+    holdings: List[tuple] = []
+    trades = []
+
+    for _ in range(num_trades):
+        if holdings and rng.random() < 0.35:
+            index = rng.randrange(len(holdings))
+            schema, pool_id, option, shares = holdings[index]
+            side, amount = "sell", round(shares * rng.uniform(0.1, 1.0), 6)
+        else:
+            schema, pool_id = rng.choice(pools)
+            option = rng.randint(0, 1)
+            side, amount = "buy", round(rng.choice([0.5, 1, 5, 20, 100]) * rng.uniform(0.5, 1.5), 2)
+
+        pool = simulator.get_lmsr_data(pool_id, schema)
+        if isinstance(pool, Exception):
+            continue
+        if side == "buy":
+            status, body = simulator.buy_shares(schema, pool_id, option, amount)
+        else:
+            status, body = simulator.sell_shares(schema, pool_id, option, amount)
+        if status != 200:
+            continue
+
+        if side == "buy":
+            holdings.append((schema, pool_id, option, body["sharesMinted"]))
+        else:
+            remaining = holdings[index][3] - amount
+            if remaining > 1e-6:
+                holdings[index] = (schema, pool_id, option, remaining)
+            else:
+                holdings.pop(index)
+
+        trade = RecordedTrade(side, schema, pool_id, option, amount, pool, body)
+        trades.append(trade)
+        if recorder is not None:
+            recorder.record(trade)
+
+    return trades
+
+
+if __name__ == "__main__":
+    from .marketplace_simulator import create_simulated_marketplaces
+
+    # Self-consistency smoke test: the simulator fills with the fixed-point engine itself
+    simulator, pools_by_schema = create_simulated_marketplaces(6, seed=7, fixed_point=True)
+    print(reconcile_trades(record_simulated_trades(simulator, pools_by_schema, 200, seed=7)))
@@ -11,17 +11,28 @@ This module:
 
 import requests
 import json
-from typing import Dict, List, Union, Optional
+import time
+from typing import Callable, Dict, List, Union, Optional
 from dataclasses import dataclass
+from .adapter_reconciliation import RecordedTrade, TradeRecorder
+from .get_lmsr_data import (
+    LMSRData,
+    LMSRDataCache,
+    get_lmsr_data_with_auto_connection
+)
+from .lmsr_fixed_point import base_units_from_tokens
 from .optimal_betting import (
     PoolConfig, 
     find_optimal_allocation, 
     compare_two_pools,
     OptimizationMethod,
     MarketType,
+    AllocationResult,
     OptimalAllocation,
     OptimalBettingResult
 )
+from .metrics import record_cache_stats
+from .telemetry import span
 
 # Schema to endpoint mapping
 SCHEMA_TO_ENDPOINT = {
@@ -131,9 +142,26 @@ class ExecutionResult:
 class BetExecutor:
     """Execute optimal betting strategies via API calls."""
     
-    def __init__(self, base_url: str = "http://localhost:3000", timeout: int = 30):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:3000",
+        timeout: int = 30,
+        lmsr_data_loader: Optional[Callable[[int, str], Union[LMSRData, Exception]]] = None,
+        trade_recorder: Optional[TradeRecorder] = None
+    ):
+        """
+        Args:
+            base_url: Marketplace adapter API base URL
+            timeout: HTTP timeout per bet request in seconds
+            lmsr_data_loader: Optional (pool_id, schema) -> LMSRData source used to
+                snapshot pool state (defaults to the pool_lmsr_data_view in Postgres)
+            trade_recorder: Optional recorder that every filled buy is appended to,
+                with the snapshot it was quoted against (see adapter_reconciliation)
+        """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.lmsr_data_loader = lmsr_data_loader
+        self.trade_recorder = trade_recorder
         self.session = requests.Session()
         self.session.headers.update({'Content-Type': 'application/json'})
     
@@ -144,8 +172,31 @@ class BetExecutor:
         else:
             return Exception(f"Unknown schema: {schema}. Supported schemas: {list(SCHEMA_TO_ENDPOINT.keys())}")
     
+    def _load_pool_data(self, pool_id: int, schema: str) -> Union[LMSRData, Exception]:
+        """Cache-miss loader: one timed read of a pool's LMSR state."""
+        loader = self.lmsr_data_loader or get_lmsr_data_with_auto_connection
+        with span("db.fetch_lmsr_data", pool_id=pool_id, schema=schema) as s:
+            lmsr_data = loader(pool_id, schema)
+            if isinstance(lmsr_data, Exception):
+                s.record_error(lmsr_data)
+            return lmsr_data
+    
     def _make_bet_request(self, bet_request: BetRequest) -> BetResponse:
-        """Make a single bet request to the API."""
+        """Make a single bet request to the API (timed as an adapter span)."""
+        with span(
+            "adapter.buy_shares",
+            endpoint=bet_request.endpoint_name,
+            market_id=bet_request.market_id,
+            amount=bet_request.collateral_amount
+        ) as s:
+            response = self._send_bet_request(bet_request)
+            s.set("status_code", response.status_code)
+            if not response.success:
+                s.record_error(response.error_message)
+            return response
+    
+    def _send_bet_request(self, bet_request: BetRequest) -> BetResponse:
+        """POST a single buy-shares request and wrap the outcome in a BetResponse."""
         url = f"{self.base_url}/{bet_request.endpoint_name}/buy-shares"
         
         payload = {
@@ -209,6 +260,37 @@ class BetExecutor:
                 error_message=f"Request failed: {str(e)}"
             )
     
+    def _check_live_prices(
+        self,
+        pool_configs: List[PoolConfig],
+        option: int,
+        lmsr_cache: LMSRDataCache,
+        tolerance: float
+    ) -> List[PoolConfig]:
+        """Pre-trade check: keep the pools whose live adapter price matches the snapshot."""
+        from .price_client import check_prices_against_snapshot, fetch_prices
+        
+        markets = [
+            (SCHEMA_TO_MARKETPLACE_ID.get(pool_config.schema, 0), pool_config.pool_id)
+            for pool_config in pool_configs
+        ]
+        with span("price_check", pools=len(pool_configs), tolerance=tolerance) as s:
+            quotes = fetch_prices(markets, self.base_url, timeout=min(self.timeout, 10))
+            if isinstance(quotes, Exception):
+                # Can't verify anything; leave the decision to the optimizer as before
+                s.record_error(quotes)
+                print(f"  ⚠️  Pre-trade price check skipped: {quotes}")
+                return pool_configs
+            
+            passed, deviations = check_prices_against_snapshot(
+                pool_configs, quotes, lmsr_cache.get, option, tolerance
+            )
+            s.set("dropped", len(deviations))
+        
+        for deviation in deviations:
+            print(f"  ⚠️  Dropping pool {deviation.pool_config.pool_id} ({deviation.pool_config.schema}): {deviation.reason}")
+        return passed
+    
     def execute_optimal_allocation(
         self, 
         pool_configs: List[PoolConfig], 
@@ -216,11 +298,20 @@ class BetExecutor:
         option: int,
         optimization_method: OptimizationMethod = OptimizationMethod.GRID_SEARCH,
         min_bet_amount: float = 1.0,
-        dry_run: bool = False
+        dry_run: bool = False,
+        reoptimize_on_failure: bool = False,
+        reoptimization_deadline: float = 30.0,
+        price_check_tolerance: Optional[float] = None,
+        cost_curve_resolution: Optional[int] = None
     ) -> Union[ExecutionResult, Exception]:
         """
         Execute optimal allocation strategy across multiple pools.
         
+        Pool state is snapshotted once per execution. With reoptimize_on_failure,
+        budget from failed legs is re-allocated over the remaining healthy pools
+        (using the snapshot plus the fills just made) until it is placed, no
+        healthy pool is left, or the deadline passes.
+        
         Args:
             pool_configs: List of pool configurations
             total_amount: Total amount to bet
@@ -228,77 +319,193 @@ class BetExecutor:
             optimization_method: Optimization method to use
             min_bet_amount: Minimum bet amount per pool (smaller allocations will be skipped)
             dry_run: If True, only simulate the requests without actually making them
+            reoptimize_on_failure: If True, re-run the allocator on budget left by failed legs
+            reoptimization_deadline: Seconds after which no new re-optimization round is started
+            price_check_tolerance: If set, fetch live prices for all pools first and drop
+                pools whose quote is missing or differs from the snapshot by more than this
+            cost_curve_resolution: If set, the optimizer searches on per-pool cost-curve
+                tables with this many points (rebuilt for pools whose snapshot takes a fill)
             
         Returns:
             ExecutionResult with bet outcomes, or Exception if error
         """
         try:
-            # Find optimal allocation
-            allocation_result = find_optimal_allocation(
-                pool_configs, 
-                total_amount, 
-                option, 
-                optimization_method
-            )
-            
-            if isinstance(allocation_result, Exception):
-                return allocation_result
+            deadline = time.monotonic() + reoptimization_deadline
+            lmsr_cache = LMSRDataCache(self._load_pool_data)
+            healthy_pools = list(pool_configs)
             
-            # Convert allocation to bet requests
-            bet_requests = []
+            if price_check_tolerance is not None:
+                healthy_pools = self._check_live_prices(healthy_pools, option, lmsr_cache, price_check_tolerance)
+                if not healthy_pools:
+                    return Exception("No pools passed the pre-trade price check")
+            remaining_amount = total_amount
             
-            for alloc in allocation_result.allocations:
-                if alloc.amount_allocated < min_bet_amount:
-                    continue  # Skip very small allocations
-                
-                endpoint_name = self._get_endpoint_name(alloc.pool_config.schema)
-                if isinstance(endpoint_name, Exception):
-                    return endpoint_name
-                
-                bet_requests.append(BetRequest(
-                    market_id=alloc.pool_config.pool_id,
-                    option_index=option,
-                    collateral_amount=alloc.amount_allocated,
-                    endpoint_name=endpoint_name
-                ))
-            
-            if not bet_requests:
-                return Exception("No valid bet requests generated (all allocations below minimum)")
-            
-            # Execute bet requests
             successful_bets = []
             failed_bets = []
+            total_requests = 0
+            rounds = 0
             
-            for bet_request in bet_requests:
-                if dry_run:
-                    # Simulate successful bet for dry run
-                    response = BetResponse(
-                        success=True,
-                        market_id=bet_request.market_id,
-                        option_index=bet_request.option_index,
-                        collateral_amount=bet_request.collateral_amount,
-                        endpoint_name=bet_request.endpoint_name,
-                        response_data={"simulated": True}
+            while True:
+                rounds += 1
+                
+                # Find optimal allocation for whatever budget is still unplaced
+                with span(
+                    "optimization",
+                    method=optimization_method.value,
+                    pools=len(healthy_pools),
+                    amount=remaining_amount,
+                    round=rounds
+                ) as s:
+                    allocation_result = find_optimal_allocation(
+                        healthy_pools, 
+                        remaining_amount, 
+                        option, 
+                        optimization_method,
+                        lmsr_cache=lmsr_cache,
+                        cost_curve_resolution=cost_curve_resolution
                     )
-                    successful_bets.append(response)
-                else:
-                    response = self._make_bet_request(bet_request)
+                    if isinstance(allocation_result, Exception):
+                        s.record_error(allocation_result)
+                
+                if isinstance(allocation_result, Exception):
+                    if rounds == 1:
+                        return allocation_result
+                    print(f"  ⚠️  Re-optimization round {rounds} failed: {allocation_result}")
+                    break
+                
+                # Convert allocation to bet requests
+                planned_bets = []
+                
+                for alloc in allocation_result.allocations:
+                    if alloc.amount_allocated < min_bet_amount:
+                        continue  # Skip very small allocations
+                    
+                    endpoint_name = self._get_endpoint_name(alloc.pool_config.schema)
+                    if isinstance(endpoint_name, Exception):
+                        return endpoint_name
+                    
+                    planned_bets.append((alloc, BetRequest(
+                        market_id=alloc.pool_config.pool_id,
+                        option_index=option,
+                        collateral_amount=alloc.amount_allocated,
+                        endpoint_name=endpoint_name
+                    )))
+                
+                if not planned_bets:
+                    if rounds == 1:
+                        return Exception("No valid bet requests generated (all allocations below minimum)")
+                    break
+                
+                # Execute bet requests
+                round_failed = False
+                
+                for alloc, bet_request in planned_bets:
+                    total_requests += 1
+                    
+                    if dry_run:
+                        # Simulate successful bet for dry run
+                        response = BetResponse(
+                            success=True,
+                            market_id=bet_request.market_id,
+                            option_index=bet_request.option_index,
+                            collateral_amount=bet_request.collateral_amount,
+                            endpoint_name=bet_request.endpoint_name,
+                            response_data={"simulated": True}
+                        )
+                    else:
+                        response = self._make_bet_request(bet_request)
+                    
                     if response.success:
                         successful_bets.append(response)
+                        remaining_amount -= bet_request.collateral_amount
+                        self._apply_fill_to_cache(lmsr_cache, alloc, option, response)
                     else:
                         failed_bets.append(response)
+                        round_failed = True
+                        healthy_pools = [
+                            pool for pool in healthy_pools
+                            if (pool.pool_id, pool.schema) != (alloc.pool_config.pool_id, alloc.pool_config.schema)
+                        ]
+                
+                if not reoptimize_on_failure or not round_failed:
+                    break
+                if remaining_amount < min_bet_amount or not healthy_pools:
+                    break
+                if time.monotonic() >= deadline:
+                    print(f"  ⚠️  Re-optimization deadline reached with ${remaining_amount:.2f} unplaced")
+                    break
+                
+                print(f"  🔁 Re-optimizing ${remaining_amount:.2f} across {len(healthy_pools)} healthy pools...")
+            
+            record_cache_stats(lmsr_cache.hits, lmsr_cache.misses)
+            
+            strategy_used = f"Optimal Allocation ({optimization_method.value})"
+            if rounds > 1:
+                strategy_used += f" + {rounds - 1} re-optimization round(s)"
             
             return ExecutionResult(
                 total_amount=total_amount,
-                total_requests=len(bet_requests),
+                total_requests=total_requests,
                 successful_bets=successful_bets,
                 failed_bets=failed_bets,
-                strategy_used=f"Optimal Allocation ({optimization_method.value})"
+                strategy_used=strategy_used
             )
             
         except Exception as e:
             return Exception(f"Error in execute_optimal_allocation: {str(e)}")
     
+    def _apply_fill_to_cache(
+        self,
+        lmsr_cache: LMSRDataCache,
+        alloc: AllocationResult,
+        option: int,
+        response: BetResponse
+    ) -> None:
+        """Fold a successful leg into the pool snapshot used for re-optimization."""
+        pool_config = alloc.pool_config
+        response_data = response.response_data or {}
+        
+        if response_data.get("sharesMinted"):
+            # Adapter reports whole tokens, pool state is kept in base units
+            shares = base_units_from_tokens(float(response_data["sharesMinted"]))
+            self._record_trade(lmsr_cache, alloc, option, response)
+        elif response_data.get("simulated"):
+            shares = alloc.shares_received
+        else:
+            # Fill size unknown - force a reload of this pool on next use
+            lmsr_cache.invalidate(pool_config.pool_id, pool_config.schema)
+            return
+        
+        lmsr_cache.apply_fill(pool_config.pool_id, pool_config.schema, option, shares)
+    
+    def _record_trade(
+        self,
+        lmsr_cache: LMSRDataCache,
+        alloc: AllocationResult,
+        option: int,
+        response: BetResponse
+    ) -> None:
+        """Append a filled leg and its pre-fill snapshot to the trade recording, if enabled."""
+        if self.trade_recorder is None:
+            return
+        
+        pool_config = alloc.pool_config
+        lmsr_data = lmsr_cache.get(pool_config.pool_id, pool_config.schema)
+        if isinstance(lmsr_data, Exception) or lmsr_data.num_outcomes != 2:
+            return
+        
+        error = self.trade_recorder.record(RecordedTrade(
+            side="buy",
+            schema=pool_config.schema,
+            pool_id=pool_config.pool_id,
+            option=option,
+            amount=response.collateral_amount,
+            pool=lmsr_data,
+            response=response.response_data
+        ))
+        if error is not None:
+            print(f"  ⚠️  {error}")
+    
     def execute_two_pool_comparison(
         self,
         pool_id_1: int,
@@ -455,7 +662,13 @@ def execute_optimal_bet(
     option: int,
     base_url: str = "http://localhost:3000",
     optimization_method: OptimizationMethod = OptimizationMethod.GRID_SEARCH,
-    dry_run: bool = False
+    dry_run: bool = False,
+    reoptimize_on_failure: bool = False,
+    reoptimization_deadline: float = 30.0,
+    lmsr_data_loader: Optional[Callable[[int, str], Union[LMSRData, Exception]]] = None,
+    price_check_tolerance: Optional[float] = None,
+    trade_recorder: Optional[TradeRecorder] = None,
+    cost_curve_resolution: Optional[int] = None
 ) -> Union[ExecutionResult, Exception]:
     """
     Convenience function to execute optimal betting strategy.
@@ -467,17 +680,27 @@ def execute_optimal_bet(
         base_url: API base URL
         optimization_method: Optimization method to use
         dry_run: If True, only simulate requests
+        reoptimize_on_failure: If True, re-allocate budget from failed legs over healthy pools
+        reoptimization_deadline: Seconds after which no new re-optimization round is started
+        lmsr_data_loader: Optional (pool_id, schema) loader overriding the database view
+        price_check_tolerance: If set, drop pools whose live price differs from the snapshot by more
+        trade_recorder: Optional recorder for filled buys (reconciled with reconcile_adapter.py)
+        cost_curve_resolution: If set, search on per-pool cost-curve tables with this many points
         
     Returns:
         ExecutionResult with bet outcomes, or Exception if error
     """
-    executor = BetExecutor(base_url=base_url)
+    executor = BetExecutor(base_url=base_url, lmsr_data_loader=lmsr_data_loader, trade_recorder=trade_recorder)
     return executor.execute_optimal_allocation(
         pool_configs, 
         total_amount, 
         option, 
         optimization_method,
-        dry_run=dry_run
+        dry_run=dry_run,
+        reoptimize_on_failure=reoptimize_on_failure,
+        reoptimization_deadline=reoptimization_deadline,
+        price_check_tolerance=price_check_tolerance,
+        cost_curve_resolution=cost_curve_resolution
     )
 
 def execute_two_pool_bet(
@@ -1,7 +1,7 @@
 import os
 import psycopg2
-from typing import Optional, Tuple, Union
-from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass, replace
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -31,14 +31,61 @@ Mapping to LMSRData:
 - initial_liquidity_B = lmsr_no_usdc_initial_liquidity  (option 1 = NO = B)
 - current_q_A = lmsr_yes_token_supply                   (option 0 = YES = A)
 - current_q_B = lmsr_no_token_supply                    (option 1 = NO = B)
+
+Token supplies are stored in base units; the marketplace adapter reports
+minted shares in whole tokens (base units / LMSR_TOKEN_BASE_UNITS).
+
+Categorical (n-outcome) pools carry per-outcome vectors in initial_liquidity
+and current_q (see LMSRData.from_outcomes); the A/B fields then mirror
+outcomes 0 and 1 so binary-only code keeps working. pool_lmsr_data_view only
+has YES/NO columns, so pools read from the database are always binary;
+categorical state has to come from an lmsr_data_loader that provides it.
 """
 
-@dataclass
+# Outcome tokens use 6 decimals, same as USDC
+LMSR_TOKEN_BASE_UNITS = 1_000_000
+
+@dataclass(slots=True)
 class LMSRData:
     initial_liquidity_A: float
     initial_liquidity_B: float
     current_q_A: float
     current_q_B: float
+    # Per-outcome values for categorical pools (None for binary YES/NO pools)
+    initial_liquidity: Optional[Tuple[float, ...]] = None
+    current_q: Optional[Tuple[float, ...]] = None
+
+    @classmethod
+    def from_outcomes(cls, initial_liquidity: Sequence[float], current_q: Sequence[float]) -> "LMSRData":
+        """Build pool state for any number of outcomes (binary pools stay in A/B form)."""
+        initial_liquidity = tuple(float(value) for value in initial_liquidity)
+        current_q = tuple(float(value) for value in current_q)
+        if len(initial_liquidity) != len(current_q) or len(initial_liquidity) < 2:
+            raise ValueError("initial_liquidity and current_q need one entry per outcome (at least 2)")
+
+        categorical = len(initial_liquidity) > 2
+        return cls(
+            initial_liquidity_A=initial_liquidity[0],
+            initial_liquidity_B=initial_liquidity[1],
+            current_q_A=current_q[0],
+            current_q_B=current_q[1],
+            initial_liquidity=initial_liquidity if categorical else None,
+            current_q=current_q if categorical else None
+        )
+
+    @property
+    def num_outcomes(self) -> int:
+        return len(self.current_q) if self.current_q is not None else 2
+
+    def liquidity_vector(self) -> Tuple[float, ...]:
+        if self.initial_liquidity is not None:
+            return self.initial_liquidity
+        return (self.initial_liquidity_A, self.initial_liquidity_B)
+
+    def q_vector(self) -> Tuple[float, ...]:
+        if self.current_q is not None:
+            return self.current_q
+        return (self.current_q_A, self.current_q_B)
 
 def get_db_connection():
     """
@@ -264,6 +311,113 @@ def get_lmsr_data_with_auto_connection(pool_id: int, schema: str = None) -> Unio
     except Exception as e:
         return Exception(f"Error in get_lmsr_data_with_auto_connection: {str(e)}")
 
+class LMSRDataCache:
+    """
+    In-process snapshot of pool_lmsr_data_view rows, keyed by (schema, pool_id).
+
+    Rows are loaded on first use and reused until invalidated, so an optimizer
+    evaluating many candidate allocations hits the database once per pool.
+    Fills made by the executor can be applied to the snapshot so that a
+    re-optimization sees post-trade pool state without another round trip.
+    Values derived from a pool's state (see derived) are dropped whenever that
+    state changes.
+    """
+
+    def __init__(self, loader: Optional[Callable[[int, str], Union[LMSRData, Exception]]] = None):
+        """
+        Args:
+            loader: Callable (pool_id, schema) -> LMSRData | Exception used on a
+                cache miss (defaults to get_lmsr_data_with_auto_connection)
+        """
+        self.loader = loader or get_lmsr_data_with_auto_connection
+        self._entries: Dict[Tuple[str, int], LMSRData] = {}
+        self._derived: Dict[Tuple[str, int], Dict[Any, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pool_id: int, schema: str = None) -> Union[LMSRData, Exception]:
+        """Return the cached snapshot for a pool, loading it on a miss."""
+        if schema is None:
+            schema = get_schema()
+
+        key = (schema, pool_id)
+        if key in self._entries:
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        lmsr_data = self.loader(pool_id, schema)
+        if not isinstance(lmsr_data, Exception):
+            self._entries[key] = lmsr_data
+        self._derived.pop(key, None)
+        return lmsr_data
+
+    def put(self, pool_id: int, schema: str, lmsr_data: LMSRData) -> None:
+        """Seed or overwrite the snapshot for a pool."""
+        self._entries[(schema, pool_id)] = lmsr_data
+        self._derived.pop((schema, pool_id), None)
+
+    def derived(self, pool_id: int, schema: str = None) -> Dict[Any, Any]:
+        """
+        Scratch dict for values computed from one pool's snapshot (e.g. the
+        cost-curve tables of optimal_betting), cleared by put, apply_fill and
+        invalidate so nothing outlives the state it was computed from.
+        """
+        if schema is None:
+            schema = get_schema()
+        return self._derived.setdefault((schema, pool_id), {})
+
+    def apply_fill(self, pool_id: int, schema: str, option: int, shares: float) -> Union[LMSRData, Exception]:
+        """
+        Add freshly minted shares to the cached q of the given option.
+
+        Args:
+            pool_id: The pool ID the fill happened in
+            schema: Database schema of the pool
+            option: Option that was bought (0 for A/YES, 1 for B/NO; outcome index in categorical pools)
+            shares: Shares minted, in base units (same unit as current_q_A/B)
+
+        Returns:
+            The updated LMSRData, or Exception if the pool is not cached
+        """
+        key = (schema, pool_id)
+        if key not in self._entries:
+            return Exception(f"Pool {pool_id} ({schema}) is not cached")
+
+        lmsr_data = self._entries[key]
+        if not 0 <= option < lmsr_data.num_outcomes:
+            return Exception(f"Invalid option {option} for a {lmsr_data.num_outcomes}-outcome pool")
+
+        if lmsr_data.current_q is not None:
+            current_q = list(lmsr_data.current_q)
+            current_q[option] += shares
+            lmsr_data = replace(
+                lmsr_data,
+                current_q=tuple(current_q),
+                current_q_A=current_q[0],
+                current_q_B=current_q[1]
+            )
+        elif option == 0:
+            lmsr_data = replace(lmsr_data, current_q_A=lmsr_data.current_q_A + shares)
+        else:
+            lmsr_data = replace(lmsr_data, current_q_B=lmsr_data.current_q_B + shares)
+
+        self._entries[key] = lmsr_data
+        self._derived.pop(key, None)
+        return lmsr_data
+
+    def invalidate(self, pool_id: int = None, schema: str = None) -> None:
+        """Drop one pool (or everything, if pool_id is None) from the cache."""
+        if pool_id is None:
+            self._entries.clear()
+            self._derived.clear()
+            return
+
+        if schema is None:
+            schema = get_schema()
+        self._entries.pop((schema, pool_id), None)
+        self._derived.pop((schema, pool_id), None)
+
 def get_current_prices_from_db(pool_id: int, schema: str = None) -> Union[Tuple[float, float], Exception]:
     """
     Get current prices for a pool directly from the database.
@@ -310,6 +310,114 @@ def calculate_shares_to_buy_with_params(
 
     return (final_shares, final_cost_diff) 
 
+def calculate_proceeds_for_sell(
+    initial_liquidity_A: float,
+    initial_liquidity_B: float,
+    current_q_A: float,
+    current_q_B: float,
+    shares: float,
+    is_option_A: bool
+) -> Union[float, Exception]:
+    # Get initial parameters
+    params = calculate_initial_lmsr_params(initial_liquidity_A, initial_liquidity_B)
+
+    if isinstance(params, Exception):
+        return params
+
+    return calculate_proceeds_for_sell_with_params(params, current_q_A, current_q_B, shares, is_option_A)
+
+def calculate_proceeds_for_sell_with_params(
+    params: LMSRParams,
+    current_q_A: float,
+    current_q_B: float,
+    shares: float,
+    is_option_A: bool
+) -> Union[float, Exception]:
+    # Shares can only be sold back out of the outstanding supply of that option
+    supply = current_q_A if is_option_A else current_q_B
+    if shares < 0.0:
+        return Exception('Shares to sell must be non-negative')
+    if shares > supply:
+        return Exception(f'Cannot sell {shares} shares, only {supply} outstanding')
+
+    # Price the sale as the mirror image of buying the same shares back from
+    # the post-sale state, in the same factored form calculate_shares_to_buy uses
+    # (keeps fast_exp on non-negative share offsets)
+    b = params.b
+    total_q_A = params.initial_q_A + current_q_A - (shares if is_option_A else 0.0)
+    total_q_B = params.initial_q_B + current_q_B - (0.0 if is_option_A else shares)
+    exp_q_A = fast_exp(total_q_A / b)
+    exp_q_B = fast_exp(total_q_B / b)
+
+    cost_after = b * fast_ln(exp_q_A + exp_q_B)
+    cost_before = (
+        b * fast_ln(exp_q_A * fast_exp(shares / b) + exp_q_B) if is_option_A
+        else b * fast_ln(exp_q_A + exp_q_B * fast_exp(shares / b))
+    )
+
+    return max(0.0, cost_before - cost_after)
+
+def shares_to_sell_for_target(
+    initial_liquidity_A: float,
+    initial_liquidity_B: float,
+    current_q_A: float,
+    current_q_B: float,
+    target_amount: float,
+    is_option_A: bool,
+    max_shares: Optional[float] = None
+) -> Union[Tuple[float, float], Exception]:
+    # Get initial parameters
+    params = calculate_initial_lmsr_params(initial_liquidity_A, initial_liquidity_B)
+
+    if isinstance(params, Exception):
+        return params
+
+    return shares_to_sell_for_target_with_params(
+        params, current_q_A, current_q_B, target_amount, is_option_A, max_shares
+    )
+
+def shares_to_sell_for_target_with_params(
+    params: LMSRParams,
+    current_q_A: float,
+    current_q_B: float,
+    target_amount: float,
+    is_option_A: bool,
+    max_shares: Optional[float] = None
+) -> Union[Tuple[float, float], Exception]:
+    # Fewest shares whose sale returns at least target_amount, capped by what is held
+    supply = current_q_A if is_option_A else current_q_B
+    limit = supply if max_shares is None else min(max_shares, supply)
+
+    max_proceeds = calculate_proceeds_for_sell_with_params(params, current_q_A, current_q_B, limit, is_option_A)
+    if isinstance(max_proceeds, Exception):
+        return max_proceeds
+    if max_proceeds < target_amount:
+        return Exception(f'Target {target_amount} exceeds proceeds {max_proceeds} of selling {limit} shares')
+    if target_amount <= 0.0:
+        return (0.0, 0.0)
+
+    # Proceeds grow with shares sold, so binary search on whole base units
+    low = 0
+    high = int(math.ceil(limit))
+    while high - low > 1:
+        shares = (low + high) // 2
+        proceeds = calculate_proceeds_for_sell_with_params(
+            params, current_q_A, current_q_B, min(float(shares), limit), is_option_A
+        )
+        if isinstance(proceeds, Exception):
+            return proceeds
+        if proceeds >= target_amount:
+            high = shares
+        else:
+            low = shares
+
+    final_shares = min(float(high), limit)
+    final_proceeds = calculate_proceeds_for_sell_with_params(params, current_q_A, current_q_B, final_shares, is_option_A)
+    if isinstance(final_proceeds, Exception):
+        return final_proceeds
+
+    return (final_shares, final_proceeds)
+
 if __name__ == "__main__":
     print(calculate_current_prices(
         initial_liquidity_A=411600000,
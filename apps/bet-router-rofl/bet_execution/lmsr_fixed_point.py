@@ -0,0 +1,489 @@
+"""
+Fixed-point LMSR engine in the marketplace's integer units.
+
+The marketplace settles in integers: collateral in micro-USDC (6 decimals,
+u64), outcome tokens in base units (6 decimals, u64), and the pool account
+keeps b, the initial q's and the fee as i64 fixed-point values scaled by
+FIXED_POINT_SCALE (1e9). lmsr_calculator evaluates the same curve with floats,
+so it can't carry that rounding. This engine quotes with integers only:
+- Amounts come in as micro-USDC, converted from whole tokens the way the
+  adapter does (tokens * 1e6, truncated)
+- Every product/quotient is truncated toward zero like the program's i128
+  arithmetic; exp uses the marketplace's cubic approximation and ln is a
+  fixed-point atanh series
+- Buys follow the marketplace search (linear path under 10 micro-USDC, then
+  10 bisection steps capped at amount * 50) and mint whole base units
+- Sell proceeds are floored to whole micro-USDC
+- fee_bps is taken from the input collateral on buys and from the proceeds
+  on sells
+
+Every function accepts Python ints or numpy object arrays of them, so a batch
+of amounts is quoted in lock-step (calculate_fixed_shares_for_amounts) with
+results identical to quoting each amount alone.
+
+The program's source isn't in this tree: the rounding above is modelled on the
+IDL's fields and the adapter's unit conversions and has not been checked
+against a live recording yet. Until reconcile_adapter.py passes on one, the
+optimizer and sell planner quote with lmsr_calculator unless
+LMSR_FIXED_POINT_QUOTES=true.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from .get_lmsr_data import LMSRData, LMSR_TOKEN_BASE_UNITS
+from .lmsr_calculator import calculate_initial_lmsr_params
+
+# Scale of the pool account's fixed-point fields
+FIXED_POINT_SCALE = 1_000_000_000
+# Micro-USDC per whole token
+MICRO_UNITS = LMSR_TOKEN_BASE_UNITS
+
+I64_MAX = 2 ** 63 - 1
+I64_MIN = -2 ** 63
+BASIS_POINTS = 10_000
+# e^10 as used by the marketplace's fast_exp, in fixed point
+EXP_10 = 22_026_465_794_806
+EXP_MINUS_10 = FIXED_POINT_SCALE * FIXED_POINT_SCALE // EXP_10
+LN_2 = 693_147_180
+# Same bound fast_ln gives a non-positive argument
+MIN_LN = -100 * FIXED_POINT_SCALE
+# The marketplace's binary search
+SEARCH_ITERATIONS = 10
+SEARCH_RANGE_MULTIPLIER = 50
+LINEAR_QUOTE_THRESHOLD = 10
+# Below this many amounts, quoting each one on its own beats the object-array lanes
+MIN_LOCKSTEP_LANES = 32
+
+# Default engine for LMSRMarket and find_optimal_sell on binary pools
+FIXED_POINT_QUOTES = os.getenv("LMSR_FIXED_POINT_QUOTES", "false").lower() == "true"
+
+Fixed = Union[int, np.ndarray]
+
+
+@dataclass(frozen=True)
+class FixedLMSRParams:
+    b: int
+    initial_q_A: int
+    initial_q_B: int
+    fee_bps: int = 0
+
+
+def tokens_to_micro_units(tokens: float) -> int:
+    """Whole tokens to micro units, truncated like the adapter's tokensToLamports."""
+    return int(tokens * MICRO_UNITS)
+
+
+def base_units_from_tokens(tokens: float) -> int:
+    """Recover the integer base units behind an adapter response (lamportsToTokens is exact division)."""
+    return int(round(tokens * MICRO_UNITS))
+
+
+def micro_units_to_tokens(units: Union[int, np.ndarray]) -> Union[float, np.ndarray]:
+    return units / MICRO_UNITS
+
+
+def _tdiv(numerator: Fixed, denominator: int) -> Fixed:
+    """Integer division truncated toward zero (denominator > 0), like Rust's i128 `/`."""
+    quotient = abs(numerator) // denominator
+    return quotient * (1 - 2 * (numerator < 0))
+
+
+def _tdiv_by(numerator: Fixed, denominator: Fixed) -> Fixed:
+    """Truncating division by a positive per-lane denominator."""
+    quotient = abs(numerator) // denominator
+    return quotient * (1 - 2 * (numerator < 0))
+
+
+def fixed_mul(a: Fixed, b: Fixed) -> Fixed:
+    return _tdiv(a * b, FIXED_POINT_SCALE)
+
+
+def fixed_div(a: Fixed, b: Fixed) -> Fixed:
+    return _tdiv_by(a * FIXED_POINT_SCALE, b)
+
+
+def _select(condition, if_true, if_false):
+    """Branch on a scalar or per lane."""
+    if isinstance(condition, np.ndarray):
+        return np.where(condition, if_true, if_false).astype(object)
+    return if_true if condition else if_false
+
+
+def fixed_exp(x: Fixed) -> Fixed:
+    """The marketplace's fast_exp (cubic, linear above 10, constant below -10) in fixed point."""
+    scale = FIXED_POINT_SCALE
+    if not isinstance(x, np.ndarray):
+        # Scalar quotes only evaluate the branch they take
+        if x > 10 * scale:
+            return fixed_mul(EXP_10, x - 10 * scale)
+        if x < -10 * scale:
+            return EXP_MINUS_10
+
+    x2 = fixed_mul(x, x)
+    x3 = fixed_mul(x2, x)
+    cubic = scale + x + _tdiv(x2, 2) + _tdiv(x3, 6)
+    if not isinstance(x, np.ndarray):
+        return cubic
+    above = fixed_mul(EXP_10, x - 10 * scale)
+    return _select(x > 10 * scale, above, _select(x < -10 * scale, EXP_MINUS_10, cubic))
+
+
+def _fixed_ln_scalar(x: int) -> int:
+    if x <= 0:
+        return MIN_LN
+
+    scale = FIXED_POINT_SCALE
+    # x = y * 2^k with y in [1, 2)
+    k = x.bit_length() - scale.bit_length()
+    y = x >> k if k >= 0 else x << -k
+    if y >= 2 * scale:
+        y >>= 1
+        k += 1
+    elif y < scale:
+        y <<= 1
+        k -= 1
+
+    # ln(y) = 2 * atanh(z), z = (y - 1) / (y + 1) <= 1/3; every term is non-negative,
+    # so floor division is the same as truncation here
+    z = (y - scale) * scale // (y + scale)
+    z2 = z * z // scale
+    term = z
+    total = 0
+    n = 1
+    while term:
+        total += term // n
+        term = term * z2 // scale
+        n += 2
+
+    return k * LN_2 + 2 * total
+
+
+_fixed_ln_lanes = np.frompyfunc(_fixed_ln_scalar, 1, 1)
+
+
+def fixed_ln(x: Fixed) -> Fixed:
+    """Natural log in fixed point (MIN_LN for non-positive input, like fast_ln)."""
+    if isinstance(x, np.ndarray):
+        return _fixed_ln_lanes(x)
+    return _fixed_ln_scalar(int(x))
+
+
+def _to_i64(value: float) -> int:
+    """Store a float as an i64 fixed-point field (Rust's saturating `as i64`)."""
+    return int(max(I64_MIN, min(I64_MAX, value * FIXED_POINT_SCALE)))
+
+
+@lru_cache(maxsize=1024)
+def calculate_fixed_lmsr_params(
+    initial_liquidity_A: int,
+    initial_liquidity_B: int,
+    fee_bps: int = 0
+) -> Union[FixedLMSRParams, Exception]:
+    """
+    Pool parameters as stored on the pool account.
+
+    The marketplace derives them once with the float setup in lmsr_calculator
+    and stores them truncated to FIXED_POINT_SCALE, so they are reproduced the
+    same way here.
+
+    Args:
+        initial_liquidity_A: Seeded liquidity for option A (micro-USDC)
+        initial_liquidity_B: Seeded liquidity for option B (micro-USDC)
+        fee_bps: Pool trading fee in basis points
+
+    Returns:
+        FixedLMSRParams, or Exception if error
+    """
+    if not 0 <= fee_bps < BASIS_POINTS:
+        return Exception(f'Fee must be in [0, {BASIS_POINTS}) basis points, got {fee_bps}')
+
+    params = calculate_initial_lmsr_params(float(initial_liquidity_A), float(initial_liquidity_B))
+    if isinstance(params, Exception):
+        return params
+
+    return FixedLMSRParams(
+        b=_to_i64(params.b),
+        initial_q_A=_to_i64(params.initial_q_A),
+        initial_q_B=_to_i64(params.initial_q_B),
+        fee_bps=fee_bps
+    )
+
+
+def fixed_lmsr_params_for(lmsr_data: LMSRData, fee_bps: int = 0) -> Union[FixedLMSRParams, Exception]:
+    """FixedLMSRParams for a binary pool snapshot."""
+    if lmsr_data.num_outcomes != 2:
+        return Exception(f'Fixed-point engine only prices binary pools, got {lmsr_data.num_outcomes} outcomes')
+    return calculate_fixed_lmsr_params(
+        int(lmsr_data.initial_liquidity_A),
+        int(lmsr_data.initial_liquidity_B),
+        fee_bps
+    )
+
+
+def _take_fee(amount: Fixed, fee_bps: int) -> Fixed:
+    return amount - amount * fee_bps // BASIS_POINTS
+
+
+class _PoolCurve:
+    """Exponentials of the current state, shared by every quote against it."""
+
+    def __init__(self, params: FixedLMSRParams, current_q_A: int, current_q_B: int, is_option_A: bool):
+        scale = FIXED_POINT_SCALE
+        self.b = params.b
+        exp_q_A = fixed_exp(fixed_div(params.initial_q_A + current_q_A * scale, params.b))
+        exp_q_B = fixed_exp(fixed_div(params.initial_q_B + current_q_B * scale, params.b))
+        # The traded option's exponential scales with the shares, the other one is fixed
+        self.exp_traded, self.exp_other = (exp_q_A, exp_q_B) if is_option_A else (exp_q_B, exp_q_A)
+        self.initial_cost = fixed_mul(self.b, fixed_ln(exp_q_A + exp_q_B))
+
+    @property
+    def price(self) -> int:
+        return fixed_div(self.exp_traded, self.exp_traded + self.exp_other)
+
+    def cost_of(self, shares: Fixed) -> Fixed:
+        """Fixed-point cost of buying `shares` base units from this state."""
+        growth = fixed_exp(fixed_div(shares * FIXED_POINT_SCALE, self.b))
+        new_cost = fixed_mul(self.b, fixed_ln(fixed_mul(self.exp_traded, growth) + self.exp_other))
+        return new_cost - self.initial_cost
+
+
+def _check_supplies(current_q_A: int, current_q_B: int) -> Union[Tuple[int, int], Exception]:
+    current_q_A, current_q_B = int(current_q_A), int(current_q_B)
+    if current_q_A < 0 or current_q_B < 0:
+        return Exception('Token supplies must be non-negative')
+    return current_q_A, current_q_B
+
+
+def _quote_buy(curve: _PoolCurve, gross: Fixed, fee_bps: int) -> Tuple[Fixed, Fixed]:
+    """The marketplace's buy quote on one amount (int) or on lanes of amounts (object array)."""
+    scale = FIXED_POINT_SCALE
+    net = _take_fee(gross, fee_bps)
+    budget = net * scale
+    lanes = isinstance(gross, np.ndarray)
+
+    # Small amounts: 95% of amount / price, kept if the curve agrees it is affordable
+    linear_shares = net * (95 * scale) // (100 * max(curve.price, 1))
+    linear_ok = (net < LINEAR_QUOTE_THRESHOLD) & (curve.cost_of(linear_shares) <= budget)
+
+    # Everything else: the marketplace's 10-step bisection
+    low = np.zeros(gross.shape, dtype=object) if lanes else 0
+    high = net * SEARCH_RANGE_MULTIPLIER
+    for _ in range(SEARCH_ITERATIONS):
+        active = (high - low) > 1
+        if not (active.any() if lanes else active):
+            break
+        mid = (low + high) // 2
+        affordable = curve.cost_of(mid) <= budget
+        low = _select(active & affordable, mid, low)
+        high = _select(active, _select(affordable, high, mid), high)
+
+    shares = _select(linear_ok, linear_shares, low)
+    # Round the curve's charge up to whole micro-USDC, the fee is on top
+    costs = -(-curve.cost_of(shares) // scale) + (gross - net)
+    return shares, costs
+
+
+def calculate_fixed_shares_for_amounts(
+    params: FixedLMSRParams,
+    current_q_A: int,
+    current_q_B: int,
+    amounts: Union[int, np.ndarray],
+    is_option_A: bool
+) -> Union[Tuple[np.ndarray, np.ndarray], Exception]:
+    """
+    Base units minted for each micro-USDC amount, and what the curve charged.
+
+    Runs the marketplace's quote for all amounts in lock-step, so every lane
+    matches calculate_fixed_shares_to_buy_with_params on its own.
+
+    Args:
+        params: Pool parameters
+        current_q_A: Option A token supply (base units)
+        current_q_B: Option B token supply (base units)
+        amounts: One amount or an array of amounts (micro-USDC)
+        is_option_A: True to buy option A, False for option B
+
+    Returns:
+        (shares, costs) int64 arrays shaped like amounts, costs in micro-USDC
+        including the fee, or Exception if error
+    """
+    supplies = _check_supplies(current_q_A, current_q_B)
+    if isinstance(supplies, Exception):
+        return supplies
+
+    amounts = np.asarray(amounts)
+    if np.any(amounts < 0):
+        return Exception('Amounts must be non-negative')
+
+    curve = _PoolCurve(params, *supplies, is_option_A)
+    if amounts.size < MIN_LOCKSTEP_LANES:
+        quotes = [_quote_buy(curve, int(amount), params.fee_bps) for amount in amounts.ravel()]
+        shares = np.array([quote[0] for quote in quotes], dtype=np.int64)
+        costs = np.array([quote[1] for quote in quotes], dtype=np.int64)
+        return shares.reshape(amounts.shape), costs.reshape(amounts.shape)
+
+    # Lanes hold Python ints (the program's intermediates need 128 bits)
+    gross = np.atleast_1d(amounts).astype(np.int64).astype(object)
+    shares, costs = _quote_buy(curve, gross, params.fee_bps)
+    return shares.astype(np.int64).reshape(amounts.shape), costs.astype(np.int64).reshape(amounts.shape)
+
+
+def calculate_fixed_shares_to_buy_with_params(
+    params: FixedLMSRParams,
+    current_q_A: int,
+    current_q_B: int,
+    amount: int,
+    is_option_A: bool
+) -> Union[Tuple[int, int], Exception]:
+    supplies = _check_supplies(current_q_A, current_q_B)
+    if isinstance(supplies, Exception):
+        return supplies
+    if amount < 0:
+        return Exception('Amount must be non-negative')
+
+    curve = _PoolCurve(params, *supplies, is_option_A)
+    shares, costs = _quote_buy(curve, int(amount), params.fee_bps)
+    return (int(shares), int(costs))
+
+
+def calculate_fixed_shares_to_buy(
+    initial_liquidity_A: int,
+    initial_liquidity_B: int,
+    current_q_A: int,
+    current_q_B: int,
+    amount: int,
+    is_option_A: bool,
+    fee_bps: int = 0
+) -> Union[Tuple[int, int], Exception]:
+    # Get initial parameters
+    params = calculate_fixed_lmsr_params(int(initial_liquidity_A), int(initial_liquidity_B), fee_bps)
+
+    if isinstance(params, Exception):
+        return params
+
+    return calculate_fixed_shares_to_buy_with_params(params, current_q_A, current_q_B, amount, is_option_A)
+
+
+def calculate_fixed_proceeds_for_sell_with_params(
+    params: FixedLMSRParams,
+    current_q_A: int,
+    current_q_B: int,
+    shares: int,
+    is_option_A: bool
+) -> Union[int, Exception]:
+    supplies = _check_supplies(current_q_A, current_q_B)
+    if isinstance(supplies, Exception):
+        return supplies
+
+    current_q_A, current_q_B = supplies
+    shares = int(shares)
+    supply = current_q_A if is_option_A else current_q_B
+    if shares < 0:
+        return Exception('Shares to sell must be non-negative')
+    if shares > supply:
+        return Exception(f'Cannot sell {shares} shares, only {supply} outstanding')
+
+    # Mirror image of buying the same shares back from the post-sale state
+    curve = _PoolCurve(
+        params,
+        current_q_A - (shares if is_option_A else 0),
+        current_q_B - (0 if is_option_A else shares),
+        is_option_A
+    )
+    proceeds = max(0, curve.cost_of(shares)) // FIXED_POINT_SCALE
+    return _take_fee(proceeds, params.fee_bps)
+
+
+def calculate_fixed_proceeds_for_sell(
+    initial_liquidity_A: int,
+    initial_liquidity_B: int,
+    current_q_A: int,
+    current_q_B: int,
+    shares: int,
+    is_option_A: bool,
+    fee_bps: int = 0
+) -> Union[int, Exception]:
+    # Get initial parameters
+    params = calculate_fixed_lmsr_params(int(initial_liquidity_A), int(initial_liquidity_B), fee_bps)
+
+    if isinstance(params, Exception):
+        return params
+
+    return calculate_fixed_proceeds_for_sell_with_params(params, current_q_A, current_q_B, shares, is_option_A)
+
+
+def calculate_fixed_shares_to_sell_for_target_with_params(
+    params: FixedLMSRParams,
+    current_q_A: int,
+    current_q_B: int,
+    target_amount: int,
+    is_option_A: bool,
+    max_shares: Optional[int] = None
+) -> Union[Tuple[int, int], Exception]:
+    """Fewest base units whose sale returns at least target_amount micro-USDC, capped by max_shares."""
+    supplies = _check_supplies(current_q_A, current_q_B)
+    if isinstance(supplies, Exception):
+        return supplies
+
+    supply = supplies[0] if is_option_A else supplies[1]
+    limit = supply if max_shares is None else min(int(max_shares), supply)
+
+    max_proceeds = calculate_fixed_proceeds_for_sell_with_params(params, current_q_A, current_q_B, limit, is_option_A)
+    if isinstance(max_proceeds, Exception):
+        return max_proceeds
+    if max_proceeds < target_amount:
+        return Exception(f'Target {target_amount} exceeds proceeds {max_proceeds} of selling {limit} shares')
+    if target_amount <= 0:
+        return (0, 0)
+
+    # Proceeds grow with shares sold: smallest share count reaching the target
+    low, high = 0, limit
+    proceeds = max_proceeds
+    while high - low > 1:
+        mid = (low + high) // 2
+        mid_proceeds = calculate_fixed_proceeds_for_sell_with_params(params, current_q_A, current_q_B, mid, is_option_A)
+        if isinstance(mid_proceeds, Exception):
+            return mid_proceeds
+        if mid_proceeds >= target_amount:
+            high, proceeds = mid, mid_proceeds
+        else:
+            low = mid
+
+    return (high, proceeds)
+
+
+def calculate_fixed_current_prices(
+    initial_liquidity_A: int,
+    initial_liquidity_B: int,
+    current_q_A: int,
+    current_q_B: int
+) -> Union[Tuple[float, float], Exception]:
+    params = calculate_fixed_lmsr_params(int(initial_liquidity_A), int(initial_liquidity_B))
+
+    if isinstance(params, Exception):
+        return params
+
+    supplies = _check_supplies(current_q_A, current_q_B)
+    if isinstance(supplies, Exception):
+        return supplies
+
+    price_A = _PoolCurve(params, *supplies, True).price
+    return (price_A / FIXED_POINT_SCALE, (FIXED_POINT_SCALE - price_A) / FIXED_POINT_SCALE)
+
+
+if __name__ == "__main__":
+    pool = (411_600_000, 597_800_000, 91_972_654, 45_986_327)
+    print(calculate_fixed_current_prices(*pool))
+
+    amount = tokens_to_micro_units(25.0)
+    print(calculate_fixed_shares_to_buy(*pool, amount, True))
+    print(calculate_fixed_proceeds_for_sell(*pool, 10_000_000, True))
+
+    params = calculate_fixed_lmsr_params(pool[0], pool[1])
+    amounts = np.array([tokens_to_micro_units(tokens) for tokens in (0.000005, 1, 10, 100)])
+    print(calculate_fixed_shares_for_amounts(params, pool[2], pool[3], amounts, True))
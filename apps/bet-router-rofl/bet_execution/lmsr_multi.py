@@ -0,0 +1,251 @@
+"""
+Multi-outcome LMSR engine.
+
+Generalizes lmsr_calculator from YES/NO pools to n outcomes, with pool state
+as a vector of q's:
+- Cost C(q) = b * log(sum_i exp(q_i / b)), evaluated as a stable log-sum-exp
+- Prices are softmax(q / b)
+- Buying: C(q + s e_i) - C(q) = b * log1p(p_i * expm1(s / b)), which inverts in
+  closed form to s = b * log1p(expm1(amount / b) / p_i), so many amounts (or
+  many pools) are quoted in one vectorized call instead of a binary search
+- Selling: C(q) - C(q - s e_i) = -b * log1p(p_i * expm1(-s / b))
+
+Initial parameters follow the binary calculator: prices start at each
+outcome's share of the seeded liquidity, b = total_liquidity / ln(n) (so the
+worst-case loss is the liquidity seeded) and the favourite starts at q = 0.
+
+Binary pools are quoted with lmsr_calculator, or lmsr_fixed_point when
+LMSR_FIXED_POINT_QUOTES is set, both of which follow the marketplace's
+approximations; this engine uses exact exp/log and is what categorical pools
+are priced with. Units are the same as lmsr_calculator (base units).
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+from .get_lmsr_data import LMSRData
+from .lmsr_calculator import calculate_current_prices
+
+# Same floor lmsr_calculator gives an outcome seeded with no liquidity
+MIN_INITIAL_PRICE = 0.00001
+
+
+@dataclass
+class MultiLMSRParams:
+    b: float
+    initial_q: np.ndarray
+    initial_prices: np.ndarray
+    max_loss: float
+
+    @property
+    def num_outcomes(self) -> int:
+        return len(self.initial_q)
+
+
+def logsumexp(x: np.ndarray, axis: int = -1) -> np.ndarray:
+    """log(sum(exp(x))) along axis without overflow."""
+    x = np.asarray(x, dtype=float)
+    x_max = np.max(x, axis=axis, keepdims=True)
+    return np.squeeze(x_max, axis=axis) + np.log(np.sum(np.exp(x - x_max), axis=axis))
+
+
+def _per_pool(b: Union[float, np.ndarray]) -> np.ndarray:
+    """Broadcast b (one per pool) against the outcome axis of q."""
+    b = np.asarray(b, dtype=float)
+    return b[..., None] if b.ndim else b
+
+
+def lmsr_cost(total_q: np.ndarray, b: Union[float, np.ndarray]) -> np.ndarray:
+    """C(q) = b * logsumexp(q / b); q may be a matrix of pools x outcomes."""
+    return np.asarray(b, dtype=float) * logsumexp(np.asarray(total_q, dtype=float) / _per_pool(b))
+
+
+def lmsr_prices(total_q: np.ndarray, b: Union[float, np.ndarray]) -> np.ndarray:
+    """softmax(q / b) along the outcome axis."""
+    scaled = np.asarray(total_q, dtype=float) / _per_pool(b)
+    weights = np.exp(scaled - np.max(scaled, axis=-1, keepdims=True))
+    return weights / np.sum(weights, axis=-1, keepdims=True)
+
+
+def calculate_multi_lmsr_params(initial_liquidity: Sequence[float]) -> Union[MultiLMSRParams, Exception]:
+    liquidity = np.asarray(initial_liquidity, dtype=float)
+    num_outcomes = len(liquidity)
+
+    if num_outcomes < 2:
+        return Exception('An LMSR market needs at least 2 outcomes')
+    if np.any(liquidity < 0.0):
+        return Exception('Initial liquidity must be non-negative')
+
+    total_liquidity = float(np.sum(liquidity))
+    if total_liquidity <= 0.0:
+        return Exception('Total liquidity must be positive')
+
+    # Initial odds from the seeded liquidity, with unfunded outcomes kept just above zero
+    initial_prices = np.maximum(liquidity / total_liquidity, MIN_INITIAL_PRICE)
+    initial_prices /= np.sum(initial_prices)
+
+    b = total_liquidity / math.log(num_outcomes)
+    initial_q = b * np.log(initial_prices / np.max(initial_prices))
+
+    # Worst case: the outcome with the lowest starting q wins
+    max_loss = float(b * logsumexp(initial_q / b) - np.min(initial_q))
+
+    return MultiLMSRParams(
+        b=b,
+        initial_q=initial_q,
+        initial_prices=initial_prices,
+        max_loss=max_loss,
+    )
+
+
+def _check_state(params: MultiLMSRParams, current_q: Sequence[float], outcome: int) -> Union[np.ndarray, Exception]:
+    current_q = np.asarray(current_q, dtype=float)
+    if current_q.shape != (params.num_outcomes,):
+        return Exception(f'Expected {params.num_outcomes} outcome quantities, got {current_q.shape}')
+    if not 0 <= outcome < params.num_outcomes:
+        return Exception(f'Invalid outcome {outcome} for a {params.num_outcomes}-outcome market')
+    return current_q
+
+
+def calculate_multi_current_prices(
+    initial_liquidity: Sequence[float],
+    current_q: Sequence[float]
+) -> Union[Tuple[float, ...], Exception]:
+    params = calculate_multi_lmsr_params(initial_liquidity)
+
+    if isinstance(params, Exception):
+        return params
+
+    prices = lmsr_prices(params.initial_q + np.asarray(current_q, dtype=float), params.b)
+    return tuple(float(price) for price in prices)
+
+
+def calculate_multi_shares_for_amounts(
+    params: MultiLMSRParams,
+    current_q: Sequence[float],
+    amounts: Union[float, Sequence[float], np.ndarray],
+    outcome: int
+) -> Union[Tuple[np.ndarray, np.ndarray], Exception]:
+    """
+    Whole shares (base units) bought with each amount, and what they cost.
+
+    Args:
+        params: Pool parameters
+        current_q: Current outcome token supplies
+        amounts: One amount or an array of amounts to quote at once
+        outcome: Outcome index to buy
+
+    Returns:
+        (shares, costs) arrays shaped like amounts, or Exception if error
+    """
+    current_q = _check_state(params, current_q, outcome)
+    if isinstance(current_q, Exception):
+        return current_q
+
+    amounts = np.maximum(np.asarray(amounts, dtype=float), 0.0)
+    b = params.b
+    price = lmsr_prices(params.initial_q + current_q, b)[outcome]
+
+    # Closed-form inverse of the cost, floored to whole shares so the cost stays within amount
+    shares = np.floor(b * np.log1p(np.expm1(amounts / b) / price))
+    costs = b * np.log1p(price * np.expm1(shares / b))
+    return shares, costs
+
+
+def calculate_multi_shares_to_buy_with_params(
+    params: MultiLMSRParams,
+    current_q: Sequence[float],
+    amount: float,
+    outcome: int
+) -> Union[Tuple[int, float], Exception]:
+    result = calculate_multi_shares_for_amounts(params, current_q, amount, outcome)
+    if isinstance(result, Exception):
+        return result
+
+    shares, costs = result
+    return (int(shares), float(costs))
+
+
+def calculate_multi_shares_to_buy(
+    initial_liquidity: Sequence[float],
+    current_q: Sequence[float],
+    amount: float,
+    outcome: int
+) -> Union[Tuple[int, float], Exception]:
+    # Get initial parameters
+    params = calculate_multi_lmsr_params(initial_liquidity)
+
+    if isinstance(params, Exception):
+        return params
+
+    return calculate_multi_shares_to_buy_with_params(params, current_q, amount, outcome)
+
+
+def calculate_multi_proceeds_for_sell_with_params(
+    params: MultiLMSRParams,
+    current_q: Sequence[float],
+    shares: float,
+    outcome: int
+) -> Union[float, Exception]:
+    current_q = _check_state(params, current_q, outcome)
+    if isinstance(current_q, Exception):
+        return current_q
+    if shares < 0.0:
+        return Exception('Shares to sell must be non-negative')
+    if shares > current_q[outcome]:
+        return Exception(f'Cannot sell {shares} shares, only {current_q[outcome]} outstanding')
+
+    b = params.b
+    price = lmsr_prices(params.initial_q + current_q, b)[outcome]
+    return float(-b * math.log1p(price * math.expm1(-shares / b)))
+
+
+def calculate_multi_shares_to_sell_for_target_with_params(
+    params: MultiLMSRParams,
+    current_q: Sequence[float],
+    target_amount: float,
+    outcome: int
+) -> Union[Tuple[float, float], Exception]:
+    current_q = _check_state(params, current_q, outcome)
+    if isinstance(current_q, Exception):
+        return current_q
+    if target_amount <= 0.0:
+        return (0.0, 0.0)
+
+    b = params.b
+    price = lmsr_prices(params.initial_q + current_q, b)[outcome]
+    # Inverse of the sell proceeds; selling everything can never return more than b * -log(1 - p)
+    ratio = math.expm1(-target_amount / b) / price
+    if ratio <= -1.0:
+        return Exception(f'Target {target_amount} exceeds what selling outcome {outcome} can return')
+
+    shares = -b * math.log1p(ratio)
+    if shares > current_q[outcome]:
+        return Exception(f'Target {target_amount} needs {shares} shares, only {current_q[outcome]} outstanding')
+    return (shares, target_amount)
+
+
+def calculate_lmsr_data_prices(lmsr_data: LMSRData) -> Union[Tuple[float, ...], Exception]:
+    """Current prices of every outcome of a pool, binary or categorical."""
+    if lmsr_data.num_outcomes > 2:
+        return calculate_multi_current_prices(lmsr_data.liquidity_vector(), lmsr_data.q_vector())
+    return calculate_current_prices(
+        lmsr_data.initial_liquidity_A,
+        lmsr_data.initial_liquidity_B,
+        lmsr_data.current_q_A,
+        lmsr_data.current_q_B
+    )
+
+
+if __name__ == "__main__":
+    liquidity = [300_000_000, 500_000_000, 200_000_000]
+    supplies = [40_000_000, 10_000_000, 0]
+    print(calculate_multi_current_prices(liquidity, supplies))
+    print(calculate_multi_shares_to_buy(liquidity, supplies, 25_000_000, 2))
+
+    params = calculate_multi_lmsr_params(liquidity)
+    shares, costs = calculate_multi_shares_for_amounts(params, supplies, np.linspace(0, 100_000_000, 5), 2)
+    print(list(zip(shares, costs)))
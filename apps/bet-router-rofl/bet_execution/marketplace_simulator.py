@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Marketplace Simulator - in-process stand-in for the marketplace adapter and Postgres.
+
+This module:
+1. Keeps LMSR pool state in memory in integer micro-USDC / base units and
+   fills trades with the same engine the router quotes with: lmsr_calculator,
+   or lmsr_fixed_point when LMSR_FIXED_POINT_QUOTES is set (get-prices uses
+   lmsr_calculator, like the adapter)
+2. Serves /buy-shares, /sell-shares and /get-prices like marketplace-adapter-rest-api
+3. Acts as a fake pool_lmsr_data_view for LMSRDataCache / BetExecutor
+4. Injects configurable latency and errors so BetExecutor and the optimizers can
+   be load-tested on one machine
+
+The simulator can be plugged in two ways:
+- attach(executor): mounts an in-process requests transport on the executor's
+  session and points its pool snapshot at the simulator (no sockets at all)
+- serve(host, port): runs a local HTTP server for processes that only take a
+  base URL (e.g. main.py via BET_EXECUTION_BASE_URL)
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional, Set, Tuple, Union
+
+import requests
+from requests.adapters import BaseAdapter
+
+from . import telemetry
+from .bet_executor import (
+    BetExecutor,
+    ENDPOINT_TO_SCHEMA,
+    SCHEMA_TO_MARKETPLACE_ID,
+    create_pool_configs_from_market_data,
+)
+from .get_lmsr_data import LMSRData, LMSR_TOKEN_BASE_UNITS
+from .lmsr_calculator import calculate_current_prices, calculate_proceeds_for_sell, calculate_shares_to_buy
+from .lmsr_fixed_point import (
+    FIXED_POINT_QUOTES,
+    calculate_fixed_proceeds_for_sell,
+    calculate_fixed_shares_to_buy,
+    micro_units_to_tokens,
+    tokens_to_micro_units,
+)
+from .optimal_betting import OptimizationMethod
+
+@dataclass
+class SimulatedPool:
+    pool_id: int
+    schema: str
+    # Micro-USDC / token base units, as the program stores them
+    initial_liquidity_A: int
+    initial_liquidity_B: int
+    current_q_A: int = 0
+    current_q_B: int = 0
+
+    def lmsr_data(self) -> LMSRData:
+        return LMSRData(
+            initial_liquidity_A=self.initial_liquidity_A,
+            initial_liquidity_B=self.initial_liquidity_B,
+            current_q_A=self.current_q_A,
+            current_q_B=self.current_q_B
+        )
+
+class MarketplaceSimulator:
+    """In-memory LMSR marketplaces with latency and error injection."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        db_latency: float = 0.0,
+        seed: Optional[int] = None,
+        fixed_point: Optional[bool] = None
+    ):
+        """
+        Args:
+            latency: Fixed delay added to every adapter call, in seconds
+            latency_jitter: Extra uniformly distributed delay (0..jitter) per adapter call
+            error_rate: Probability (0-1) that an adapter call returns HTTP 500
+            db_latency: Delay added to every fake pool_lmsr_data_view read, in seconds
+            seed: Seed for the latency/error random source
+            fixed_point: Fill with lmsr_fixed_point instead of lmsr_calculator
+                (defaults to LMSR_FIXED_POINT_QUOTES)
+        """
+        self.fixed_point = FIXED_POINT_QUOTES if fixed_point is None else fixed_point
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.db_latency = db_latency
+        self.failing_pools: Set[Tuple[str, int]] = set()
+        self._pools: Dict[Tuple[str, int], SimulatedPool] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.request_counts: Dict[str, int] = {}
+
+    # --- Pool state ---
+
+    def add_pool(
+        self,
+        pool_id: int,
+        schema: str,
+        initial_liquidity_A: int,
+        initial_liquidity_B: int,
+        current_q_A: int = 0,
+        current_q_B: int = 0
+    ) -> SimulatedPool:
+        """Create (or replace) a simulated pool (amounts in micro-USDC / base units)."""
+        pool = SimulatedPool(
+            pool_id,
+            schema,
+            int(initial_liquidity_A),
+            int(initial_liquidity_B),
+            int(current_q_A),
+            int(current_q_B)
+        )
+        with self._lock:
+            self._pools[(schema, pool_id)] = pool
+        return pool
+
+    def fail_pool(self, pool_id: int, schema: str, failing: bool = True) -> None:
+        """Make every adapter call for a pool fail (or stop failing)."""
+        if failing:
+            self.failing_pools.add((schema, pool_id))
+        else:
+            self.failing_pools.discard((schema, pool_id))
+
+    def get_lmsr_data(self, pool_id: int, schema: str) -> Union[LMSRData, Exception]:
+        """Fake pool_lmsr_data_view read - usable as an LMSRDataCache loader."""
+        if self.db_latency > 0:
+            time.sleep(self.db_latency)
+
+        with self._lock:
+            pool = self._pools.get((schema, pool_id))
+            if pool is None:
+                return Exception(f"No data found for pool_id {pool_id}")
+            return pool.lmsr_data()
+
+    # --- Adapter operations ---
+
+    def buy_shares(self, schema: str, market_id: int, option_index: int, collateral_amount: float) -> Tuple[int, Dict]:
+        """Buy shares of an option; returns (status_code, body) like the adapter."""
+        with self._lock:
+            pool = self._pools.get((schema, market_id))
+            if pool is None:
+                return 404, {"error": f"Unknown market {market_id}"}
+
+            # The adapter takes collateral in whole tokens and trades in micro units
+            quote = calculate_fixed_shares_to_buy if self.fixed_point else calculate_shares_to_buy
+            result = quote(
+                pool.initial_liquidity_A,
+                pool.initial_liquidity_B,
+                pool.current_q_A,
+                pool.current_q_B,
+                tokens_to_micro_units(collateral_amount),
+                option_index == 0
+            )
+            if isinstance(result, Exception):
+                return 500, {"error": str(result)}
+
+            shares = int(result[0])
+            if option_index == 0:
+                pool.current_q_A += shares
+            else:
+                pool.current_q_B += shares
+
+        return 200, {"transactionId": uuid.uuid4().hex, "sharesMinted": micro_units_to_tokens(shares)}
+
+    def sell_shares(self, schema: str, market_id: int, option_index: int, amount: float) -> Tuple[int, Dict]:
+        """Sell shares (whole tokens) of an option; returns (status_code, body)."""
+        with self._lock:
+            pool = self._pools.get((schema, market_id))
+            if pool is None:
+                return 404, {"error": f"Unknown market {market_id}"}
+
+            shares = tokens_to_micro_units(amount)
+            supply = pool.current_q_A if option_index == 0 else pool.current_q_B
+            if shares > supply:
+                return 400, {"error": f"Cannot sell {amount} shares, only {supply / LMSR_TOKEN_BASE_UNITS} outstanding"}
+
+            quote = calculate_fixed_proceeds_for_sell if self.fixed_point else calculate_proceeds_for_sell
+            proceeds = quote(
+                pool.initial_liquidity_A,
+                pool.initial_liquidity_B,
+                pool.current_q_A,
+                pool.current_q_B,
+                shares,
+                option_index == 0
+            )
+            if isinstance(proceeds, Exception):
+                return 500, {"error": str(proceeds)}
+
+            if option_index == 0:
+                pool.current_q_A -= shares
+            else:
+                pool.current_q_B -= shares
+
+        return 200, {"transactionId": uuid.uuid4().hex, "collateralReceived": micro_units_to_tokens(int(proceeds))}
+
+    def get_prices(self, schema: str, market_id: int) -> Tuple[int, Union[list, Dict]]:
+        """Current [price_A, price_B] of a market; returns (status_code, body)."""
+        with self._lock:
+            pool = self._pools.get((schema, market_id))
+            if pool is None:
+                return 500, {"error": f"Could not fetch pool state for pool {market_id}"}
+            data = pool.lmsr_data()
+
+        prices = calculate_current_prices(
+            data.initial_liquidity_A,
+            data.initial_liquidity_B,
+            data.current_q_A,
+            data.current_q_B
+        )
+        if isinstance(prices, Exception):
+            return 500, {"error": str(prices)}
+        return 200, list(prices)
+
+    def handle(self, path: str, payload: Dict) -> Tuple[int, Union[list, Dict]]:
+        """
+        Route an adapter request such as "/slaughterhouse-predictions/buy-shares".
+
+        Applies latency and error injection before dispatching.
+        """
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if len(parts) < 2:
+            return 404, {"error": f"Unknown route: {path}"}
+
+        endpoint_name, route = parts[-2], parts[-1]
+        schema = ENDPOINT_TO_SCHEMA.get(endpoint_name)
+        if schema is None:
+            return 404, {"error": f"Unknown marketplace: {endpoint_name}"}
+
+        with self._lock:
+            self.request_counts[route] = self.request_counts.get(route, 0) + 1
+            delay = self.latency + (self._random.uniform(0, self.latency_jitter) if self.latency_jitter > 0 else 0.0)
+            inject_error = self.error_rate > 0 and self._random.random() < self.error_rate
+
+        if delay > 0:
+            time.sleep(delay)
+
+        try:
+            market_id = int(payload["marketId"])
+            if inject_error or (schema, market_id) in self.failing_pools:
+                return 500, {"error": "Simulated marketplace error"}
+
+            if route == "buy-shares":
+                return self.buy_shares(schema, market_id, int(payload["optionIndex"]), float(payload["collateralAmount"]))
+            elif route == "sell-shares":
+                return self.sell_shares(schema, market_id, int(payload["optionIndex"]), float(payload["amount"]))
+            elif route == "get-prices":
+                return self.get_prices(schema, market_id)
+            else:
+                return 404, {"error": f"Unknown route: {route}"}
+        except (KeyError, TypeError, ValueError) as e:
+            return 400, {"error": f"Invalid payload: {e}"}
+
+    # --- Plumbing ---
+
+    def transport_adapter(self) -> "SimulatorTransportAdapter":
+        """requests transport adapter that answers from this simulator in-process."""
+        return SimulatorTransportAdapter(self)
+
+    def attach(self, executor: BetExecutor) -> BetExecutor:
+        """Route an executor's HTTP legs and pool snapshots to this simulator."""
+        executor.session.mount(f"{executor.base_url}/", self.transport_adapter())
+        executor.lmsr_data_loader = self.get_lmsr_data
+        return executor
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+        """
+        Serve the adapter routes over HTTP from a daemon thread.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one, see server.server_address)
+
+        Returns:
+            The running server; call shutdown() to stop it
+        """
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    status, body = 400, {"error": "Invalid JSON body"}
+                else:
+                    status, body = simulator.handle(self.path, payload)
+
+                encoded = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, format, *args):
+                pass  # Keep load tests quiet
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+class SimulatorTransportAdapter(BaseAdapter):
+    """requests adapter that hands requests to a MarketplaceSimulator without sockets."""
+
+    def __init__(self, simulator: MarketplaceSimulator):
+        super().__init__()
+        self.simulator = simulator
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            status, body = 400, {"error": "Invalid JSON body"}
+        else:
+            status, body = self.simulator.handle(requests.utils.urlparse(request.url).path, payload)
+
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(body).encode()
+        response.headers["Content-Type"] = "application/json"
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+def create_simulated_marketplaces(
+    num_pools: int,
+    seed: Optional[int] = None,
+    **simulator_kwargs
+) -> Tuple[MarketplaceSimulator, Dict[str, Iterable[int]]]:
+    """
+    Build a simulator with num_pools pools spread over the known marketplaces.
+
+    Returns:
+        (simulator, {schema: [pool_id, ...]})
+    """
+    rng = random.Random(seed)
+    simulator = MarketplaceSimulator(seed=seed, **simulator_kwargs)
+    schemas = list(SCHEMA_TO_MARKETPLACE_ID.keys())
+    pools_by_schema: Dict[str, list] = {schema: [] for schema in schemas}
+
+    for i in range(num_pools):
+        schema = schemas[i % len(schemas)]
+        pool_id = 1000 + i
+        simulator.add_pool(
+            pool_id,
+            schema,
+            initial_liquidity_A=int(rng.uniform(5, 100) * LMSR_TOKEN_BASE_UNITS),
+            initial_liquidity_B=int(rng.uniform(5, 100) * LMSR_TOKEN_BASE_UNITS)
+        )
+        pools_by_schema[schema].append(pool_id)
+
+    return simulator, pools_by_schema
+
+def run_load_test(
+    num_slips: int = 1000,
+    num_pools: int = 20,
+    pools_per_slip: int = 2,
+    workers: int = 16,
+    amount: float = 100.0,
+    optimization_method: OptimizationMethod = OptimizationMethod.GRID_SEARCH,
+    reoptimize_on_failure: bool = False,
+    seed: int = 7,
+    **simulator_kwargs
+) -> Dict[str, float]:
+    """
+    Push num_slips bet slips through BetExecutor against a simulated marketplace.
+
+    Returns:
+        Dictionary with throughput and latency statistics
+    """
+    simulator, pools_by_schema = create_simulated_marketplaces(num_pools, seed=seed, **simulator_kwargs)
+    rng = random.Random(seed)
+    all_pools = [(pool_id, SCHEMA_TO_MARKETPLACE_ID[schema]) for schema, ids in pools_by_schema.items() for pool_id in ids]
+
+    slips = []
+    for _ in range(num_slips):
+        chosen = rng.sample(all_pools, min(pools_per_slip, len(all_pools)))
+        slips.append(([pool_id for pool_id, _ in chosen], [mp_id for _, mp_id in chosen], rng.randint(0, 1)))
+
+    local = threading.local()
+
+    def execute_slip(slip) -> Tuple[float, bool]:
+        # One executor (and HTTP session) per worker thread
+        if not hasattr(local, "executor"):
+            local.executor = simulator.attach(BetExecutor(base_url="http://simulator.local"))
+
+        market_ids, marketplace_ids, option = slip
+        started = time.perf_counter()
+        pool_configs = create_pool_configs_from_market_data(market_ids, marketplace_ids)
+        result = local.executor.execute_optimal_allocation(
+            pool_configs,
+            amount,
+            option,
+            optimization_method,
+            reoptimize_on_failure=reoptimize_on_failure
+        )
+        ok = not isinstance(result, Exception) and result.success_rate > 0
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(execute_slip, slips))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in outcomes)
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+    return {
+        "slips": num_slips,
+        "elapsed_seconds": elapsed,
+        "slips_per_minute": num_slips / elapsed * 60 if elapsed > 0 else 0.0,
+        "success_rate": sum(1 for _, ok in outcomes if ok) / num_slips if num_slips else 0.0,
+        "p50_seconds": percentile(0.50),
+        "p95_seconds": percentile(0.95),
+        "p99_seconds": percentile(0.99),
+        "adapter_requests": sum(simulator.request_counts.values()),
+    }
+
+# Example usage: python -m bet_execution.marketplace_simulator --slips 2000 --latency 0.05
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test BetExecutor against a simulated marketplace")
+    parser.add_argument("--slips", type=int, default=1000, help="Number of bet slips to execute")
+    parser.add_argument("--pools", type=int, default=20, help="Number of simulated pools")
+    parser.add_argument("--pools-per-slip", type=int, default=2, help="Pools offered to each slip")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent executor threads")
+    parser.add_argument("--amount", type=float, default=100.0, help="Collateral per slip")
+    parser.add_argument("--method", default=OptimizationMethod.GRID_SEARCH.value,
+                        choices=[method.value for method in OptimizationMethod])
+    parser.add_argument("--latency", type=float, default=0.0, help="Adapter latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Adapter latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Adapter error probability (0-1)")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="Pool data read latency in seconds")
+    parser.add_argument("--reoptimize", action="store_true", help="Re-optimize budget from failed legs")
+    parser.add_argument("--span-logs", action="store_true", help="Emit per-phase JSON span logs to stderr")
+    args = parser.parse_args()
+    telemetry.TELEMETRY_JSON_LOGS = args.span_logs
+
+    print("=== Marketplace Simulator Load Test ===")
+    stats = run_load_test(
+        num_slips=args.slips,
+        num_pools=args.pools,
+        pools_per_slip=args.pools_per_slip,
+        workers=args.workers,
+        amount=args.amount,
+        optimization_method=OptimizationMethod(args.method),
+        reoptimize_on_failure=args.reoptimize,
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        error_rate=args.error_rate,
+        db_latency=args.db_latency
+    )
+
+    print(f"  Slips:          {stats['slips']}")
+    print(f"  Elapsed:        {stats['elapsed_seconds']:.2f}s")
+    print(f"  Throughput:     {stats['slips_per_minute']:.0f} slips/min")
+    print(f"  Success rate:   {stats['success_rate']:.1%}")
+    print(f"  Latency p50:    {stats['p50_seconds'] * 1000:.1f}ms")
+    print(f"  Latency p95:    {stats['p95_seconds'] * 1000:.1f}ms")
+    print(f"  Latency p99:    {stats['p99_seconds'] * 1000:.1f}ms")
+    print(f"  Adapter calls:  {stats['adapter_requests']}")
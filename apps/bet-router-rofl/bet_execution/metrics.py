@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Metrics - Prometheus text-format counters and histograms for the bet router.
+
+Dependency-free (stdlib only) so it fits the 1-CPU/512MB ROFL box:
+1. Counter / Gauge / Histogram with labels, kept in a process-wide registry
+2. record_span() turns telemetry spans into latency and error metrics
+3. start_metrics_server() serves GET /metrics from a daemon thread
+
+Exposed series:
+- bet_router_slips_processed_total{flow,outcome}
+- bet_router_slip_duration_seconds{flow}
+- bet_router_optimizer_seconds{method}
+- bet_router_adapter_request_seconds{endpoint,route}
+- bet_router_adapter_requests_total{endpoint,route,outcome}
+- bet_router_tx_send_seconds{function}, bet_router_tx_confirmation_seconds{function}
+- bet_router_tx_failures_total{function}
+- bet_router_db_query_seconds{schema}
+- bet_router_event_fetch_seconds
+- bet_router_lmsr_cache_lookups_total{result}
+- bet_router_event_lag_blocks, bet_router_chain_head_lag_blocks
+- process_cpu_seconds_total, process_resident_memory_bytes
+"""
+
+import math
+import resource
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BLOCK_LAG_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def inc_to(self, total: float, **labels) -> None:
+        """Raise the counter to a total kept elsewhere (e.g. the OS); never lowers it."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = max(self._values.get(key, 0.0), total)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> (per-bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        _update_process_metrics()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+SLIPS_PROCESSED = REGISTRY.counter(
+    "bet_router_slips_processed_total", "Bet slips processed, by flow and final status", ("flow", "outcome"))
+SLIP_DURATION = REGISTRY.histogram(
+    "bet_router_slip_duration_seconds", "Time from event pickup to final status write", ("flow",))
+OPTIMIZER_LATENCY = REGISTRY.histogram(
+    "bet_router_optimizer_seconds", "find_optimal_allocation latency per OptimizationMethod", ("method",))
+ADAPTER_LATENCY = REGISTRY.histogram(
+    "bet_router_adapter_request_seconds", "Marketplace adapter HTTP latency", ("endpoint", "route"))
+ADAPTER_REQUESTS = REGISTRY.counter(
+    "bet_router_adapter_requests_total", "Marketplace adapter requests by outcome", ("endpoint", "route", "outcome"))
+TX_SEND_LATENCY = REGISTRY.histogram(
+    "bet_router_tx_send_seconds", "Time to sign and submit a contract transaction", ("function",))
+TX_CONFIRMATION_LATENCY = REGISTRY.histogram(
+    "bet_router_tx_confirmation_seconds", "Time waiting for a transaction receipt", ("function",))
+TX_FAILURES = REGISTRY.counter(
+    "bet_router_tx_failures_total", "Contract transactions that failed or reverted", ("function",))
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    "bet_router_db_query_seconds", "pool_lmsr_data_view read latency", ("schema",))
+EVENT_FETCH_LATENCY = REGISTRY.histogram(
+    "bet_router_event_fetch_seconds", "get_logs latency per listener poll")
+LMSR_CACHE_LOOKUPS = REGISTRY.counter(
+    "bet_router_lmsr_cache_lookups_total", "LMSRDataCache lookups by result", ("result",))
+EVENT_LAG_BLOCKS = REGISTRY.histogram(
+    "bet_router_event_lag_blocks", "Blocks between an event and the chain head when it was fetched",
+    buckets=BLOCK_LAG_BUCKETS)
+CHAIN_HEAD_LAG_BLOCKS = REGISTRY.gauge(
+    "bet_router_chain_head_lag_blocks", "Unprocessed blocks behind the chain head at the last poll")
+PROCESS_CPU_SECONDS = REGISTRY.counter(
+    "process_cpu_seconds_total", "Total user and system CPU time spent in seconds")
+PROCESS_RESIDENT_MEMORY = REGISTRY.gauge(
+    "process_resident_memory_bytes", "Resident memory size in bytes")
+
+
+def _update_process_metrics() -> None:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = usage.ru_utime + usage.ru_stime
+    # Read-and-set under the counter's lock, so concurrent scrapes can't both add the same delta
+    PROCESS_CPU_SECONDS.inc_to(cpu)
+    try:
+        with open("/proc/self/statm", "r") as f:
+            PROCESS_RESIDENT_MEMORY.set(int(f.read().split()[1]) * resource.getpagesize())
+    except (OSError, IndexError, ValueError):
+        # Not Linux: fall back to peak RSS (KiB on Linux/BSD)
+        PROCESS_RESIDENT_MEMORY.set(usage.ru_maxrss * 1024)
+
+
+def record_span(finished) -> None:
+    """
+    Span listener (see telemetry.add_span_listener) feeding the latency metrics.
+
+    Args:
+        finished: A finished telemetry.Span
+    """
+    name = finished.name
+    attributes = finished.attributes
+    failed = finished.status == "error"
+
+    if name == "optimization":
+        OPTIMIZER_LATENCY.observe(finished.duration, method=attributes.get("method", "unknown"))
+    elif name.startswith("adapter."):
+        route = name.split(".", 1)[1]
+        endpoint = attributes.get("endpoint", "unknown")
+        ADAPTER_LATENCY.observe(finished.duration, endpoint=endpoint, route=route)
+        ADAPTER_REQUESTS.inc(endpoint=endpoint, route=route, outcome="error" if failed else "ok")
+    elif name == "tx.send":
+        function = attributes.get("function", "unknown")
+        TX_SEND_LATENCY.observe(finished.duration, function=function)
+        if failed:
+            TX_FAILURES.inc(function=function)
+    elif name == "tx.receipt":
+        function = attributes.get("function", "unknown")
+        TX_CONFIRMATION_LATENCY.observe(finished.duration, function=function)
+        if failed:
+            TX_FAILURES.inc(function=function)
+    elif name == "db.fetch_lmsr_data":
+        DB_QUERY_LATENCY.observe(finished.duration, schema=attributes.get("schema", "unknown"))
+    elif name == "event_fetch":
+        EVENT_FETCH_LATENCY.observe(finished.duration)
+    elif name in ("slip.buy", "slip.sell"):
+        SLIP_DURATION.observe(finished.duration, flow=name.split(".", 1)[1])
+
+
+def record_slip_outcome(flow: str, outcome: str) -> None:
+    """Count a bet slip that reached a final status ("Placed", "Failed", "Closed", ...)."""
+    SLIPS_PROCESSED.inc(flow=flow, outcome=outcome)
+
+
+def record_cache_stats(hits: int, misses: int) -> None:
+    """Add one execution's LMSRDataCache hit/miss counts."""
+    if hits:
+        LMSR_CACHE_LOOKUPS.inc(hits, result="hit")
+    if misses:
+        LMSR_CACHE_LOOKUPS.inc(misses, result="miss")
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0", registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Serve the registry at /metrics from a daemon thread.
+
+    Args:
+        port: Port to bind (0 picks a free one, see server.server_address)
+        host: Interface to bind
+        registry: Registry to expose
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes would otherwise flood the router logs
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,8 +1,18 @@
 from typing import Union, Tuple, Optional, Dict, Any, List, Callable
 from dataclasses import dataclass
-from .get_lmsr_data import get_lmsr_data_with_auto_connection, LMSRData
-from .lmsr_calculator import calculate_shares_to_buy
+from .get_lmsr_data import get_lmsr_data_with_auto_connection, LMSRData, LMSRDataCache
+from .lmsr_calculator import calculate_initial_lmsr_params, calculate_shares_to_buy_with_params
+from .lmsr_fixed_point import (
+    FIXED_POINT_QUOTES,
+    MICRO_UNITS,
+    calculate_fixed_shares_for_amounts,
+    calculate_fixed_shares_to_buy_with_params,
+    fixed_lmsr_params_for,
+    tokens_to_micro_units,
+)
+from .lmsr_multi import calculate_lmsr_data_prices, calculate_multi_lmsr_params, calculate_multi_shares_for_amounts
 import itertools
+import math
 import numpy as np
 from enum import Enum
 
@@ -12,6 +22,11 @@ try:
 except ImportError:
     SCIPY_AVAILABLE = False
 
+# Largest allocation lattice grid search enumerates in full before going coarse-to-fine
+MAX_GRID_CANDIDATES = 20_000
+# Size of the starting lattice when coarse-to-fine refinement is requested explicitly
+COARSE_GRID_CANDIDATES = 500
+
 class OptimizationMethod(Enum):
     GRID_SEARCH = "grid_search"
     BINARY_SEARCH = "binary_search"
@@ -29,16 +44,19 @@ class PoolConfig:
     name: str = ""  # Optional name for easier identification
     market_type: MarketType = MarketType.LMSR  # Default to LMSR
 
-@dataclass
+@dataclass(slots=True)
 class BettingOption:
     pool_config: PoolConfig
     is_option_A: bool
     shares: int
     actual_cost: float
     efficiency: float  # shares per dollar
+    option: Optional[int] = None  # outcome index (set for categorical pools)
     
     @property
     def option_name(self) -> str:
+        if self.option is not None:
+            return get_option_name(self.option)
         return "A (YES)" if self.is_option_A else "B (NO)"
 
 @dataclass
@@ -55,7 +73,7 @@ class OptimalBettingResult:
                 f"Efficiency: {self.best_option.efficiency:.4f} shares/$\n"
                 f"Savings: ${self.savings:.2f}")
 
-@dataclass
+@dataclass(slots=True)
 class AllocationResult:
     pool_config: PoolConfig
     amount_allocated: float
@@ -63,7 +81,7 @@ class AllocationResult:
     actual_cost: float
     efficiency: float  # shares per dollar for this allocation
 
-@dataclass
+@dataclass(slots=True)
 class OptimalAllocation:
     total_shares: int
     total_cost: float
@@ -77,6 +95,183 @@ class OptimalAllocation:
                 result += f"  {i}. Pool {alloc.pool_config.pool_id}: ${alloc.amount_allocated:.2f} → {alloc.shares_received} shares\n"
         return result.strip()
 
+@dataclass
+class CostCurveTable:
+    """
+    Monotone (amount spent → shares, cost) table for one option of one pool snapshot.
+    
+    Points are exact quotes at evenly spaced amounts from 0 to max_amount, so a
+    lookup indexes straight into the right segment and interpolates. Between
+    points the result is an estimate; exact at the points themselves.
+    """
+    step: float  # amount between consecutive points, whole collateral units
+    shares: List[int]  # base units bought with i * step
+    costs: List[float]  # what those shares cost, whole collateral units
+    
+    @property
+    def max_amount(self) -> float:
+        """Largest amount the table can answer."""
+        return self.step * (len(self.shares) - 1)
+    
+    def lookup(self, amount: float) -> Optional[Tuple[int, float]]:
+        """
+        Shares and cost for an amount, interpolated between the neighbouring points.
+        
+        Returns:
+            (shares, cost), or None if amount is beyond the table
+        """
+        if amount <= 0:
+            return (0, 0.0)
+        position = amount / self.step
+        index = int(position)
+        if index >= len(self.shares) - 1:
+            if position > len(self.shares) - 1:
+                return None
+            return (self.shares[-1], self.costs[-1])
+        
+        fraction = position - index
+        shares, costs = self.shares, self.costs
+        return (
+            int(shares[index] + fraction * (shares[index + 1] - shares[index])),
+            costs[index] + fraction * (costs[index + 1] - costs[index])
+        )
+    
+    def lookup_many(self, amounts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized lookup.
+        
+        Returns:
+            (shares, costs, covered) arrays shaped like amounts; lanes with
+            covered False are beyond the table and hold no quote
+        """
+        amounts = np.maximum(np.asarray(amounts, dtype=float), 0.0)
+        grid = np.arange(len(self.shares)) * self.step
+        covered = amounts <= grid[-1]
+        shares = np.floor(np.interp(amounts, grid, self.shares))
+        costs = np.interp(amounts, grid, self.costs)
+        return shares, costs, covered
+
+def _quote_lmsr_amounts(
+    lmsr_data: LMSRData,
+    amounts: np.ndarray,
+    option: int,
+    fixed_point: bool = False
+) -> Union[Tuple[np.ndarray, np.ndarray], Exception]:
+    """
+    Exact quotes for many amounts in one pool.
+    
+    Categorical pools use the closed-form n-outcome engine. Binary pools use
+    lmsr_calculator, or the fixed-point engine's lanes when fixed_point is set.
+    """
+    amounts = np.maximum(np.asarray(amounts, dtype=float), 0.0)
+    if lmsr_data.num_outcomes > 2:
+        params = calculate_multi_lmsr_params(lmsr_data.liquidity_vector())
+        if isinstance(params, Exception):
+            return params
+        result = calculate_multi_shares_for_amounts(params, lmsr_data.q_vector(), amounts * MICRO_UNITS, option)
+    elif not fixed_point:
+        params = calculate_initial_lmsr_params(lmsr_data.initial_liquidity_A, lmsr_data.initial_liquidity_B)
+        if isinstance(params, Exception):
+            return params
+        shares = np.zeros_like(amounts)
+        costs = np.zeros_like(amounts)
+        for index, amount in np.ndenumerate(amounts):
+            if amount <= 0:
+                continue
+            quote = calculate_shares_to_buy_with_params(
+                params, lmsr_data.current_q_A, lmsr_data.current_q_B, amount * MICRO_UNITS, option == 0
+            )
+            if isinstance(quote, Exception):
+                return quote
+            shares[index], costs[index] = quote
+        result = (shares, costs)
+    else:
+        params = fixed_lmsr_params_for(lmsr_data)
+        if isinstance(params, Exception):
+            return params
+        # Same truncation as tokens_to_micro_units, per amount
+        micro_amounts = np.trunc(amounts * MICRO_UNITS).astype(np.int64)
+        result = calculate_fixed_shares_for_amounts(
+            params, lmsr_data.current_q_A, lmsr_data.current_q_B, micro_amounts, option == 0
+        )
+    
+    if isinstance(result, Exception):
+        return result
+    shares, costs = result
+    return shares, costs / MICRO_UNITS
+
+def build_cost_curve_table(
+    lmsr_data: LMSRData,
+    option: int,
+    max_amount: float,
+    resolution: int = 256,
+    fixed_point: bool = False
+) -> Union[CostCurveTable, Exception]:
+    """
+    Tabulate a pool's cost curve for one option.
+    
+    Args:
+        lmsr_data: Pool snapshot to quote against
+        option: Option to bet on (outcome index)
+        max_amount: Largest amount the table must answer
+        resolution: Number of segments from 0 to max_amount (higher = closer to exact quotes)
+        fixed_point: Quote binary pools with the fixed-point engine instead of lmsr_calculator
+        
+    Returns:
+        CostCurveTable covering [0, max_amount], or Exception if error
+    """
+    if resolution < 1:
+        return Exception(f"Cost-curve resolution must be positive, got {resolution}")
+    if max_amount <= 0:
+        return Exception(f"Cost-curve range must be positive, got {max_amount}")
+    
+    step = max_amount / resolution
+    result = _quote_lmsr_amounts(lmsr_data, np.arange(resolution + 1) * step, option, fixed_point)
+    if isinstance(result, Exception):
+        return result
+    
+    # The adapter's search can leave a larger amount with fewer shares; keep the table monotone
+    shares, costs = result
+    return CostCurveTable(
+        step=step,
+        shares=np.maximum.accumulate(shares).astype(np.int64).tolist(),
+        costs=np.maximum.accumulate(costs).tolist()
+    )
+
+class _AllocationCandidate:
+    """
+    An allocation under evaluation, as parallel per-pool tuples.
+    
+    Optimizers compare these while searching and materialize only the winner
+    into the public OptimalAllocation / AllocationResult dataclasses.
+    """
+    __slots__ = ("amounts", "shares", "costs", "total_shares", "total_cost")
+    
+    def __init__(self, amounts: Tuple[float, ...], shares: Tuple[int, ...], costs: Tuple[float, ...]):
+        self.amounts = amounts
+        self.shares = shares
+        self.costs = costs
+        self.total_shares = sum(shares)
+        self.total_cost = sum(costs)
+    
+    def materialize(self, pool_configs: List[PoolConfig]) -> OptimalAllocation:
+        allocations = [
+            AllocationResult(
+                pool_config=pool_config,
+                amount_allocated=amount if amount > 0 else 0.0,
+                shares_received=shares,
+                actual_cost=cost,
+                efficiency=shares / cost if cost > 0 else 0.0
+            )
+            for pool_config, amount, shares, cost in zip(pool_configs, self.amounts, self.shares, self.costs)
+        ]
+        return OptimalAllocation(
+            total_shares=self.total_shares,
+            total_cost=self.total_cost,
+            allocations=allocations,
+            efficiency=self.total_shares / self.total_cost if self.total_cost > 0 else 0
+        )
+
 # Market Interface and Implementations
 class MarketInterface:
     """Abstract interface for different market types."""
@@ -88,20 +283,47 @@ class MarketInterface:
         Args:
             pool_config: Pool configuration
             amount: Amount to invest
-            option: Option to bet on (0 for A/YES, 1 for B/NO)
+            option: Option to bet on (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
             
         Returns:
             Tuple of (shares, actual_cost) or Exception if error
         """
         raise NotImplementedError("Subclasses must implement calculate_shares_and_cost")
     
+    def calculate_shares_for_amounts(
+        self,
+        pool_config: PoolConfig,
+        amounts: np.ndarray,
+        option: int
+    ) -> Union[Tuple[np.ndarray, np.ndarray], Exception]:
+        """
+        Quote many amounts in one pool at once.
+        
+        Args:
+            pool_config: Pool configuration
+            amounts: Array of amounts to invest
+            option: Option to bet on (outcome index)
+            
+        Returns:
+            (shares, costs) arrays shaped like amounts, or Exception if error
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        shares = np.zeros_like(amounts)
+        costs = np.zeros_like(amounts)
+        for index, amount in np.ndenumerate(amounts):
+            result = self.calculate_shares_and_cost(pool_config, float(amount), option)
+            if isinstance(result, Exception):
+                return result
+            shares[index], costs[index] = result
+        return shares, costs
+    
     def get_current_price(self, pool_config: PoolConfig, option: int) -> Union[float, Exception]:
         """
         Get current price for an option.
         
         Args:
             pool_config: Pool configuration
-            option: Option to get price for (0 for A/YES, 1 for B/NO)
+            option: Option to get price for (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
             
         Returns:
             Current price or Exception if error
@@ -109,7 +331,92 @@ class MarketInterface:
         raise NotImplementedError("Subclasses must implement get_current_price")
 
 class LMSRMarket(MarketInterface):
-    """LMSR Automated Market Maker implementation."""
+    """
+    LMSR Automated Market Maker implementation.
+    
+    Amounts and costs are in whole collateral tokens, shares in token base units.
+    Binary pools are quoted with lmsr_calculator on base-unit amounts, or with the
+    fixed-point engine in micro-USDC when fixed_point is set (defaults to
+    LMSR_FIXED_POINT_QUOTES). The fixed-point engine models the adapter's integer
+    rounding but is unverified until reconcile_adapter.py passes on a live
+    recording. Categorical pools use the n-outcome engine.
+    
+    With a cost_curve_resolution (and a snapshot cache to keep them on), quotes
+    are answered from per-pool CostCurveTables, rebuilt whenever the snapshot
+    of the pool changes.
+    """
+    
+    def __init__(
+        self,
+        lmsr_cache: Optional[LMSRDataCache] = None,
+        cost_curve_resolution: Optional[int] = None,
+        fixed_point: Optional[bool] = None
+    ):
+        self.lmsr_cache = lmsr_cache
+        self.cost_curve_resolution = cost_curve_resolution
+        self.fixed_point = FIXED_POINT_QUOTES if fixed_point is None else fixed_point
+    
+    @property
+    def uses_cost_curves(self) -> bool:
+        return self.cost_curve_resolution is not None and self.lmsr_cache is not None
+    
+    def _get_lmsr_data(self, pool_config: PoolConfig) -> Union[LMSRData, Exception]:
+        """Pool state from the snapshot cache when one is attached, else the database."""
+        if self.lmsr_cache is not None:
+            lmsr_data = self.lmsr_cache.get(pool_config.pool_id, pool_config.schema)
+        else:
+            lmsr_data = get_lmsr_data_with_auto_connection(pool_config.pool_id, pool_config.schema)
+        
+        if isinstance(lmsr_data, Exception):
+            return Exception(f"Error getting LMSR data for pool {pool_config.pool_id}: {lmsr_data}")
+        return lmsr_data
+    
+    def _cost_curve(
+        self,
+        pool_config: PoolConfig,
+        lmsr_data: LMSRData,
+        option: int,
+        max_amount: float
+    ) -> Union[CostCurveTable, Exception]:
+        """The pool's table for option, (re)built if missing or too short for max_amount."""
+        tables = self.lmsr_cache.derived(pool_config.pool_id, pool_config.schema)
+        key = ("cost_curve", option, self.cost_curve_resolution, self.fixed_point)
+        table = tables.get(key)
+        if table is not None and table.max_amount >= max_amount:
+            return table
+        
+        # Grow geometrically so creeping amounts don't rebuild on every call
+        span = max(max_amount, 2 * table.max_amount) if table is not None else max_amount
+        table = build_cost_curve_table(lmsr_data, option, span, self.cost_curve_resolution, self.fixed_point)
+        if not isinstance(table, Exception):
+            tables[key] = table
+        return table
+    
+    def get_cost_curve(
+        self,
+        pool_config: PoolConfig,
+        option: int,
+        max_amount: float
+    ) -> Union[CostCurveTable, Exception]:
+        """
+        Cost-curve table for a pool and option covering at least max_amount.
+        
+        Args:
+            pool_config: Pool configuration
+            option: Option to bet on (outcome index)
+            max_amount: Largest amount the table must answer
+            
+        Returns:
+            CostCurveTable, or Exception if tables are disabled or the pool can't be quoted
+        """
+        if not self.uses_cost_curves:
+            return Exception("Cost-curve tables need a cost_curve_resolution and an LMSRDataCache")
+        lmsr_data = self._get_lmsr_data(pool_config)
+        if isinstance(lmsr_data, Exception):
+            return lmsr_data
+        if not 0 <= option < lmsr_data.num_outcomes:
+            return Exception(f"Invalid option {option} for pool {pool_config.pool_id} ({lmsr_data.num_outcomes} outcomes)")
+        return self._cost_curve(pool_config, lmsr_data, option, max_amount)
     
     def calculate_shares_and_cost(self, pool_config: PoolConfig, amount: float, option: int) -> Union[Tuple[int, float], Exception]:
         """Calculate shares and cost using LMSR algorithm."""
@@ -117,42 +424,111 @@ class LMSRMarket(MarketInterface):
             if amount <= 0:
                 return (0, 0.0)
             
-            # Get LMSR data for the pool
-            lmsr_data = get_lmsr_data_with_auto_connection(pool_config.pool_id, pool_config.schema)
-            
+            lmsr_data = self._get_lmsr_data(pool_config)
             if isinstance(lmsr_data, Exception):
-                return Exception(f"Error getting LMSR data for pool {pool_config.pool_id}: {lmsr_data}")
+                return lmsr_data
+            
+            if not 0 <= option < lmsr_data.num_outcomes:
+                return Exception(f"Invalid option {option} for pool {pool_config.pool_id} ({lmsr_data.num_outcomes} outcomes)")
             
-            # Calculate shares for the specific option and amount
-            is_option_A = (option == 0)
-            shares_result = calculate_shares_to_buy(
-                lmsr_data.initial_liquidity_A,
-                lmsr_data.initial_liquidity_B,
+            if self.uses_cost_curves:
+                table = self._cost_curve(pool_config, lmsr_data, option, amount)
+                if not isinstance(table, Exception):
+                    quote = table.lookup(amount)
+                    if quote is not None:
+                        return quote
+            
+            if lmsr_data.num_outcomes > 2:
+                # Categorical pool: n-outcome engine
+                result = self.calculate_shares_for_amounts(pool_config, np.asarray(amount), option)
+                if isinstance(result, Exception):
+                    return result
+                shares, costs = result
+                return (int(shares), float(costs))
+            
+            if not self.fixed_point:
+                params = calculate_initial_lmsr_params(lmsr_data.initial_liquidity_A, lmsr_data.initial_liquidity_B)
+                if isinstance(params, Exception):
+                    return params
+                
+                # Pool state is in base units, amounts in whole tokens
+                shares_result = calculate_shares_to_buy_with_params(
+                    params,
+                    lmsr_data.current_q_A,
+                    lmsr_data.current_q_B,
+                    amount * MICRO_UNITS,
+                    option == 0
+                )
+                if isinstance(shares_result, Exception):
+                    return Exception(f"Error calculating shares: {shares_result}")
+                shares, cost = shares_result
+                return (shares, cost / MICRO_UNITS)
+            
+            params = fixed_lmsr_params_for(lmsr_data)
+            if isinstance(params, Exception):
+                return params
+            
+            # Calculate shares for the specific option and amount, in the adapter's micro units
+            shares_result = calculate_fixed_shares_to_buy_with_params(
+                params,
                 lmsr_data.current_q_A,
                 lmsr_data.current_q_B,
-                amount,
-                is_option_A
+                tokens_to_micro_units(amount),
+                option == 0
             )
             
-            if isinstance(shares_result, tuple):
-                return shares_result  # (shares, actual_cost)
-            else:
+            if isinstance(shares_result, Exception):
                 return Exception(f"Error calculating shares: {shares_result}")
+            shares, cost = shares_result
+            return (shares, cost / MICRO_UNITS)  # (shares, actual_cost)
                 
         except Exception as e:
             return Exception(f"Error in LMSRMarket.calculate_shares_and_cost: {str(e)}")
     
+    def calculate_shares_for_amounts(
+        self,
+        pool_config: PoolConfig,
+        amounts: np.ndarray,
+        option: int
+    ) -> Union[Tuple[np.ndarray, np.ndarray], Exception]:
+        """Quote many amounts at once (from the pool's cost-curve table when enabled, else exactly)."""
+        lmsr_data = self._get_lmsr_data(pool_config)
+        if isinstance(lmsr_data, Exception):
+            return lmsr_data
+        if not 0 <= option < lmsr_data.num_outcomes:
+            return Exception(f"Invalid option {option} for pool {pool_config.pool_id} ({lmsr_data.num_outcomes} outcomes)")
+        
+        amounts = np.maximum(np.asarray(amounts, dtype=float), 0.0)
+        if not self.uses_cost_curves or amounts.size == 0:
+            return _quote_lmsr_amounts(lmsr_data, amounts, option, self.fixed_point)
+        
+        table = self._cost_curve(pool_config, lmsr_data, option, float(amounts.max()))
+        if isinstance(table, Exception):
+            return _quote_lmsr_amounts(lmsr_data, amounts, option, self.fixed_point)
+        
+        shares, costs, covered = table.lookup_many(amounts)
+        if not covered.all():
+            exact = _quote_lmsr_amounts(lmsr_data, amounts[~covered], option, self.fixed_point)
+            if isinstance(exact, Exception):
+                return exact
+            shares[~covered], costs[~covered] = exact
+        return shares, costs
+    
     def get_current_price(self, pool_config: PoolConfig, option: int) -> Union[float, Exception]:
         """Get current price using LMSR algorithm."""
         try:
-            from get_lmsr_data import get_current_prices_from_db
+            lmsr_data = self._get_lmsr_data(pool_config)
+            if isinstance(lmsr_data, Exception):
+                return lmsr_data
             
-            prices = get_current_prices_from_db(pool_config.pool_id, pool_config.schema)
+            prices = calculate_lmsr_data_prices(lmsr_data)
             
             if isinstance(prices, Exception):
                 return prices
+            if not 0 <= option < len(prices):
+                return Exception(f"Invalid option {option} for pool {pool_config.pool_id} ({len(prices)} outcomes)")
             
-            return prices[option]  # 0 for A/YES, 1 for B/NO
+            return prices[option]  # outcome index (0 for A/YES, 1 for B/NO in binary pools)
             
         except Exception as e:
             return Exception(f"Error in LMSRMarket.get_current_price: {str(e)}")
@@ -193,10 +569,14 @@ class OrderBookMarket(MarketInterface):
             return Exception(f"Error in OrderBookMarket.get_current_price: {str(e)}")
 
 # Market factory
-def get_market_instance(market_type: MarketType) -> MarketInterface:
+def get_market_instance(
+    market_type: MarketType,
+    lmsr_cache: Optional[LMSRDataCache] = None,
+    cost_curve_resolution: Optional[int] = None
+) -> MarketInterface:
     """Get market instance based on market type."""
     if market_type == MarketType.LMSR:
-        return LMSRMarket()
+        return LMSRMarket(lmsr_cache, cost_curve_resolution)
     elif market_type == MarketType.ORDER_BOOK:
         return OrderBookMarket()
     else:
@@ -213,32 +593,18 @@ def get_betting_options_for_pool(
     Args:
         pool_config: Pool configuration (pool_id and schema)
         amount: Amount of money to bet
-        option: Specific option to bet on (0 for A/YES, 1 for B/NO)
+        option: Specific option to bet on (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
         
     Returns:
         List of BettingOption objects, or Exception if error
     """
     try:
-        # Get LMSR data for the pool
-        lmsr_data = get_lmsr_data_with_auto_connection(pool_config.pool_id, pool_config.schema)
-        
-        if isinstance(lmsr_data, Exception):
-            return Exception(f"Error getting LMSR data for pool {pool_config.pool_id}: {lmsr_data}")
-        
         options = []
         
-        if option not in [0, 1]:
-            return Exception(f"Invalid option: {option}. Must be 0 (A/YES) or 1 (B/NO)")
-        
-        is_option_A = (option == 0)
-        shares_result = calculate_shares_to_buy(
-            lmsr_data.initial_liquidity_A,
-            lmsr_data.initial_liquidity_B,
-            lmsr_data.current_q_A,
-            lmsr_data.current_q_B,
-            amount,
-            is_option_A
-        )
+        if option < 0:
+            return Exception(f"Invalid option: {option}. Must be an outcome index (0 for A/YES, 1 for B/NO)")
+        
+        shares_result = calculate_shares_for_allocation(pool_config, amount, option)
         
         if isinstance(shares_result, tuple):
             shares, cost = shares_result
@@ -246,16 +612,14 @@ def get_betting_options_for_pool(
             
             options.append(BettingOption(
                 pool_config=pool_config,
-                is_option_A=is_option_A,
+                is_option_A=(option == 0),
                 shares=shares,
                 actual_cost=cost,
-                efficiency=efficiency
+                efficiency=efficiency,
+                option=option
             ))
         else:
-            option_name = "A (YES)" if is_option_A else "B (NO)"
-            return Exception(f"Error calculating shares for option {option_name} in pool {pool_config.pool_id}: {shares_result}")
-        
-        
+            return Exception(f"Error calculating shares for option {get_option_name(option)} in pool {pool_config.pool_id}: {shares_result}")
         
         return options
         
@@ -273,7 +637,7 @@ def find_optimal_betting_strategy(
     Args:
         pool_configs: List of pool configurations to compare
         amount: Amount of money to bet
-        option: Specific option to bet on (0 for A/YES, 1 for B/NO)
+        option: Specific option to bet on (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
         
     Returns:
         OptimalBettingResult with the best option and comparison data, or Exception if error
@@ -331,7 +695,7 @@ def compare_two_pools(
         pool_id_2: Second pool ID
         schema_2: Second pool schema
         amount: Amount of money to bet
-        option: Specific option to bet on (0 for A/YES, 1 for B/NO)
+        option: Specific option to bet on (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
         pool_1_name: Optional name for first pool
         pool_2_name: Optional name for second pool
         
@@ -356,7 +720,7 @@ def analyze_betting_efficiency(
     Args:
         pool_configs: List of pool configurations
         amount: Amount of money to bet
-        option: Specific option to bet on (0 for A/YES, 1 for B/NO)
+        option: Specific option to bet on (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
         
     Returns:
         Dictionary with detailed analysis, or Exception if error
@@ -419,13 +783,13 @@ def find_best_pool_for_option(
     Args:
         pool_configs: List of pool configurations to compare
         amount: Amount of money to bet
-        option: Option to bet on (0 for A/YES, 1 for B/NO)
+        option: Option to bet on (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
         
     Returns:
         OptimalBettingResult with the best pool for the specified option, or Exception if error
     """
-    if option not in [0, 1]:
-        return Exception(f"Invalid option: {option}. Must be 0 (A/YES) or 1 (B/NO)")
+    if option < 0:
+        return Exception(f"Invalid option: {option}. Must be an outcome index (0 for A/YES, 1 for B/NO)")
     
     return find_optimal_betting_strategy(pool_configs, amount, option)
 
@@ -433,12 +797,18 @@ def find_best_pool_for_option(
 
 def get_option_name(option: int) -> str:
     """Helper function to get option name from option number."""
-    return "A (YES)" if option == 0 else "B (NO)"
+    if option == 0:
+        return "A (YES)"
+    if option == 1:
+        return "B (NO)"
+    return f"Outcome {option}"
 
 def calculate_shares_for_allocation(
     pool_config: PoolConfig,
     amount: float,
-    option: int
+    option: int,
+    lmsr_cache: Optional[LMSRDataCache] = None,
+    cost_curve_resolution: Optional[int] = None
 ) -> Union[Tuple[int, float], Exception]:
     """
     Calculate shares and actual cost for a specific amount in a specific pool.
@@ -446,7 +816,10 @@ def calculate_shares_for_allocation(
     Args:
         pool_config: Pool configuration
         amount: Amount to allocate to this pool
-        option: Option to bet on (0 for A/YES, 1 for B/NO)
+        option: Option to bet on (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
+        lmsr_cache: Optional pool state snapshot (queries the database per call if None)
+        cost_curve_resolution: If set (and lmsr_cache is given), answer from the pool's
+            cost-curve table with this many points instead of an exact quote
         
     Returns:
         Tuple of (shares, actual_cost) or Exception if error
@@ -456,7 +829,7 @@ def calculate_shares_for_allocation(
             return (0, 0.0)
         
         # Use market interface to calculate shares and cost
-        market = get_market_instance(pool_config.market_type)
+        market = get_market_instance(pool_config.market_type, lmsr_cache, cost_curve_resolution)
         return market.calculate_shares_and_cost(pool_config, amount, option)
             
     except Exception as e:
@@ -467,17 +840,27 @@ def find_optimal_allocation(
     total_amount: float,
     option: int,
     optimization_method: OptimizationMethod = OptimizationMethod.GRID_SEARCH,
-    precision: int = 3
+    precision: int = 3,
+    lmsr_cache: Optional[LMSRDataCache] = None,
+    cost_curve_resolution: Optional[int] = None,
+    refine_grid: bool = False
 ) -> Union[OptimalAllocation, Exception]:
     """
     Find the optimal allocation of money across pools to maximize total shares.
     
+    With cost_curve_resolution, each pool's cost curve is tabulated once (up to
+    total_amount) and the search reads candidate quotes off the tables; the
+    winning allocation is then re-quoted exactly.
+    
     Args:
         pool_configs: List of pool configurations (any number of pools)
         total_amount: Total amount of money to allocate
-        option: Option to bet on (0 for A/YES, 1 for B/NO)
+        option: Option to bet on (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
         optimization_method: Optimization method to use (default: GRID_SEARCH)
         precision: Number of allocation steps to try per pool (higher = more precise but slower)
+        lmsr_cache: Optional pool state snapshot shared by every evaluation
+        cost_curve_resolution: Points per cost-curve table (None quotes every candidate exactly)
+        refine_grid: Grid search coarse-to-fine even when the full lattice at precision is small enough
         
     Returns:
         OptimalAllocation with the best allocation strategy, or Exception if error
@@ -488,7 +871,7 @@ def find_optimal_allocation(
         
         if len(pool_configs) == 1:
             # Only one pool, allocate everything to it
-            result = calculate_shares_for_allocation(pool_configs[0], total_amount, option)
+            result = calculate_shares_for_allocation(pool_configs[0], total_amount, option, lmsr_cache)
             if isinstance(result, Exception):
                 return result
             
@@ -508,140 +891,237 @@ def find_optimal_allocation(
                 efficiency=efficiency
             )
         
+        if cost_curve_resolution is not None:
+            # Tables live on the snapshot, so they need one even without a caller-provided cache
+            lmsr_cache = lmsr_cache or LMSRDataCache()
+            market = LMSRMarket(lmsr_cache, cost_curve_resolution)
+            for pool_config in pool_configs:
+                if pool_config.market_type == MarketType.LMSR:
+                    # Errors are left for the search to report; it falls back to exact quotes
+                    market.get_cost_curve(pool_config, option, total_amount)
+        
         # Route to appropriate optimization method
         if optimization_method == OptimizationMethod.GRID_SEARCH:
-            return _optimize_with_grid_search(pool_configs, total_amount, option, precision)
+            result = _optimize_with_grid_search(
+                pool_configs, total_amount, option, precision, lmsr_cache, cost_curve_resolution, refine_grid
+            )
         elif optimization_method == OptimizationMethod.BINARY_SEARCH:
-            return _optimize_with_binary_search(pool_configs, total_amount, option)
+            result = _optimize_with_binary_search(pool_configs, total_amount, option, lmsr_cache, cost_curve_resolution)
         elif optimization_method == OptimizationMethod.GRADIENT_DESCENT:
-            return _optimize_with_gradient_descent(pool_configs, total_amount, option, precision)
+            result = _optimize_with_gradient_descent(pool_configs, total_amount, option, precision, lmsr_cache, cost_curve_resolution)
         elif optimization_method == OptimizationMethod.CONVEX_OPTIMIZATION:
-            return _optimize_with_convex_optimization(pool_configs, total_amount, option)
+            result = _optimize_with_convex_optimization(pool_configs, total_amount, option, lmsr_cache, cost_curve_resolution)
         else:
             return Exception(f"Unsupported optimization method: {optimization_method}")
+        
+        if cost_curve_resolution is not None and not isinstance(result, Exception):
+            return _requote_allocation(result, option, lmsr_cache)
+        return result
             
     except Exception as e:
         return Exception(f"Error in find_optimal_allocation: {str(e)}")
 
+def _evaluate_candidate(
+    pool_configs: List[PoolConfig],
+    amounts: List[float],
+    option: int,
+    lmsr_cache: Optional[LMSRDataCache] = None,
+    cost_curve_resolution: Optional[int] = None
+) -> Union[_AllocationCandidate, Exception]:
+    """Quote one amount per pool (zero or negative amounts buy nothing)."""
+    shares = []
+    costs = []
+    for i, (pool_config, amount) in enumerate(zip(pool_configs, amounts)):
+        if amount > 0:
+            result = calculate_shares_for_allocation(pool_config, amount, option, lmsr_cache, cost_curve_resolution)
+            if isinstance(result, Exception):
+                return Exception(f"Error calculating allocation for pool {i}: {result}")
+            shares.append(result[0])
+            costs.append(result[1])
+        else:
+            shares.append(0)
+            costs.append(0.0)
+    return _AllocationCandidate(tuple(amounts), tuple(shares), tuple(costs))
+
+def _requote_allocation(
+    allocation: OptimalAllocation,
+    option: int,
+    lmsr_cache: Optional[LMSRDataCache] = None
+) -> Union[OptimalAllocation, Exception]:
+    """Replace the table estimates of a chosen allocation with exact quotes."""
+    pool_configs = [alloc.pool_config for alloc in allocation.allocations]
+    candidate = _evaluate_candidate(
+        pool_configs, [alloc.amount_allocated for alloc in allocation.allocations], option, lmsr_cache
+    )
+    if isinstance(candidate, Exception):
+        return Exception(f"Error re-quoting allocation: {candidate}")
+    return candidate.materialize(pool_configs)
+
 # Optimization Method Implementations
 
+def simplex_lattice(num_pools: int, units: int) -> np.ndarray:
+    """
+    Every way to split `units` equal budget steps over num_pools pools.
+    
+    Returns:
+        (C(units + num_pools - 1, num_pools - 1), num_pools) int array whose rows
+        sum to units, ordered with the first pool's steps ascending slowest
+    """
+    if num_pools == 1:
+        return np.array([[units]], dtype=np.int64)
+    
+    # Stars and bars: choose where the num_pools - 1 bars sit among units + num_pools - 1 slots
+    slots = units + num_pools - 1
+    bars = np.fromiter(
+        itertools.chain.from_iterable(itertools.combinations(range(slots), num_pools - 1)),
+        dtype=np.int64
+    ).reshape(-1, num_pools - 1)
+    edges = np.hstack([
+        np.full((len(bars), 1), -1, dtype=np.int64),
+        bars,
+        np.full((len(bars), 1), slots, dtype=np.int64)
+    ])
+    return np.diff(edges, axis=1) - 1
+
+def _lattice_size(num_pools: int, units: int) -> int:
+    return math.comb(units + num_pools - 1, num_pools - 1)
+
+class _LatticeScorer:
+    """
+    Scores whole lattices of allocations at once.
+    
+    Row r of a lattice at `units` gives pool j lattice[r, j] / units of the
+    budget. Each pool is quoted once per distinct level, in one batched call,
+    and the quotes are kept for the rest of the search (levels are stored as
+    reduced fractions, so refining the step reuses the coarser quotes).
+    """
+    
+    def __init__(
+        self,
+        pool_configs: List[PoolConfig],
+        total_amount: float,
+        option: int,
+        lmsr_cache: Optional[LMSRDataCache] = None,
+        cost_curve_resolution: Optional[int] = None
+    ):
+        self.pool_configs = pool_configs
+        self.total_amount = total_amount
+        self.option = option
+        self.markets = [
+            get_market_instance(pool_config.market_type, lmsr_cache, cost_curve_resolution)
+            for pool_config in pool_configs
+        ]
+        # Per pool: (numerator, denominator) of the budget share -> shares (-inf if unquotable)
+        self._shares: List[Dict[Tuple[int, int], float]] = [{(0, 1): 0.0} for _ in pool_configs]
+    
+    @staticmethod
+    def _fraction(level: int, units: int) -> Tuple[int, int]:
+        divisor = math.gcd(level, units)
+        return (level // divisor, units // divisor)
+    
+    def amount(self, level: int, units: int) -> float:
+        numerator, denominator = self._fraction(level, units)
+        return self.total_amount * numerator / denominator
+    
+    def score(self, lattice: np.ndarray, units: int) -> np.ndarray:
+        """Total shares of every row (-inf where a pool with budget can't be quoted)."""
+        totals = np.zeros(len(lattice))
+        for j, (pool_config, market) in enumerate(zip(self.pool_configs, self.markets)):
+            known = self._shares[j]
+            levels, inverse = np.unique(lattice[:, j], return_inverse=True)
+            keys = [self._fraction(int(level), units) for level in levels]
+            
+            missing = [key for key in keys if key not in known]
+            if missing:
+                amounts = np.array([self.total_amount * numerator / denominator for numerator, denominator in missing])
+                result = market.calculate_shares_for_amounts(pool_config, amounts, self.option)
+                quoted = [-np.inf] * len(missing) if isinstance(result, Exception) else np.asarray(result[0], dtype=float)
+                known.update(zip(missing, quoted))
+            
+            totals += np.array([known[key] for key in keys])[inverse.ravel()]
+        return totals
+    
+    def improve_by_transfers(self, allocation: np.ndarray, units: int, best_shares: float) -> Tuple[np.ndarray, float]:
+        """Move one step between pool pairs, best move first, until no move adds shares."""
+        num_pools = len(allocation)
+        donors, receivers = np.nonzero(~np.eye(num_pools, dtype=bool))
+        rows = np.arange(len(donors))
+        # Bounded by the lattice: every accepted move strictly increases the total
+        for _ in range(units * num_pools):
+            moves = np.repeat(allocation[None, :], len(donors), axis=0)
+            moves[rows, donors] -= 1
+            moves[rows, receivers] += 1
+            moves = moves[moves[rows, donors] >= 0]
+            if not len(moves):
+                break
+            
+            scores = self.score(moves, units)
+            best = int(np.argmax(scores))
+            if scores[best] <= best_shares:
+                break
+            allocation, best_shares = moves[best], float(scores[best])
+        return allocation, best_shares
+
+def _rescale_allocation(allocation: np.ndarray, units: int, new_units: int) -> np.ndarray:
+    """Same budget split on a finer lattice (largest remainders absorb the rounding)."""
+    exact = allocation * new_units / units
+    rescaled = np.floor(exact).astype(np.int64)
+    shortfall = new_units - int(rescaled.sum())
+    if shortfall > 0:
+        rescaled[np.argsort(rescaled - exact)[:shortfall]] += 1
+    return rescaled
+
 def _optimize_with_grid_search(
     pool_configs: List[PoolConfig],
     total_amount: float,
     option: int,
-    precision: int = 20
+    precision: int = 20,
+    lmsr_cache: Optional[LMSRDataCache] = None,
+    cost_curve_resolution: Optional[int] = None,
+    refine: bool = False
 ) -> Union[OptimalAllocation, Exception]:
-    """Grid search optimization - the original method."""
+    """
+    Grid search over the allocation simplex in steps of 1/precision of the budget.
+    
+    The integer lattice of splits is scored in one batch per pool. Lattices
+    larger than MAX_GRID_CANDIDATES (or any, with refine) are searched
+    coarse-to-fine: the full lattice at a coarser step, then one-step transfers
+    between pools while the step halves down to 1/precision.
+    """
     try:
-        # Multi-pool optimization: try different allocation combinations
-        best_allocation = None
-        best_total_shares = 0
+        if precision < 1:
+            return Exception(f"Grid search precision must be positive, got {precision}")
         
-        # Generate allocation percentages that sum to 1.0
-        # For N pools, we need N-1 variables (last one is determined)
         num_pools = len(pool_configs)
-        step_size = 1.0 / precision
-        
-        # Generate all possible allocation combinations
-        # This is computationally expensive for many pools, but works for any number
-        def generate_allocations(remaining_amount: float, pool_index: int, current_allocation: List[float]) -> List[List[float]]:
-            if pool_index == num_pools - 1:
-                # Last pool gets remaining amount
-                return [current_allocation + [remaining_amount]]
-            
-            allocations = []
-            max_steps = min(precision + 1, int(remaining_amount / step_size) + 1)
-            
-            for step in range(max_steps):
-                amount_for_this_pool = step * step_size
-                if amount_for_this_pool <= remaining_amount:
-                    remaining = remaining_amount - amount_for_this_pool
-                    allocations.extend(generate_allocations(
-                        remaining, 
-                        pool_index + 1, 
-                        current_allocation + [amount_for_this_pool]
-                    ))
-            
-            return allocations
+        scorer = _LatticeScorer(pool_configs, total_amount, option, lmsr_cache, cost_curve_resolution)
+        
+        # Halve the step count until the starting lattice is small enough to enumerate
+        max_candidates = COARSE_GRID_CANDIDATES if refine else MAX_GRID_CANDIDATES
+        schedule = [precision]
+        while schedule[-1] > 1 and _lattice_size(num_pools, schedule[-1]) > max_candidates:
+            schedule.append(math.ceil(schedule[-1] / 2))
+        
+        units = schedule.pop()
+        lattice = simplex_lattice(num_pools, units)
+        scores = scorer.score(lattice, units)
+        best = int(np.argmax(scores))
+        allocation, best_shares = lattice[best], float(scores[best])
+        if best_shares <= 0:
+            return Exception("No valid allocation found")
         
-        # Limit combinations for performance (for large numbers of pools)
-        if num_pools <= 3:
-            # Full search for small number of pools
-            allocation_combinations = generate_allocations(1.0, 0, [])
-        else:
-            # For many pools, use a heuristic approach
-            # Try equal allocation plus some variations
-            allocation_combinations = []
-            
-            # Equal allocation
-            equal_pct = 1.0 / num_pools
-            allocation_combinations.append([equal_pct] * num_pools)
-            
-            # Try favoring each pool
-            for favor_pool in range(num_pools):
-                allocation = [equal_pct * 0.5] * num_pools  # Others get half
-                allocation[favor_pool] = 1.0 - sum(allocation) + allocation[favor_pool]  # Favored gets rest
-                if all(x >= 0 for x in allocation):  # Valid allocation
-                    allocation_combinations.append(allocation)
-        
-        # print(f"  Allocation combinations: {allocation_combinations}")
-        # Test each allocation combination
-        for allocation_percentages in allocation_combinations:
-            if abs(sum(allocation_percentages) - 1.0) > 0.001:  # Skip invalid allocations
-                continue
-                
-            allocation_amounts = [total_amount * pct for pct in allocation_percentages]
-            
-            # Calculate shares for each pool with this allocation
-            pool_results = []
-            total_shares = 0
-            total_cost = 0
-            valid_allocation = True
-            
-            for i, (pool_config, amount) in enumerate(zip(pool_configs, allocation_amounts)):
-                if amount > 0:
-                    result = calculate_shares_for_allocation(pool_config, amount, option)
-                    # print(f"  Result: {result} for pool {pool_config} and amount {amount}")
-                    if isinstance(result, Exception):
-                        valid_allocation = False
-                        break
-                    
-                    shares, cost = result
-                    pool_results.append(AllocationResult(
-                        pool_config=pool_config,
-                        amount_allocated=amount,
-                        shares_received=shares,
-                        actual_cost=cost,
-                        efficiency=shares / cost if cost > 0 else 0
-                    ))
-                    total_shares += shares
-                    total_cost += cost
-                else:
-                    # Zero allocation to this pool
-                    pool_results.append(AllocationResult(
-                        pool_config=pool_config,
-                        amount_allocated=0.0,
-                        shares_received=0,
-                        actual_cost=0.0,
-                        efficiency=0.0
-                    ))
-            
-            # print(f"  Total shares: {total_shares} for allocation {allocation_percentages}")
-            if valid_allocation and total_shares > best_total_shares:
-                best_total_shares = total_shares
-                overall_efficiency = total_shares / total_cost if total_cost > 0 else 0
-                
-                best_allocation = OptimalAllocation(
-                    total_shares=total_shares,
-                    total_cost=total_cost,
-                    allocations=pool_results,
-                    efficiency=overall_efficiency
-                )
+        while schedule:
+            new_units = schedule.pop()
+            allocation = _rescale_allocation(allocation, units, new_units)
+            units = new_units
+            start_shares = float(scorer.score(allocation[None, :], units)[0])
+            allocation, best_shares = scorer.improve_by_transfers(allocation, units, start_shares)
         
-        if best_allocation is None:
-            return Exception("No valid allocation found")
+        amounts = [scorer.amount(int(level), units) for level in allocation]
+        candidate = _evaluate_candidate(pool_configs, amounts, option, lmsr_cache, cost_curve_resolution)
+        if isinstance(candidate, Exception):
+            return candidate
         
-        return best_allocation
+        return candidate.materialize(pool_configs)
         
     except Exception as e:
         return Exception(f"Error in _optimize_with_grid_search: {str(e)}")
@@ -649,7 +1129,9 @@ def _optimize_with_grid_search(
 def _optimize_with_binary_search(
     pool_configs: List[PoolConfig],
     total_amount: float,
-    option: int
+    option: int,
+    lmsr_cache: Optional[LMSRDataCache] = None,
+    cost_curve_resolution: Optional[int] = None
 ) -> Union[OptimalAllocation, Exception]:
     """Binary search optimization - good for two pools."""
     try:
@@ -664,8 +1146,8 @@ def _optimize_with_binary_search(
             allocation_to_pool_2 = total_amount - allocation_to_pool_1
             
             # Calculate shares for each pool
-            result_1 = calculate_shares_for_allocation(pool_configs[0], allocation_to_pool_1, option)
-            result_2 = calculate_shares_for_allocation(pool_configs[1], allocation_to_pool_2, option)
+            result_1 = calculate_shares_for_allocation(pool_configs[0], allocation_to_pool_1, option, lmsr_cache, cost_curve_resolution)
+            result_2 = calculate_shares_for_allocation(pool_configs[1], allocation_to_pool_2, option, lmsr_cache, cost_curve_resolution)
             
             if isinstance(result_1, Exception) or isinstance(result_2, Exception):
                 return -1  # Invalid allocation
@@ -707,40 +1189,13 @@ def _optimize_with_binary_search(
         optimal_allocation_1 = best_allocation_amount
         optimal_allocation_2 = total_amount - optimal_allocation_1
         
-        result_1 = calculate_shares_for_allocation(pool_configs[0], optimal_allocation_1, option)
-        result_2 = calculate_shares_for_allocation(pool_configs[1], optimal_allocation_2, option)
-        
-        if isinstance(result_1, Exception) or isinstance(result_2, Exception):
-            return Exception("Error in final allocation calculation")
-        
-        shares_1, cost_1 = result_1
-        shares_2, cost_2 = result_2
-        
-        total_shares = shares_1 + shares_2
-        total_cost = cost_1 + cost_2
-        overall_efficiency = total_shares / total_cost if total_cost > 0 else 0
-        
-        return OptimalAllocation(
-            total_shares=total_shares,
-            total_cost=total_cost,
-            allocations=[
-                AllocationResult(
-                    pool_config=pool_configs[0],
-                    amount_allocated=optimal_allocation_1,
-                    shares_received=shares_1,
-                    actual_cost=cost_1,
-                    efficiency=shares_1 / cost_1 if cost_1 > 0 else 0
-                ),
-                AllocationResult(
-                    pool_config=pool_configs[1],
-                    amount_allocated=optimal_allocation_2,
-                    shares_received=shares_2,
-                    actual_cost=cost_2,
-                    efficiency=shares_2 / cost_2 if cost_2 > 0 else 0
-                )
-            ],
-            efficiency=overall_efficiency
+        candidate = _evaluate_candidate(
+            pool_configs, [optimal_allocation_1, optimal_allocation_2], option, lmsr_cache, cost_curve_resolution
         )
+        if isinstance(candidate, Exception):
+            return Exception(f"Error in final allocation calculation: {candidate}")
+        
+        return candidate.materialize(pool_configs)
         
     except Exception as e:
         return Exception(f"Error in _optimize_with_binary_search: {str(e)}")
@@ -749,7 +1204,9 @@ def _optimize_with_gradient_descent(
     pool_configs: List[PoolConfig],
     total_amount: float,
     option: int,
-    max_iterations: int = 100
+    max_iterations: int = 100,
+    lmsr_cache: Optional[LMSRDataCache] = None,
+    cost_curve_resolution: Optional[int] = None
 ) -> Union[OptimalAllocation, Exception]:
     """Gradient descent optimization - good for multiple pools."""
     try:
@@ -772,7 +1229,7 @@ def _optimize_with_gradient_descent(
             for i, pct in enumerate(percentages):
                 amount = total_amount * pct
                 if amount > 0:
-                    result = calculate_shares_for_allocation(pool_configs[i], amount, option)
+                    result = calculate_shares_for_allocation(pool_configs[i], amount, option, lmsr_cache, cost_curve_resolution)
                     if isinstance(result, Exception):
                         return -1
                     shares, _ = result
@@ -820,44 +1277,11 @@ def _optimize_with_gradient_descent(
         
         # Calculate final allocation
         allocation_amounts = [total_amount * pct for pct in allocation_percentages]
+        candidate = _evaluate_candidate(pool_configs, allocation_amounts, option, lmsr_cache, cost_curve_resolution)
+        if isinstance(candidate, Exception):
+            return Exception(f"Error calculating final allocation: {candidate}")
         
-        pool_results = []
-        total_shares = 0
-        total_cost = 0
-        
-        for i, (pool_config, amount) in enumerate(zip(pool_configs, allocation_amounts)):
-            if amount > 0:
-                result = calculate_shares_for_allocation(pool_config, amount, option)
-                if isinstance(result, Exception):
-                    return Exception(f"Error calculating final allocation for pool {i}")
-                
-                shares, cost = result
-                pool_results.append(AllocationResult(
-                    pool_config=pool_config,
-                    amount_allocated=amount,
-                    shares_received=shares,
-                    actual_cost=cost,
-                    efficiency=shares / cost if cost > 0 else 0
-                ))
-                total_shares += shares
-                total_cost += cost
-            else:
-                pool_results.append(AllocationResult(
-                    pool_config=pool_config,
-                    amount_allocated=0.0,
-                    shares_received=0,
-                    actual_cost=0.0,
-                    efficiency=0.0
-                ))
-        
-        overall_efficiency = total_shares / total_cost if total_cost > 0 else 0
-        
-        return OptimalAllocation(
-            total_shares=total_shares,
-            total_cost=total_cost,
-            allocations=pool_results,
-            efficiency=overall_efficiency
-        )
+        return candidate.materialize(pool_configs)
         
     except Exception as e:
         return Exception(f"Error in _optimize_with_gradient_descent: {str(e)}")
@@ -865,7 +1289,9 @@ def _optimize_with_gradient_descent(
 def _optimize_with_convex_optimization(
     pool_configs: List[PoolConfig],
     total_amount: float,
-    option: int
+    option: int,
+    lmsr_cache: Optional[LMSRDataCache] = None,
+    cost_curve_resolution: Optional[int] = None
 ) -> Union[OptimalAllocation, Exception]:
     """Convex optimization using scipy.optimize - most efficient for LMSR."""
     try:
@@ -887,7 +1313,7 @@ def _optimize_with_convex_optimization(
             for i, pct in enumerate(allocation_percentages):
                 amount = total_amount * pct
                 if amount > 0:
-                    result = calculate_shares_for_allocation(pool_configs[i], amount, option)
+                    result = calculate_shares_for_allocation(pool_configs[i], amount, option, lmsr_cache, cost_curve_resolution)
                     if isinstance(result, Exception):
                         return 1e10  # Large penalty for error
                     shares, _ = result
@@ -920,44 +1346,11 @@ def _optimize_with_convex_optimization(
         # Calculate final allocation
         optimal_percentages = result.x
         allocation_amounts = [total_amount * pct for pct in optimal_percentages]
+        candidate = _evaluate_candidate(pool_configs, allocation_amounts, option, lmsr_cache, cost_curve_resolution)
+        if isinstance(candidate, Exception):
+            return Exception(f"Error calculating final allocation: {candidate}")
         
-        pool_results = []
-        total_shares = 0
-        total_cost = 0
-        
-        for i, (pool_config, amount) in enumerate(zip(pool_configs, allocation_amounts)):
-            if amount > 0:
-                calc_result = calculate_shares_for_allocation(pool_config, amount, option)
-                if isinstance(calc_result, Exception):
-                    return Exception(f"Error calculating final allocation for pool {i}")
-                
-                shares, cost = calc_result
-                pool_results.append(AllocationResult(
-                    pool_config=pool_config,
-                    amount_allocated=amount,
-                    shares_received=shares,
-                    actual_cost=cost,
-                    efficiency=shares / cost if cost > 0 else 0
-                ))
-                total_shares += shares
-                total_cost += cost
-            else:
-                pool_results.append(AllocationResult(
-                    pool_config=pool_config,
-                    amount_allocated=0.0,
-                    shares_received=0,
-                    actual_cost=0.0,
-                    efficiency=0.0
-                ))
-        
-        overall_efficiency = total_shares / total_cost if total_cost > 0 else 0
-        
-        return OptimalAllocation(
-            total_shares=total_shares,
-            total_cost=total_cost,
-            allocations=pool_results,
-            efficiency=overall_efficiency
-        )
+        return candidate.materialize(pool_configs)
         
     except Exception as e:
         return Exception(f"Error in _optimize_with_convex_optimization: {str(e)}")
@@ -973,7 +1366,7 @@ def compare_single_vs_split_strategy(
     Args:
         pool_configs: List of pool configurations
         total_amount: Total amount to bet
-        option: Option to bet on (0 for A/YES, 1 for B/NO)
+        option: Option to bet on (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
         
     Returns:
         Dictionary with comparison results, or Exception if error
@@ -1059,7 +1452,7 @@ def compare_optimization_methods(
     Args:
         pool_configs: List of pool configurations
         total_amount: Total amount to bet
-        option: Option to bet on (0 for A/YES, 1 for B/NO)
+        option: Option to bet on (outcome index; 0 for A/YES, 1 for B/NO in binary pools)
         precision: Precision for grid search and gradient descent
         
     Returns:
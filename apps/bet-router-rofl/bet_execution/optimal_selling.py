@@ -0,0 +1,382 @@
+"""
+Optimal Selling - decide how many shares to sell in which pool.
+
+Given holdings of the same question spread over several LMSR pools, the
+collateral returned by selling s shares in one pool is concave in s (every
+share sold lowers that pool's price). Splitting each holding into equal
+chunks and always selling the chunk with the best price per share is
+therefore optimal up to the chunk size:
+- target_proceeds: raise at least this much collateral while giving up the
+  fewest shares (the last chunk is trimmed with shares_to_sell_for_target)
+- max_shares: sell at most this many shares for the most collateral
+- neither: full exit, selling every holding as recorded and quoting what
+  each pool returns (shares beyond a stale snapshot's outstanding supply are
+  extrapolated at the quoted average price, see SellAllocation.quoted_shares)
+
+Holdings and results are in whole tokens / whole collateral units, like the
+adapter's sell-shares endpoint; pool state is read in base units. Binary pools
+are quoted with lmsr_calculator, or with lmsr_fixed_point (which models the
+marketplace's micro-USDC rounding) when fixed_point / LMSR_FIXED_POINT_QUOTES
+is set.
+"""
+
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .get_lmsr_data import LMSRData, LMSRDataCache, LMSR_TOKEN_BASE_UNITS
+from .lmsr_calculator import (
+    LMSRParams,
+    calculate_initial_lmsr_params,
+    calculate_proceeds_for_sell_with_params,
+    shares_to_sell_for_target_with_params,
+)
+from .lmsr_fixed_point import (
+    FIXED_POINT_QUOTES,
+    FixedLMSRParams,
+    MICRO_UNITS,
+    calculate_fixed_proceeds_for_sell_with_params,
+    calculate_fixed_shares_to_sell_for_target_with_params,
+    fixed_lmsr_params_for,
+    tokens_to_micro_units,
+)
+from .lmsr_multi import (
+    MultiLMSRParams,
+    calculate_multi_lmsr_params,
+    calculate_multi_proceeds_for_sell_with_params,
+    calculate_multi_shares_to_sell_for_target_with_params,
+)
+from .optimal_betting import PoolConfig
+
+
+@dataclass
+class SellHolding:
+    pool_config: PoolConfig
+    option: int  # outcome index (0 for A/YES, 1 for B/NO in binary pools)
+    shares: float  # whole tokens held
+    reference: Any = None  # caller's handle for the position (e.g. proxied bet id)
+
+
+@dataclass
+class SellAllocation:
+    pool_config: PoolConfig
+    option: int
+    shares_to_sell: float  # whole tokens
+    expected_proceeds: float  # whole collateral units
+    shares_held: float
+    references: List[Any]
+    quoted_shares: Optional[float] = None  # shares the pool snapshot priced, when fewer than shares_to_sell
+
+    @property
+    def extrapolated(self) -> bool:
+        """True if expected_proceeds covers shares the snapshot could not price."""
+        return self.quoted_shares is not None and self.quoted_shares < self.shares_to_sell
+
+
+@dataclass
+class OptimalSell:
+    allocations: List[SellAllocation]
+    total_shares: float
+    total_proceeds: float
+    target_proceeds: Optional[float] = None
+
+    @property
+    def target_met(self) -> bool:
+        return self.target_proceeds is None or self.total_proceeds >= self.target_proceeds
+
+    def __str__(self) -> str:
+        result = f"Optimal Sell: {self.total_shares:.4f} shares for ${self.total_proceeds:.2f}\n"
+        for i, alloc in enumerate(self.allocations, 1):
+            if alloc.shares_to_sell > 0:
+                result += (f"  {i}. Pool {alloc.pool_config.pool_id}: {alloc.shares_to_sell:.4f}/"
+                           f"{alloc.shares_held:.4f} shares → ${alloc.expected_proceeds:.2f}\n")
+        return result.strip()
+
+
+class _PoolPosition:
+    """Aggregated holding in one (pool, option) with the state needed to quote sells."""
+
+    def __init__(
+        self,
+        holding: SellHolding,
+        lmsr_data: LMSRData,
+        params: Union[LMSRParams, FixedLMSRParams, MultiLMSRParams]
+    ):
+        self.pool_config = holding.pool_config
+        self.option = holding.option
+        self.shares_held = 0.0
+        self.references: List[Any] = []
+        self.lmsr_data = lmsr_data
+        self.params = params
+        self.sold = 0.0
+        self.proceeds = 0.0
+        self.quoted: Optional[float] = None
+
+    @property
+    def categorical(self) -> bool:
+        return isinstance(self.params, MultiLMSRParams)
+
+    @property
+    def sellable(self) -> float:
+        """Shares the pool can buy back: the holding, capped at what is outstanding on the option."""
+        supply = self.lmsr_data.q_vector()[self.option] / LMSR_TOKEN_BASE_UNITS
+        return min(self.shares_held, max(0.0, supply))
+
+    def quote(self, shares: float) -> Union[float, Exception]:
+        """Collateral (whole units) for selling `shares` whole tokens in total from this pool."""
+        if self.categorical:
+            proceeds = calculate_multi_proceeds_for_sell_with_params(
+                self.params, self.lmsr_data.q_vector(), shares * LMSR_TOKEN_BASE_UNITS, self.option
+            )
+            if isinstance(proceeds, Exception):
+                return proceeds
+            return proceeds / LMSR_TOKEN_BASE_UNITS
+
+        if isinstance(self.params, LMSRParams):
+            proceeds = calculate_proceeds_for_sell_with_params(
+                self.params,
+                self.lmsr_data.current_q_A,
+                self.lmsr_data.current_q_B,
+                shares * LMSR_TOKEN_BASE_UNITS,
+                self.option == 0
+            )
+            if isinstance(proceeds, Exception):
+                return proceeds
+            return proceeds / LMSR_TOKEN_BASE_UNITS
+
+        # The adapter truncates the share amount to base units, the pool pays whole micro-USDC
+        proceeds = calculate_fixed_proceeds_for_sell_with_params(
+            self.params,
+            self.lmsr_data.current_q_A,
+            self.lmsr_data.current_q_B,
+            tokens_to_micro_units(shares),
+            self.option == 0
+        )
+        if isinstance(proceeds, Exception):
+            return proceeds
+        return proceeds / MICRO_UNITS
+
+    def shares_for_proceeds(self, proceeds: float, max_shares: float) -> Union[float, Exception]:
+        """Fewest whole tokens (in total) whose sale returns `proceeds`, capped at max_shares."""
+        if self.categorical:
+            result = calculate_multi_shares_to_sell_for_target_with_params(
+                self.params, self.lmsr_data.q_vector(), proceeds * LMSR_TOKEN_BASE_UNITS, self.option
+            )
+            if isinstance(result, Exception):
+                return result
+            return min(result[0] / LMSR_TOKEN_BASE_UNITS, max_shares)
+
+        if isinstance(self.params, LMSRParams):
+            result = shares_to_sell_for_target_with_params(
+                self.params,
+                self.lmsr_data.current_q_A,
+                self.lmsr_data.current_q_B,
+                proceeds * LMSR_TOKEN_BASE_UNITS,
+                self.option == 0,
+                max_shares=max_shares * LMSR_TOKEN_BASE_UNITS
+            )
+            if isinstance(result, Exception):
+                return result
+            return min(result[0] / LMSR_TOKEN_BASE_UNITS, max_shares)
+
+        result = calculate_fixed_shares_to_sell_for_target_with_params(
+            self.params,
+            self.lmsr_data.current_q_A,
+            self.lmsr_data.current_q_B,
+            math.ceil(proceeds * MICRO_UNITS),
+            self.option == 0,
+            max_shares=tokens_to_micro_units(max_shares)
+        )
+        if isinstance(result, Exception):
+            return result
+        return min(result[0] / MICRO_UNITS, max_shares)
+
+
+def _load_positions(
+    holdings: List[SellHolding],
+    lmsr_cache: LMSRDataCache,
+    fixed_point: bool
+) -> Union[List[_PoolPosition], Exception]:
+    """Merge holdings per (pool, option) and attach each pool's LMSR state."""
+    positions: Dict[Tuple[str, int, int], _PoolPosition] = {}
+    for holding in holdings:
+        if holding.shares <= 0:
+            continue
+        key = (holding.pool_config.schema, holding.pool_config.pool_id, holding.option)
+        position = positions.get(key)
+        if position is None:
+            lmsr_data = lmsr_cache.get(holding.pool_config.pool_id, holding.pool_config.schema)
+            if isinstance(lmsr_data, Exception):
+                return Exception(f"Error getting LMSR data for pool {holding.pool_config.pool_id}: {lmsr_data}")
+            if not 0 <= holding.option < lmsr_data.num_outcomes:
+                return Exception(f"Invalid option {holding.option} for pool {holding.pool_config.pool_id}")
+            if lmsr_data.num_outcomes > 2:
+                params = calculate_multi_lmsr_params(lmsr_data.liquidity_vector())
+            elif fixed_point:
+                params = fixed_lmsr_params_for(lmsr_data)
+            else:
+                params = calculate_initial_lmsr_params(lmsr_data.initial_liquidity_A, lmsr_data.initial_liquidity_B)
+            if isinstance(params, Exception):
+                return params
+            position = positions[key] = _PoolPosition(holding, lmsr_data, params)
+        position.shares_held += holding.shares
+        position.references.append(holding.reference)
+    return list(positions.values())
+
+
+def find_optimal_sell(
+    holdings: List[SellHolding],
+    target_proceeds: Optional[float] = None,
+    max_shares: Optional[float] = None,
+    lmsr_cache: Optional[LMSRDataCache] = None,
+    chunks_per_holding: int = 50,
+    fixed_point: Optional[bool] = None
+) -> Union[OptimalSell, Exception]:
+    """
+    Decide how many shares to sell in each pool.
+
+    Args:
+        holdings: Positions to sell from (several may share a pool)
+        target_proceeds: Stop once this much collateral is raised
+        max_shares: Sell at most this many shares in total
+        lmsr_cache: Optional pool state snapshot (queries the database per pool if None)
+        chunks_per_holding: Granularity of the greedy split per pool
+        fixed_point: Quote binary pools with lmsr_fixed_point (defaults to LMSR_FIXED_POINT_QUOTES)
+
+    Returns:
+        OptimalSell with per-pool shares and expected proceeds, or Exception if error
+    """
+    try:
+        lmsr_cache = lmsr_cache or LMSRDataCache()
+        positions = _load_positions(holdings, lmsr_cache, FIXED_POINT_QUOTES if fixed_point is None else fixed_point)
+        if isinstance(positions, Exception):
+            return positions
+        if not positions:
+            return Exception("No shares to sell")
+
+        if target_proceeds is None and max_shares is None:
+            # Full exit: pools are independent, so sell each holding as recorded and
+            # quote it. A snapshot older than the holding may show less outstanding
+            # than is sold; the rest is priced at the quoted average price
+            for position in positions:
+                sellable = position.sellable
+                proceeds = position.quote(sellable)
+                if isinstance(proceeds, Exception):
+                    return proceeds
+                if 0 < sellable < position.shares_held:
+                    proceeds *= position.shares_held / sellable
+                position.sold, position.proceeds = position.shares_held, proceeds
+                if sellable < position.shares_held:
+                    position.quoted = sellable
+        else:
+            result = _greedy_sell(positions, target_proceeds, max_shares, chunks_per_holding)
+            if isinstance(result, Exception):
+                return result
+
+        allocations = [
+            SellAllocation(
+                pool_config=position.pool_config,
+                option=position.option,
+                shares_to_sell=position.sold,
+                expected_proceeds=position.proceeds,
+                shares_held=position.shares_held,
+                references=position.references,
+                quoted_shares=position.quoted
+            )
+            for position in positions
+        ]
+        allocations.sort(key=lambda alloc: alloc.expected_proceeds, reverse=True)
+        return OptimalSell(
+            allocations=allocations,
+            total_shares=sum(alloc.shares_to_sell for alloc in allocations),
+            total_proceeds=sum(alloc.expected_proceeds for alloc in allocations),
+            target_proceeds=target_proceeds
+        )
+
+    except Exception as e:
+        return Exception(f"Error in find_optimal_sell: {str(e)}")
+
+
+def _greedy_sell(
+    positions: List[_PoolPosition],
+    target_proceeds: Optional[float],
+    max_shares: Optional[float],
+    chunks_per_holding: int
+) -> Optional[Exception]:
+    """Sell the best-paying chunk until the target or share budget is reached."""
+    remaining_shares = float("inf") if max_shares is None else max_shares
+    raised = 0.0
+
+    # Max-heap of (-proceeds per share of the next chunk, index, chunk size, chunk proceeds);
+    # chunk sizes differ per pool, so chunks are ranked by their average price
+    heap: List[Tuple[float, int, float, float]] = []
+
+    def push_next(i: int) -> Optional[Exception]:
+        position = positions[i]
+        # The pool can't buy back more than is outstanding on that option
+        sellable = position.sellable
+        chunk = min(sellable / chunks_per_holding, sellable - position.sold)
+        if chunk <= 1e-9:
+            return None
+        proceeds = position.quote(position.sold + chunk)
+        if isinstance(proceeds, Exception):
+            return proceeds
+        gain = proceeds - position.proceeds
+        heapq.heappush(heap, (-gain / chunk, i, chunk, gain))
+        return None
+
+    for i in range(len(positions)):
+        error = push_next(i)
+        if error is not None:
+            return error
+
+    while heap and remaining_shares > 1e-9:
+        if target_proceeds is not None and raised >= target_proceeds:
+            break
+        _, i, chunk, gain = heapq.heappop(heap)
+        position = positions[i]
+        chunk_cap = min(chunk, remaining_shares)
+        still_needed = None if target_proceeds is None else target_proceeds - raised
+
+        if chunk_cap < chunk or (still_needed is not None and gain > still_needed):
+            # Last, partial chunk: sell only what the budget allows / the target needs
+            cap = position.sold + chunk_cap
+            if still_needed is not None:
+                trimmed = position.shares_for_proceeds(position.proceeds + still_needed, cap)
+                if not isinstance(trimmed, Exception):
+                    cap = trimmed
+            proceeds = position.quote(cap)
+            if isinstance(proceeds, Exception):
+                return proceeds
+            remaining_shares -= cap - position.sold
+            raised += proceeds - position.proceeds
+            position.sold, position.proceeds = cap, proceeds
+            break
+
+        remaining_shares -= chunk
+        raised += gain
+        position.sold += chunk
+        position.proceeds += gain
+        error = push_next(i)
+        if error is not None:
+            return error
+
+    return None
+
+
+# Example usage
+if __name__ == "__main__":
+    cache = LMSRDataCache(lambda pool_id, schema: LMSRData(
+        initial_liquidity_A=50 * LMSR_TOKEN_BASE_UNITS,
+        initial_liquidity_B=50 * LMSR_TOKEN_BASE_UNITS,
+        current_q_A=(40 if pool_id == 161 else 10) * LMSR_TOKEN_BASE_UNITS,
+        current_q_B=5 * LMSR_TOKEN_BASE_UNITS
+    ))
+    holdings = [
+        SellHolding(PoolConfig(161, "canibeton_variant1"), option=0, shares=20),
+        SellHolding(PoolConfig(156, "canibeton_variant2"), option=0, shares=8),
+    ]
+    print(find_optimal_sell(holdings, lmsr_cache=cache))
+    print(find_optimal_sell(holdings, target_proceeds=10, lmsr_cache=cache))
+    print(find_optimal_sell(holdings, max_shares=10, lmsr_cache=cache))
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Price Client - batched async get-prices calls against the marketplace adapter.
+
+Fetches current prices for many (marketplace_id, market_id) pairs at once:
+1. One pooled aiohttp session (keep-alive, bounded connections) per client
+2. Requests run concurrently, capped by max_concurrency
+3. Every market gets a PriceQuote carrying either prices or an error, so one
+   failing marketplace never hides the others (and nothing exits the process)
+
+check_prices_against_snapshot() compares live quotes with the LMSR snapshot
+the optimizer is about to use, so pools whose database view has drifted (or
+whose adapter is down) can be dropped before any collateral is sent.
+
+Usage:
+    async with PriceClient(base_url) as client:
+        quotes = await client.get_prices([(2, 161), (3, 156)])
+
+    quotes = fetch_prices([(2, 161), (3, 156)], base_url)  # from sync code
+"""
+
+import asyncio
+import concurrent.futures
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from .bet_executor import MARKETPLACE_ID_TO_SCHEMA, SCHEMA_TO_ENDPOINT, SCHEMA_TO_MARKETPLACE_ID
+from .get_lmsr_data import LMSRData
+from .lmsr_multi import calculate_lmsr_data_prices
+from .optimal_betting import PoolConfig
+from .telemetry import span
+
+MarketKey = Tuple[int, int]  # (marketplace_id, market_id)
+
+
+@dataclass
+class PriceQuote:
+    marketplace_id: int
+    market_id: int
+    prices: Optional[List[float]] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.prices is not None
+
+
+@dataclass
+class PriceDeviation:
+    pool_config: PoolConfig
+    quoted_price: Optional[float]
+    snapshot_price: Optional[float]
+    reason: str
+
+
+def get_endpoint_for_marketplace(marketplace_id: int) -> Union[str, Exception]:
+    """Map a marketplace ID to its adapter path (e.g. 2 -> slaughterhouse-predictions)."""
+    schema = MARKETPLACE_ID_TO_SCHEMA.get(marketplace_id)
+    if schema is None:
+        return Exception(f"Unknown marketplace ID: {marketplace_id}. Supported IDs: {list(MARKETPLACE_ID_TO_SCHEMA.keys())}")
+    return SCHEMA_TO_ENDPOINT[schema]
+
+
+def _parse_prices(body) -> Union[List[float], Exception]:
+    """Accept either a bare [price_A, price_B] list or {"prices": [...]}."""
+    if isinstance(body, dict):
+        if "error" in body:
+            return Exception(str(body["error"]))
+        body = body.get("prices")
+    if not isinstance(body, list) or not body:
+        return Exception(f"Unexpected get-prices response: {body!r}")
+    try:
+        return [float(price) for price in body]
+    except (TypeError, ValueError) as e:
+        return Exception(f"Non-numeric price in response: {e}")
+
+
+class PriceClient:
+    """Async client for the adapter's get-prices endpoints."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:3000",
+        timeout: float = 10.0,
+        max_concurrency: int = 16
+    ):
+        """
+        Args:
+            base_url: Marketplace adapter API base URL
+            timeout: Total seconds allowed per get-prices request
+            max_concurrency: Requests (and pooled connections) in flight at once
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("PriceClient requires aiohttp (pip install aiohttp)")
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    async def __aenter__(self) -> "PriceClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Content-Type': 'application/json'}
+            )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_price(self, marketplace_id: int, market_id: int) -> PriceQuote:
+        """Fetch one market's prices; errors are returned on the quote, never raised."""
+        quote = PriceQuote(marketplace_id=marketplace_id, market_id=market_id)
+        endpoint_name = get_endpoint_for_marketplace(marketplace_id)
+        if isinstance(endpoint_name, Exception):
+            quote.error = str(endpoint_name)
+            return quote
+
+        await self.open()
+        url = f"{self.base_url}/{endpoint_name}/get-prices"
+        started = time.perf_counter()
+
+        with span("adapter.get_prices", endpoint=endpoint_name, market_id=market_id) as s:
+            try:
+                async with self._session.post(url, json={"marketId": market_id}) as response:
+                    quote.status_code = response.status
+                    try:
+                        body = await response.json(content_type=None)
+                    except ValueError:
+                        body = {"error": f"Invalid JSON response: {(await response.text())[:200]}"}
+
+                if response.status != 200:
+                    quote.error = f"HTTP {response.status}: {body}"
+                else:
+                    prices = _parse_prices(body)
+                    if isinstance(prices, Exception):
+                        quote.error = str(prices)
+                    else:
+                        quote.prices = prices
+            except asyncio.TimeoutError:
+                quote.error = f"Request timeout after {self.timeout}s"
+            except aiohttp.ClientError as e:
+                quote.error = f"Request failed: {e}"
+
+            quote.latency = time.perf_counter() - started
+            s.set("status_code", quote.status_code)
+            if quote.error:
+                s.record_error(quote.error)
+
+        return quote
+
+    async def get_prices(self, markets: Iterable[MarketKey]) -> Dict[MarketKey, PriceQuote]:
+        """
+        Fetch prices for many markets concurrently.
+
+        Args:
+            markets: (marketplace_id, market_id) pairs; duplicates are fetched once
+
+        Returns:
+            {(marketplace_id, market_id): PriceQuote} for every requested market
+        """
+        keys = list(dict.fromkeys(markets))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(key: MarketKey) -> PriceQuote:
+            async with semaphore:
+                return await self.get_price(*key)
+
+        quotes = await asyncio.gather(*(bounded(key) for key in keys))
+        return dict(zip(keys, quotes))
+
+
+def _run_coroutine(coroutine_factory):
+    """Run a coroutine from sync code, even if this thread already has a running loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine_factory())
+    # Called from inside an event loop (e.g. the router's log loop): use a worker thread
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coroutine_factory()).result()
+
+
+def fetch_prices(
+    markets: Iterable[MarketKey],
+    base_url: str = "http://localhost:3000",
+    timeout: float = 10.0,
+    max_concurrency: int = 16
+) -> Union[Dict[MarketKey, PriceQuote], Exception]:
+    """
+    Synchronous wrapper around PriceClient.get_prices.
+
+    Returns:
+        {(marketplace_id, market_id): PriceQuote}, or Exception if the client cannot run
+    """
+    markets = list(markets)
+
+    async def run():
+        async with PriceClient(base_url, timeout, max_concurrency) as client:
+            return await client.get_prices(markets)
+
+    try:
+        return _run_coroutine(run)
+    except Exception as e:
+        return Exception(f"Error fetching prices: {str(e)}")
+
+
+def check_prices_against_snapshot(
+    pool_configs: List[PoolConfig],
+    quotes: Dict[MarketKey, PriceQuote],
+    load_pool_data: Callable[[int, str], Union[LMSRData, Exception]],
+    option: int,
+    tolerance: float = 0.02
+) -> Tuple[List[PoolConfig], List[PriceDeviation]]:
+    """
+    Pre-trade check: keep pools whose live price agrees with the LMSR snapshot.
+
+    Args:
+        pool_configs: Pools the optimizer would allocate over
+        quotes: Live quotes keyed by (marketplace_id, market_id)
+        load_pool_data: (pool_id, schema) -> LMSRData, e.g. an LMSRDataCache's get
+        option: Outcome being bought (index into the price list)
+        tolerance: Largest allowed |quoted - snapshot| price difference
+
+    Returns:
+        (pools that passed, deviations for pools that were dropped)
+    """
+    passed: List[PoolConfig] = []
+    deviations: List[PriceDeviation] = []
+
+    for pool_config in pool_configs:
+        key = (SCHEMA_TO_MARKETPLACE_ID.get(pool_config.schema, 0), pool_config.pool_id)
+        quote = quotes.get(key)
+        if quote is None or not quote.ok:
+            deviations.append(PriceDeviation(
+                pool_config, None, None, f"No live quote: {quote.error if quote else 'not requested'}"
+            ))
+            continue
+        if option >= len(quote.prices):
+            deviations.append(PriceDeviation(pool_config, None, None, f"Quote has no price for option {option}"))
+            continue
+
+        data = load_pool_data(pool_config.pool_id, pool_config.schema)
+        if isinstance(data, Exception):
+            deviations.append(PriceDeviation(pool_config, quote.prices[option], None, f"No snapshot: {data}"))
+            continue
+        snapshot_prices = calculate_lmsr_data_prices(data)
+        if isinstance(snapshot_prices, Exception):
+            deviations.append(PriceDeviation(pool_config, quote.prices[option], None, f"Snapshot pricing failed: {snapshot_prices}"))
+            continue
+
+        quoted, expected = quote.prices[option], snapshot_prices[option]
+        if abs(quoted - expected) > tolerance:
+            deviations.append(PriceDeviation(
+                pool_config, quoted, expected, f"Price moved {quoted:.4f} vs snapshot {expected:.4f}"
+            ))
+        else:
+            passed.append(pool_config)
+
+    return passed, deviations
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    base_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:3000"
+    markets = [(2, 161), (3, 156)]
+    print(f"Fetching prices for {markets} from {base_url}...")
+    quotes = fetch_prices(markets, base_url)
+    if isinstance(quotes, Exception):
+        print(f"❌ {quotes}")
+    else:
+        for (marketplace_id, market_id), quote in quotes.items():
+            status = f"{quote.prices}" if quote.ok else f"❌ {quote.error}"
+            print(f"  marketplace {marketplace_id} market {market_id}: {status} ({quote.latency * 1000:.1f} ms)")
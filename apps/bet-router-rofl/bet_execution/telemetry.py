@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Telemetry - span-style timing for the bet slip lifecycle.
+
+Every phase of the router (event fetch, getBetSlip, pool configs, DB fetch,
+optimization, adapter HTTP legs, tx send/receipt) is wrapped in a span. A
+finished span is:
+1. Emitted as one JSON log line (set TELEMETRY_JSON_LOGS=false to silence)
+2. Mirrored to OpenTelemetry when the SDK is installed and OTEL_ENABLED=true
+3. Passed to any listeners registered with add_span_listener (e.g. metrics)
+
+Spans are keyed by the bet slip being processed, set once per event with
+bet_slip_context(); nested spans record their parent's name.
+
+Usage:
+    with bet_slip_context(bet_slip_id):
+        with span("tx.send", function="updateBetSlipStatus") as s:
+            tx_hash = send(...)
+            s.set("tx_hash", tx_hash.hex())
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from opentelemetry import trace as otel_trace
+    OPENTELEMETRY_AVAILABLE = True
+except ImportError:
+    OPENTELEMETRY_AVAILABLE = False
+
+TELEMETRY_JSON_LOGS = os.getenv("TELEMETRY_JSON_LOGS", "true").lower() == "true"
+OTEL_ENABLED = OPENTELEMETRY_AVAILABLE and os.getenv("OTEL_ENABLED", "false").lower() == "true"
+
+_current_bet_slip_id: ContextVar[Optional[int]] = ContextVar("bet_slip_id", default=None)
+_current_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+_span_listeners: List[Callable[["Span"], None]] = []
+
+# Spans finish on executor worker threads; one write per record under a lock
+# keeps JSON lines from interleaving on stderr
+_emit_lock = threading.Lock()
+
+
+@dataclass
+class Span:
+    name: str
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    bet_slip_id: Optional[int] = None
+    trace_id: Optional[str] = None
+    parent: Optional[str] = None
+    start_time: float = 0.0
+    duration: float = 0.0
+    status: str = "ok"
+    error: Optional[str] = None
+
+    def set(self, key: str, value: Any) -> None:
+        """Attach an attribute (result sizes, status codes, tx hashes, ...)."""
+        self.attributes[key] = value
+
+    def record_error(self, error: Any) -> None:
+        """Mark the span failed; use for errors returned as values rather than raised."""
+        self.status = "error"
+        self.error = str(error)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span": self.name,
+            "bet_slip_id": self.bet_slip_id,
+            "trace_id": self.trace_id,
+            "parent": self.parent,
+            "start": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            **({"attributes": self.attributes} if self.attributes else {}),
+        }
+
+
+def add_span_listener(listener: Callable[[Span], None]) -> None:
+    """Register a callback invoked with every finished span."""
+    _span_listeners.append(listener)
+
+
+def remove_span_listener(listener: Callable[[Span], None]) -> None:
+    """Unregister a callback added with add_span_listener."""
+    if listener in _span_listeners:
+        _span_listeners.remove(listener)
+
+
+def get_bet_slip_id() -> Optional[int]:
+    """Bet slip currently being processed in this context, if any."""
+    return _current_bet_slip_id.get()
+
+
+@contextmanager
+def bet_slip_context(bet_slip_id: Optional[int]):
+    """Key every span opened inside the block by bet_slip_id."""
+    slip_token = _current_bet_slip_id.set(bet_slip_id)
+    trace_token = _current_trace_id.set(uuid.uuid4().hex)
+    try:
+        yield
+    finally:
+        _current_trace_id.reset(trace_token)
+        _current_bet_slip_id.reset(slip_token)
+
+
+def _emit(finished: Span) -> None:
+    if TELEMETRY_JSON_LOGS:
+        line = json.dumps(finished.to_dict(), default=str)
+        with _emit_lock:
+            sys.stderr.write(line + "\n")
+            sys.stderr.flush()
+
+    for listener in list(_span_listeners):
+        try:
+            listener(finished)
+        except Exception as e:
+            print(f"⚠️  Span listener failed: {e}", file=sys.stderr)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time a block as a span.
+
+    Args:
+        name: Phase name, dotted by area (e.g. "adapter.buy_shares", "tx.receipt")
+        **attributes: Initial attributes to attach
+
+    Yields:
+        The Span, so the block can add attributes or record returned errors
+    """
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        attributes=dict(attributes),
+        bet_slip_id=_current_bet_slip_id.get(),
+        trace_id=_current_trace_id.get(),
+        parent=parent.name if parent else None,
+        start_time=time.time(),
+    )
+    token = _current_span.set(current)
+    otel_context = (
+        otel_trace.get_tracer("bet_router").start_as_current_span(name)
+        if OTEL_ENABLED else None
+    )
+    otel_span = otel_context.__enter__() if otel_context else None
+    started = time.perf_counter()
+
+    try:
+        yield current
+    except Exception as e:
+        current.record_error(e)
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(token)
+
+        if otel_span is not None:
+            if current.bet_slip_id is not None:
+                otel_span.set_attribute("bet_slip_id", current.bet_slip_id)
+            for key, value in current.attributes.items():
+                if isinstance(value, (str, bool, int, float)):
+                    otel_span.set_attribute(key, value)
+            if current.status == "error":
+                otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, current.error))
+            otel_context.__exit__(None, None, None)
+
+        _emit(current)
@@ -1,39 +1,68 @@
 import os
 import sys
+from typing import Dict, Iterable, Union
+
 import requests
 from dotenv import load_dotenv
 
+from bet_execution.price_client import MarketKey, PriceQuote, fetch_prices
+
 load_dotenv()
 
 BASE_URL = os.getenv("BASE_URL", "http://localhost:3000")
 
 MARKETPLACE_PATHS = {
     2: "slaughterhouse-predictions",
-    3: "terminal-degenerecy-labs",
+    3: "terminal-degeneracy-labs",
 }
 
 
-def get_prices(marketplace_id: int, market_id: int):
+def get_prices(marketplace_id: int, market_id: int, timeout: float = 10.0) -> Union[list, dict, Exception]:
     """
     Calls the get-prices endpoint for a given marketplace and market.
+
+    Returns:
+        The endpoint's JSON response, or Exception on an invalid marketplace or failed request
     """
     if marketplace_id not in MARKETPLACE_PATHS:
-        print(
-            f"Error: Invalid marketplaceId: {marketplace_id}. Must be 2 or 3.",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+        return Exception(f"Invalid marketplaceId: {marketplace_id}. Must be one of {list(MARKETPLACE_PATHS)}.")
 
     path = MARKETPLACE_PATHS[marketplace_id]
     url = f"{BASE_URL}/{path}/get-prices"
     payload = {"marketId": market_id}
 
-    print(f"Calling {url} with payload: {payload}")
-
     try:
-        response = requests.post(url, json=payload)
+        response = requests.post(url, json=payload, timeout=timeout)
         response.raise_for_status()  # Raises an HTTPError for bad responses (4xx or 5xx)
         return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred: {e}", file=sys.stderr)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        return Exception(f"get-prices failed for marketplace {marketplace_id} market {market_id}: {e}")
+
+
+def get_prices_batch(markets: Iterable[MarketKey]) -> Union[Dict[MarketKey, PriceQuote], Exception]:
+    """
+    Fetch prices for many (marketplace_id, market_id) pairs concurrently.
+
+    Returns:
+        {(marketplace_id, market_id): PriceQuote} with a per-market price list or error
+    """
+    return fetch_prices(markets, BASE_URL)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    if len(args) < 2 or len(args) % 2:
+        print("Usage: python client.py <marketplace_id> <market_id> [<marketplace_id> <market_id> ...]", file=sys.stderr)
         sys.exit(1)
+
+    quotes = get_prices_batch(zip(args[::2], args[1::2]))
+    if isinstance(quotes, Exception):
+        print(f"An error occurred: {quotes}", file=sys.stderr)
+        sys.exit(1)
+
+    for (marketplace_id, market_id), quote in quotes.items():
+        if quote.ok:
+            print(f"{marketplace_id}/{market_id}: {quote.prices}")
+        else:
+            print(f"{marketplace_id}/{market_id}: error: {quote.error}", file=sys.stderr)
+    sys.exit(0 if all(quote.ok for quote in quotes.values()) else 1)
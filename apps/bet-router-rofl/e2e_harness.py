@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Bet Router ROFL - End-to-End Throughput Harness
+
+Runs the real listener, executor and recorder from main.py against a local chain
+and a simulated marketplace adapter, and reports slip latency percentiles and
+throughput for the whole pipeline.
+
+SETUP:
+1. Start a chain backend: an in-process EthereumTester (default, needs
+   `pip install "web3[tester]"`) or a local dev node via --rpc-url (anvil,
+   hardhat node, ...) whose first account is unlocked and funded
+2. Deploy MockUSDC and PolyBet from the compiled artifacts, register four
+   marketplaces (IDs 2 and 3 map to the simulated adapters) and fund a bettor
+3. Serve a MarketplaceSimulator over HTTP and point main.py at it
+
+PROCESS FLOW:
+1. Emitter places bets at --rate slips/sec → BetSlipCreated events
+2. main.log_loop picks them up → BUY FLOW → recordProxiedBetPlaced + status update
+3. With --sell, the emitter calls initiateSellProxiedBets for every Placed slip
+   → BetSlipSellingStateUpdate events → SELL FLOW → recordProxiedBetSold + Closed
+
+MEASURED PHASES (per slip):
+- listener: event emitted (receipt mined) → handler picks it up
+- executor: execute_optimal_bet / sell adapter calls
+- recorder: contract writes (proxied bets + status updates)
+- end_to_end: event emitted → final status written
+
+USAGE:
+    python e2e_harness.py --slips 50 --rate 5 --sell
+    python e2e_harness.py --rpc-url http://127.0.0.1:8545 --slips 200 --rate 20
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from eth_account import Account
+from web3 import Web3
+
+from bet_execution import metrics, telemetry
+from bet_execution.marketplace_simulator import create_simulated_marketplaces
+from bet_execution.bet_executor import SCHEMA_TO_MARKETPLACE_ID
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Hardhat artifacts built from contracts/contracts (same ABI main.py defaults to)
+ARTIFACTS_DIR = os.path.join(HERE, "..", "..", "contracts", "artifacts", "contracts")
+POLYBET_ARTIFACT_PATH = os.path.normpath(os.path.join(ARTIFACTS_DIR, "polybet.sol", "PolyBet.json"))
+MOCK_USDC_ARTIFACT_PATH = os.path.normpath(os.path.join(ARTIFACTS_DIR, "mUSDC.sol", "MockUSDC.json"))
+
+# PolyBet enums
+STATUS_PLACED = 2
+STATUS_FAILED = 4
+STATUS_CLOSED = 5
+CHAIN_FAMILY_SVM = 1
+
+USDC_UNITS = 1_000_000
+
+
+def load_artifact(path: str) -> Dict:
+    """Load a compiled contract artifact (abi + bytecode)."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def connect(rpc_url: Optional[str]) -> Web3:
+    """Connect to a local dev node, or spin up an in-process EthereumTester chain."""
+    if rpc_url:
+        w3 = Web3(Web3.HTTPProvider(rpc_url))
+    else:
+        try:
+            from web3 import EthereumTesterProvider
+            w3 = Web3(EthereumTesterProvider())
+        except ImportError as e:
+            raise RuntimeError(
+                'In-process chain requires `pip install "web3[tester]"`, or pass --rpc-url'
+            ) from e
+
+    if not w3.is_connected():
+        raise ConnectionError(f"Failed to connect to the RPC node at {rpc_url}")
+    return w3
+
+
+def send_transaction(w3: Web3, tx_fn, private_key: str):
+    """Build, sign and send a contract call or deployment; returns the receipt."""
+    sender = Account.from_key(private_key).address
+    tx = tx_fn.build_transaction({
+        "from": sender,
+        "nonce": w3.eth.get_transaction_count(sender),
+        "chainId": w3.eth.chain_id,
+    })
+    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
+    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+    if receipt.status != 1:
+        raise RuntimeError(f"Transaction reverted: {tx_hash.hex()}")
+    return receipt
+
+
+def fund_account(w3: Web3, address: str, amount_eth: float = 10.0):
+    """Send gas money from the node's first unlocked account."""
+    tx_hash = w3.eth.send_transaction({
+        "from": w3.eth.accounts[0],
+        "to": address,
+        "value": w3.to_wei(amount_eth, "ether"),
+    })
+    w3.eth.wait_for_transaction_receipt(tx_hash)
+
+
+def deploy_contract(w3: Web3, artifact: Dict, private_key: str):
+    """Deploy a contract artifact and return the bound contract."""
+    factory = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+    receipt = send_transaction(w3, factory.constructor(), private_key)
+    return w3.eth.contract(address=receipt.contractAddress, abi=artifact["abi"])
+
+
+def deploy_polybet_stack(w3: Web3, owner_key: str, bettor_key: str, total_collateral: int):
+    """
+    Deploy MockUSDC + PolyBet, register marketplaces and fund the bettor.
+
+    Args:
+        w3: Connected Web3 instance
+        owner_key: Key of the router/owner account (signs all onlyOwner calls)
+        bettor_key: Key of the account placing bets
+        total_collateral: mUSDC base units to mint to the bettor
+
+    Returns:
+        (polybet_contract, usdc_contract)
+    """
+    owner = Account.from_key(owner_key).address
+    bettor = Account.from_key(bettor_key).address
+    fund_account(w3, owner)
+    fund_account(w3, bettor)
+
+    usdc = deploy_contract(w3, load_artifact(MOCK_USDC_ARTIFACT_PATH), owner_key)
+    polybet = deploy_contract(w3, load_artifact(POLYBET_ARTIFACT_PATH), owner_key)
+
+    send_transaction(w3, polybet.functions.setCollateralToken(usdc.address), owner_key)
+
+    # placeBet validates marketplaceId < marketplaces.length, so IDs 0..3 must exist
+    for marketplace_id in range(4):
+        send_transaction(
+            w3,
+            polybet.functions.addMarketplace(
+                marketplace_id, CHAIN_FAMILY_SVM, f"harness-marketplace-{marketplace_id}", ""
+            ),
+            owner_key
+        )
+
+    send_transaction(w3, usdc.functions.mint(bettor, total_collateral), owner_key)
+    send_transaction(w3, usdc.functions.approve(polybet.address, total_collateral), bettor_key)
+    return polybet, usdc
+
+
+def int_to_bytes32(value: int) -> bytes:
+    """Encode an integer as big-endian bytes32 (inverse of main.decode_bytes32_to_int)."""
+    return value.to_bytes(32, byteorder="big")
+
+
+class PipelineTimer:
+    """Wraps main.py's phase functions and collects per-slip timings."""
+
+    def __init__(self, router_module, quiet: bool = True):
+        self.router = router_module
+        self.quiet = quiet
+        self.emitted_at: Dict[int, float] = {}
+        self.sell_emitted_at: Dict[int, float] = {}
+        self.phases: Dict[str, List[float]] = defaultdict(list)
+        self.completed: Dict[int, float] = {}
+        self.sell_completed: Dict[int, float] = {}
+        self.placed_slips: List[int] = []
+        self.failed_slips: List[int] = []
+        self.current_slip: Optional[int] = None
+        self.current_recording = 0.0
+
+    def _output(self):
+        return contextlib.redirect_stdout(io.StringIO()) if self.quiet else contextlib.nullcontext()
+
+    def install(self):
+        """Monkeypatch main.py so every phase is timed without changing its behaviour."""
+        router = self.router
+        original_buy = router.handle_bet_slip_created_event
+        original_sell = router.handle_bet_slip_selling_state_update_event
+        original_execute = router.execute_optimal_bet
+        original_record = router.record_proxied_bet_on_contract
+        original_record_sold = router.record_proxied_bet_sold
+        original_status = router.update_bet_slip_status
+        original_closed = router.update_bet_slip_status_to_closed
+        original_post = router.requests.post
+
+        def timed(name, fn):
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter() - started
+                    self.phases[name].append(elapsed)
+                    if name == "recorder":
+                        self.current_recording += elapsed
+            return wrapper
+
+        def on_created(event):
+            bet_slip_id = event["args"]["betId"]
+            self.current_slip = bet_slip_id
+            self.current_recording = 0.0
+            if bet_slip_id in self.emitted_at:
+                self.phases["listener"].append(time.perf_counter() - self.emitted_at[bet_slip_id])
+            with self._output():
+                original_buy(event)
+            self.phases["buy_recorder_total"].append(self.current_recording)
+
+        def on_selling(event):
+            bet_slip_id = event["args"]["betId"]
+            self.current_slip = bet_slip_id
+            self.current_recording = 0.0
+            if bet_slip_id in self.sell_emitted_at:
+                self.phases["sell_listener"].append(time.perf_counter() - self.sell_emitted_at[bet_slip_id])
+            with self._output():
+                original_sell(event)
+            self.phases["sell_recorder_total"].append(self.current_recording)
+            self.sell_completed.setdefault(bet_slip_id, time.perf_counter())
+
+        def on_status(bet_slip_id, pool_configs, execution_result, failure_reason):
+            result = timed("recorder", original_status)(bet_slip_id, pool_configs, execution_result, failure_reason)
+            self.completed[bet_slip_id] = time.perf_counter()
+            status = self.router.contract.functions.getBetSlip(bet_slip_id).call()[6]
+            (self.placed_slips if status == STATUS_PLACED else self.failed_slips).append(bet_slip_id)
+            return result
+
+        def on_closed(bet_slip_id):
+            result = timed("recorder", original_closed)(bet_slip_id)
+            self.sell_completed[bet_slip_id] = time.perf_counter()
+            return result
+
+        router.handle_bet_slip_created_event = on_created
+        router.handle_bet_slip_selling_state_update_event = on_selling
+        router.execute_optimal_bet = timed("executor", original_execute)
+        router.record_proxied_bet_on_contract = timed("recorder", original_record)
+        router.record_proxied_bet_sold = timed("recorder", original_record_sold)
+        router.update_bet_slip_status = on_status
+        router.update_bet_slip_status_to_closed = on_closed
+        # The sell flow talks to the adapter directly; only time the HTTP leg
+        router.requests = type("TimedRequests", (), {"post": staticmethod(timed("sell_executor", original_post))})
+
+    def summary(self, started: float, finished: float) -> Dict[str, Dict[str, float]]:
+        """Percentiles per phase plus end-to-end latency and throughput."""
+        end_to_end = [self.completed[i] - self.emitted_at[i] for i in self.completed if i in self.emitted_at]
+        sell_end_to_end = [
+            self.sell_completed[i] - self.sell_emitted_at[i]
+            for i in self.sell_completed if i in self.sell_emitted_at
+        ]
+        series = dict(self.phases)
+        series["end_to_end"] = end_to_end
+        if sell_end_to_end:
+            series["sell_end_to_end"] = sell_end_to_end
+
+        def percentile(values: List[float], p: float) -> float:
+            ordered = sorted(values)
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+        stats = {
+            name: {
+                "count": len(values),
+                "p50_seconds": percentile(values, 0.50),
+                "p95_seconds": percentile(values, 0.95),
+                "p99_seconds": percentile(values, 0.99),
+            }
+            for name, values in series.items()
+        }
+        elapsed = finished - started
+        stats["throughput"] = {
+            "elapsed_seconds": elapsed,
+            "slips_completed": len(self.completed),
+            "slips_placed": len(self.placed_slips),
+            "slips_failed": len(self.failed_slips),
+            "sells_completed": len(self.sell_completed),
+            "slips_per_minute": len(self.completed) / elapsed * 60 if elapsed > 0 else 0.0,
+        }
+        return stats
+
+
+async def emit_bet_slips(
+    w3: Web3,
+    polybet,
+    bettor_key: str,
+    owner_key: str,
+    timer: PipelineTimer,
+    slips: List[tuple],
+    amount: int,
+    rate: float,
+    sell: bool
+):
+    """Place bets at `rate` per second; with `sell`, move Placed slips to Selling."""
+    interval = 1.0 / rate if rate > 0 else 0.0
+    sold = set()
+
+    async def initiate_pending_sells():
+        for bet_slip_id in list(timer.placed_slips):
+            if bet_slip_id in sold:
+                continue
+            sold.add(bet_slip_id)
+            send_transaction(w3, polybet.functions.initiateSellProxiedBets(bet_slip_id), owner_key)
+            timer.sell_emitted_at[bet_slip_id] = time.perf_counter()
+
+    for index, (market_ids, marketplace_ids, option) in enumerate(slips):
+        send_transaction(
+            w3,
+            polybet.functions.placeBet(
+                0,  # MaximizeShares
+                amount,
+                option,
+                [int_to_bytes32(m) for m in marketplace_ids],
+                [int_to_bytes32(m) for m in market_ids],
+                False,  # instantArbitrage
+                0  # parentId
+            ),
+            bettor_key
+        )
+        timer.emitted_at[index] = time.perf_counter()
+        if sell:
+            await initiate_pending_sells()
+        await asyncio.sleep(interval)
+
+    if sell:
+        # Keep draining until every slip has settled into a final buy status
+        while len(timer.completed) < len(slips):
+            await initiate_pending_sells()
+            await asyncio.sleep(0.05)
+        await initiate_pending_sells()
+
+
+async def run_harness(
+    rpc_url: Optional[str] = None,
+    num_slips: int = 50,
+    rate: float = 5.0,
+    num_pools: int = 6,
+    pools_per_slip: int = 2,
+    amount: float = 10.0,
+    sell: bool = False,
+    poll_interval: float = 0.1,
+    timeout: float = 600.0,
+    seed: int = 7,
+    quiet: bool = True,
+    span_logs: bool = False,
+    metrics_port: Optional[int] = None,
+    **simulator_kwargs
+) -> Dict[str, Dict[str, float]]:
+    """
+    Deploy the stack, drive num_slips bet slips through main.py and collect timings.
+
+    Returns:
+        Per-phase latency percentiles and a throughput section
+    """
+    w3 = connect(rpc_url)
+    owner_key = Account.create().key.hex()
+    bettor_key = Account.create().key.hex()
+    amount_units = int(amount * USDC_UNITS)
+    polybet, _ = deploy_polybet_stack(w3, owner_key, bettor_key, amount_units * num_slips)
+
+    simulator, pools_by_schema = create_simulated_marketplaces(num_pools, seed=seed, **simulator_kwargs)
+    server = simulator.serve()
+    host, port = server.server_address[:2]
+
+    # main.py reads its configuration at import time
+    os.environ["PRIVATE_KEY"] = owner_key
+    os.environ["POLYBETS_CONTRACT_ADDRESS"] = polybet.address
+    os.environ["POLYBETS_CONTRACT_ABI_PATH"] = POLYBET_ARTIFACT_PATH
+    os.environ["BET_EXECUTION_BASE_URL"] = f"http://{host}:{port}"
+    import main as router
+
+    router.PRIVATE_KEY = owner_key
+    router.POLYBETS_CONTRACT_ADDRESS = polybet.address
+    router.POLYBETS_CONTRACT_ABI_PATH = POLYBET_ARTIFACT_PATH
+    router.BET_EXECUTION_BASE_URL = f"http://{host}:{port}"
+    router.LMSR_DATA_LOADER = simulator.get_lmsr_data
+    router.init_web3(w3)
+
+    telemetry.TELEMETRY_JSON_LOGS = span_logs
+    telemetry.add_span_listener(metrics.record_span)
+    if metrics_port is not None:
+        metrics.start_metrics_server(metrics_port, host="127.0.0.1")
+    timer = PipelineTimer(router, quiet=quiet)
+    timer.install()
+
+    rng = random.Random(seed)
+    all_pools = [(pool_id, SCHEMA_TO_MARKETPLACE_ID[schema]) for schema, ids in pools_by_schema.items() for pool_id in ids]
+    slips = []
+    for _ in range(num_slips):
+        chosen = rng.sample(all_pools, min(pools_per_slip, len(all_pools)))
+        slips.append(([pool_id for pool_id, _ in chosen], [mp_id for _, mp_id in chosen], rng.randint(0, 1)))
+
+    listener = asyncio.create_task(router.log_loop(poll_interval=poll_interval))
+    await asyncio.sleep(poll_interval)  # let the listener pin its starting block
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(
+            emit_bet_slips(w3, polybet, bettor_key, owner_key, timer, slips, amount_units, rate, sell),
+            timeout=timeout
+        )
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            buys_done = len(timer.completed) >= num_slips
+            sells_done = not sell or len(timer.sell_completed) >= len(timer.placed_slips)
+            if buys_done and sells_done:
+                break
+            await asyncio.sleep(poll_interval)
+    finally:
+        finished = time.perf_counter()
+        listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await listener
+        server.shutdown()
+
+    return timer.summary(started, finished)
+
+
+# Example usage: python e2e_harness.py --slips 50 --rate 5 --sell
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end throughput test for the bet router")
+    parser.add_argument("--rpc-url", default=None, help="Local dev chain RPC (default: in-process EthereumTester)")
+    parser.add_argument("--slips", type=int, default=50, help="Number of bet slips to place")
+    parser.add_argument("--rate", type=float, default=5.0, help="Bet slips emitted per second")
+    parser.add_argument("--pools", type=int, default=6, help="Number of simulated pools")
+    parser.add_argument("--pools-per-slip", type=int, default=2, help="Pools offered to each slip")
+    parser.add_argument("--amount", type=float, default=10.0, help="mUSDC collateral per slip")
+    parser.add_argument("--sell", action="store_true", help="Also sell every placed slip")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Listener poll interval in seconds")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Give up after this many seconds")
+    parser.add_argument("--latency", type=float, default=0.0, help="Adapter latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Adapter error probability (0-1)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve router metrics on this port while running")
+    parser.add_argument("--verbose", action="store_true", help="Show main.py's per-event logging")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--span-logs", action="store_true", help="Emit per-phase JSON span logs to stderr")
+    args = parser.parse_args()
+
+    stats = asyncio.run(run_harness(
+        rpc_url=args.rpc_url,
+        num_slips=args.slips,
+        rate=args.rate,
+        num_pools=args.pools,
+        pools_per_slip=args.pools_per_slip,
+        amount=args.amount,
+        sell=args.sell,
+        poll_interval=args.poll_interval,
+        timeout=args.timeout,
+        quiet=not args.verbose,
+        span_logs=args.span_logs,
+        metrics_port=args.metrics_port,
+        latency=args.latency,
+        error_rate=args.error_rate
+    ))
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        throughput = stats.pop("throughput")
+        print("=== Bet Router End-to-End Harness ===")
+        print(f"  Elapsed:        {throughput['elapsed_seconds']:.2f}s")
+        print(f"  Slips:          {throughput['slips_completed']} completed "
+              f"({throughput['slips_placed']} placed, {throughput['slips_failed']} failed)")
+        print(f"  Sells:          {throughput['sells_completed']}")
+        print(f"  Throughput:     {throughput['slips_per_minute']:.1f} slips/min")
+        for name, phase in stats.items():
+            print(f"  {name:<20} n={phase['count']:<5} p50={phase['p50_seconds'] * 1000:8.1f}ms "
+                  f"p95={phase['p95_seconds'] * 1000:8.1f}ms p99={phase['p99_seconds'] * 1000:8.1f}ms")
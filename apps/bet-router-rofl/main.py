@@ -27,6 +27,11 @@ ENVIRONMENT VARIABLES REQUIRED:
 - POLYBETS_CONTRACT_ABI_PATH: Path to contract ABI file
 - PRIVATE_KEY: Private key for transaction signing
 - BET_EXECUTION_BASE_URL: Base URL for marketplace adapter API
+- REOPTIMIZE_ON_FAILURE: "true" to re-allocate budget from failed legs (optional)
+- LMSR_FIXED_POINT_QUOTES: "true" to quote binary pools with the fixed-point engine (optional)
+- TELEMETRY_JSON_LOGS: "false" to stop emitting per-phase JSON span logs (optional)
+- OTEL_ENABLED: "true" to mirror spans to OpenTelemetry when the SDK is installed (optional)
+- METRICS_PORT: Port to serve Prometheus metrics on at /metrics (optional)
 
 MARKETPLACE MAPPING:
 - Marketplace ID 2 → "canibeton_variant1" → "slaughterhouse-predictions"
@@ -57,6 +62,18 @@ from bet_execution.bet_executor import (
     get_marketplace_id_from_endpoint,
     get_schema_from_marketplace_id
 )
+from bet_execution.adapter_reconciliation import TradeRecorder
+from bet_execution.get_lmsr_data import LMSRDataCache
+from bet_execution.optimal_betting import PoolConfig, get_option_name
+from bet_execution.optimal_selling import SellHolding, find_optimal_sell
+from bet_execution.metrics import (
+    CHAIN_HEAD_LAG_BLOCKS,
+    EVENT_LAG_BLOCKS,
+    record_slip_outcome,
+    record_span,
+    start_metrics_server
+)
+from bet_execution.telemetry import add_span_listener, bet_slip_context, span
 
 
 # --- Helper Functions ---
@@ -144,6 +161,22 @@ PRIVATE_KEY = os.getenv("PRIVATE_KEY")  # For sending transactions if needed
 
 BET_EXECUTION_BASE_URL = os.getenv("BET_EXECUTION_BASE_URL") or "http://localhost:3000"
 
+# Re-run the allocator over healthy pools when a leg fails
+REOPTIMIZE_ON_FAILURE = os.getenv("REOPTIMIZE_ON_FAILURE", "false").lower() == "true"
+
+# Drop pools whose live adapter price differs from the DB snapshot by more than this (off when unset)
+PRICE_CHECK_TOLERANCE = float(os.getenv("PRICE_CHECK_TOLERANCE")) if os.getenv("PRICE_CHECK_TOLERANCE") else None
+
+# Port for the Prometheus /metrics endpoint (disabled when unset)
+METRICS_PORT = os.getenv("METRICS_PORT")
+
+# Append every filled buy and its pool snapshot here for reconcile_adapter.py (off when unset)
+ADAPTER_RECORDING_PATH = os.getenv("ADAPTER_RECORDING_PATH")
+TRADE_RECORDER = TradeRecorder(ADAPTER_RECORDING_PATH) if ADAPTER_RECORDING_PATH else None
+
+# Points per pool cost-curve table the optimizer searches on (unset = exact quote per candidate)
+COST_CURVE_RESOLUTION = int(os.getenv("COST_CURVE_RESOLUTION")) if os.getenv("COST_CURVE_RESOLUTION") else None
+
 # --- Basic Sanity Checks ---
 if not all(
     [
@@ -170,17 +203,41 @@ def load_contract_abi():
 
 
 # --- Web3 Setup ---
-w3 = Web3(Web3.HTTPProvider(SAPPHIRETESTNET_RPC_URL))
-if not w3.is_connected():
-    raise ConnectionError(
-        f"Failed to connect to the RPC node at {SAPPHIRETESTNET_RPC_URL}"
-    )
+# Populated by init_web3(); kept at module level so the handlers below can use them.
+w3 = None
+account = None
+contract = None
+CONTRACT_ABI = None
+
+# Optional (pool_id, schema) -> LMSRData override for pool state (defaults to the database view)
+LMSR_DATA_LOADER = None
+
+
+def init_web3(web3_instance=None):
+    """
+    Connect to the RPC node and bind the signing account and PolyBet contract.
+    
+    Args:
+        web3_instance: Optional pre-built Web3 instance (e.g. a local dev chain or
+            in-process tester backend). Defaults to an HTTP provider on SAPPHIRETESTNET_RPC_URL.
+        
+    Returns:
+        The connected Web3 instance
+    """
+    global w3, account, contract, CONTRACT_ABI
+
+    w3 = web3_instance or Web3(Web3.HTTPProvider(SAPPHIRETESTNET_RPC_URL))
+    if not w3.is_connected():
+        raise ConnectionError(
+            f"Failed to connect to the RPC node at {SAPPHIRETESTNET_RPC_URL}"
+        )
 
-account = w3.eth.account.from_key(PRIVATE_KEY)
-w3.eth.default_account = account.address
+    account = w3.eth.account.from_key(PRIVATE_KEY)
+    w3.eth.default_account = account.address
 
-CONTRACT_ABI = load_contract_abi()
-contract = w3.eth.contract(address=POLYBETS_CONTRACT_ADDRESS, abi=CONTRACT_ABI)
+    CONTRACT_ABI = load_contract_abi()
+    contract = w3.eth.contract(address=POLYBETS_CONTRACT_ADDRESS, abi=CONTRACT_ABI)
+    return w3
 
 
 # --- Smart Contract Interaction ---
@@ -252,7 +309,7 @@ def record_proxied_bet_on_contract(
         print(f"  📝 Recording proxied bet on contract...")
         print(f"     Bet ID: {proxied_bet_id.hex()}")
         print(f"     Market: {successful_bet.market_id} on marketplace {marketplace_id}")
-        print(f"     Option: {'YES' if option == 0 else 'NO'}")
+        print(f"     Option: {get_option_name(option)}")
         print(f"     Amount: ${successful_bet.collateral_amount:.2f} → {shares_bought} shares")
         
         # Get current nonce and ensure we have enough gas
@@ -279,14 +336,19 @@ def record_proxied_bet_on_contract(
         })
         
         # Sign and send transaction
-        signed_tx = w3.eth.account.sign_transaction(record_tx, private_key=PRIVATE_KEY)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        with span("tx.send", function="recordProxiedBetPlaced"):
+            signed_tx = w3.eth.account.sign_transaction(record_tx, private_key=PRIVATE_KEY)
+            tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
         
         print(f"     Transaction sent. Tx Hash: {tx_hash.hex()}")
         
         # Wait for transaction to be mined (with timeout)
         try:
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            with span("tx.receipt", function="recordProxiedBetPlaced") as s:
+                receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+                s.set("gas_used", receipt.gasUsed)
+                if receipt.status != 1:
+                    s.record_error("reverted")
             
             if receipt.status == 1:
                 print(f"     ✅ Proxied bet recorded successfully!")
@@ -327,9 +389,16 @@ def handle_bet_slip_created_event(event):
     bet_slip_id = event["args"]["betId"]
     print(f"🔍 Fetching details for BetSlip ID: {bet_slip_id}...")
 
+    with bet_slip_context(bet_slip_id), span("slip.buy", block=event.get("blockNumber")):
+        _process_bet_slip_created(bet_slip_id)
+
+
+def _process_bet_slip_created(bet_slip_id: int):
+    """Fetch a newly created bet slip and run the buy flow for it."""
     try:
         # STEP 1: Fetch bet slip data from contract
-        bet_slip_data = contract.functions.getBetSlip(bet_slip_id).call()
+        with span("contract.get_bet_slip"):
+            bet_slip_data = contract.functions.getBetSlip(bet_slip_id).call()
         print("\n=== Bet Slip Details ===")
         print(f"  Bet ID: {bet_slip_id}")
         print(f"  Raw bet slip data: {bet_slip_data}")
@@ -372,9 +441,16 @@ def handle_bet_slip_selling_state_update_event(event):
     bet_slip_id = event["args"]["betId"]
     print(f"🔍 Fetching details for BetSlip ID: {bet_slip_id}...")
 
+    with bet_slip_context(bet_slip_id), span("slip.sell", block=event.get("blockNumber")):
+        _process_bet_slip_selling_state_update(bet_slip_id)
+
+
+def _process_bet_slip_selling_state_update(bet_slip_id: int):
+    """Fetch a bet slip moved to Selling and run the sell flow for it."""
     try:
         # STEP 1: Fetch bet slip data from contract
-        bet_slip_data = contract.functions.getBetSlip(bet_slip_id).call()
+        with span("contract.get_bet_slip"):
+            bet_slip_data = contract.functions.getBetSlip(bet_slip_id).call()
         print("\n=== Bet Slip Details ===")
         print(f"  Bet ID: {bet_slip_id}")
         print(f"  Strategy: {bet_slip_data[0]}")
@@ -427,7 +503,10 @@ def handle_buy_flow(bet_slip_id: int, bet_slip_data):
         print(f"  Marketplaces: {marketplace_ids}")
         
         # STEP 3: Create pool configurations for optimal betting
-        pool_configs = create_pool_configs_from_market_data(market_ids, marketplace_ids)
+        with span("pool_configs", pools=len(market_ids)) as s:
+            pool_configs = create_pool_configs_from_market_data(market_ids, marketplace_ids)
+            if isinstance(pool_configs, Exception):
+                s.record_error(pool_configs)
         
         if isinstance(pool_configs, Exception):
             print(f"  ❌ Error creating pool configs: {pool_configs}")
@@ -437,14 +516,24 @@ def handle_buy_flow(bet_slip_id: int, bet_slip_data):
             option = bet_slip_data[3]  # outcomeIndex
             
             print(f"  Executing optimal allocation across {len(pool_configs)} pools...")
-            execution_result = execute_optimal_bet(
-                pool_configs=pool_configs,
-                total_amount=collateral_amount_usdc,
-                option=option,
-                base_url=BET_EXECUTION_BASE_URL,  # Marketplace adapter API
-                optimization_method=OptimizationMethod.GRID_SEARCH,
-                dry_run=False  # Set to True for testing
-            )
+            with span("execution", amount=collateral_amount_usdc, pools=len(pool_configs)) as s:
+                execution_result = execute_optimal_bet(
+                    pool_configs=pool_configs,
+                    total_amount=collateral_amount_usdc,
+                    option=option,
+                    base_url=BET_EXECUTION_BASE_URL,  # Marketplace adapter API
+                    optimization_method=OptimizationMethod.GRID_SEARCH,
+                    dry_run=False,  # Set to True for testing
+                    reoptimize_on_failure=REOPTIMIZE_ON_FAILURE,
+                    lmsr_data_loader=LMSR_DATA_LOADER,
+                    price_check_tolerance=PRICE_CHECK_TOLERANCE,
+                    trade_recorder=TRADE_RECORDER,
+                    cost_curve_resolution=COST_CURVE_RESOLUTION
+                )
+                if isinstance(execution_result, Exception):
+                    s.record_error(execution_result)
+                else:
+                    s.set("success_rate", execution_result.success_rate)
 
             print(f"Done executing optimal bet. Execution result: {execution_result}")
             
@@ -491,6 +580,11 @@ def handle_sell_flow(bet_slip_id: int, bet_slip_data, proxied_bet_ids: list):
     """
     Handle the sell flow - execute sell orders for the specified proxied bets.
     
+    The holdings are first quoted with find_optimal_sell (per-pool proceeds from
+    the LMSR state), then sold best-paying pool first. Each bet is sold in full,
+    as recorded; if the plan leaves shares unsold the slip stays open instead
+    of being closed.
+    
     Args:
         bet_slip_id: The bet slip ID
         bet_slip_data: The bet slip data from the contract
@@ -501,27 +595,84 @@ def handle_sell_flow(bet_slip_id: int, bet_slip_data, proxied_bet_ids: list):
         print(f"  Selling {len(proxied_bet_ids)} proxied bets...")
         
         successful_sales = 0
+        partial_sales = 0
         
+        # Load every position first so the exit can be planned across pools
+        holdings = []
         for bet_id in proxied_bet_ids:
             try:
-                # Get proxied bet details
-                proxied_bet_data = contract.functions.getProxiedBet(bet_id).call()
+                with span("contract.get_proxied_bet"):
+                    proxied_bet_data = contract.functions.getProxiedBet(bet_id).call()
                 
                 marketplace_id = proxied_bet_data[2]  # marketplaceId at index 2
-                market_id = proxied_bet_data[3]       # marketId at index 3
-                shares_to_sell = proxied_bet_data[9]  # sharesBought at index 9
-                option_index = proxied_bet_data[4]    # optionIndex at index 4
+                schema = get_schema_from_marketplace_id(marketplace_id)
+                if isinstance(schema, Exception):
+                    print(f"     ❌ Error getting schema for bet {bet_id.hex()[:8]}: {schema}")
+                    continue
+                
+                holdings.append(SellHolding(
+                    pool_config=PoolConfig(pool_id=proxied_bet_data[3], schema=schema),  # marketId at index 3
+                    option=proxied_bet_data[4],     # optionIndex at index 4
+                    shares=proxied_bet_data[9],     # sharesBought at index 9
+                    reference=(bet_id, marketplace_id)
+                ))
+            except Exception as bet_error:
+                print(f"     🚨 Error loading bet {bet_id.hex()}: {bet_error}")
+        
+        with span("sell_optimization", positions=len(holdings)) as s:
+            sell_plan = find_optimal_sell(holdings, lmsr_cache=LMSRDataCache(LMSR_DATA_LOADER))
+            if isinstance(sell_plan, Exception):
+                s.record_error(sell_plan)
+        
+        if isinstance(sell_plan, Exception):
+            # No quote available - sell every position in full, as placed
+            print(f"  ⚠️  Could not plan sell ({sell_plan}), selling all positions in full")
+            sell_orders = [(holding, holding.shares, None) for holding in holdings]
+        else:
+            print(f"  {sell_plan}")
+            sell_orders = []
+            for alloc in sell_plan.allocations:
+                if alloc.extrapolated:
+                    print(f"  ⚠️  Snapshot of pool {alloc.pool_config.pool_id} only prices {alloc.quoted_shares:.4f}/"
+                          f"{alloc.shares_to_sell:.4f} shares, expected proceeds are extrapolated")
+                remaining = alloc.shares_to_sell
+                pool_holdings = [
+                    holding for holding in holdings
+                    if (holding.pool_config.pool_id, holding.pool_config.schema, holding.option)
+                    == (alloc.pool_config.pool_id, alloc.pool_config.schema, alloc.option)
+                ]
+                for holding in pool_holdings:
+                    shares = min(holding.shares, remaining)
+                    remaining -= shares
+                    # Split the pool's expected proceeds over its bets pro rata; a pool the
+                    # snapshot could not price at all has no usable quote
+                    if alloc.quoted_shares == 0:
+                        expected = None
+                    else:
+                        expected = alloc.expected_proceeds * shares / alloc.shares_to_sell if alloc.shares_to_sell else 0.0
+                    sell_orders.append((holding, shares, expected))
+        
+        for holding, shares_to_sell, expected_proceeds in sell_orders:
+            bet_id, marketplace_id = holding.reference
+            try:
+                market_id = holding.pool_config.pool_id
+                option_index = holding.option
+                schema = holding.pool_config.schema
+                
+                if shares_to_sell < holding.shares:
+                    # Keep the slip open rather than close it with shares still held
+                    partial_sales += 1
+                    print(f"  ⚠️  Plan sells {shares_to_sell}/{holding.shares} shares of bet {bet_id.hex()[:8]}")
+                if shares_to_sell <= 0:
+                    print(f"  ⚠️  Nothing to sell for bet {bet_id.hex()[:8]}")
+                    continue
                 
                 print(f"  📤 Selling bet {bet_id.hex()[:8]}...")
                 print(f"     Market: {market_id} on marketplace {marketplace_id}")
                 print(f"     Shares to sell: {shares_to_sell}")
-                print(f"     Option: {'YES' if option_index == 0 else 'NO'}")
-                
-                # Get marketplace schema and endpoint
-                schema = get_schema_from_marketplace_id(marketplace_id)
-                if isinstance(schema, Exception):
-                    print(f"     ❌ Error getting schema: {schema}")
-                    continue
+                print(f"     Option: {get_option_name(option_index)}")
+                if expected_proceeds is not None:
+                    print(f"     Expected proceeds: ${expected_proceeds:.2f}")
                 
                 # Map schema to endpoint
                 if schema == "canibeton_variant1":
@@ -542,7 +693,11 @@ def handle_sell_flow(bet_slip_id: int, bet_slip_data, proxied_bet_ids: list):
                 
                 print(f"     Making sell request to: {sell_url}")
                 print(f"     Payload: {sell_payload}")
-                response = requests.post(sell_url, json=sell_payload, timeout=30)
+                with span("adapter.sell_shares", endpoint=endpoint_name, market_id=market_id) as s:
+                    response = requests.post(sell_url, json=sell_payload, timeout=30)
+                    s.set("status_code", response.status_code)
+                    if response.status_code not in (200, 201):
+                        s.record_error(f"HTTP {response.status_code}")
                 
                 print(f"     Response status: {response.status_code}")
                 print(f"     Response headers: {dict(response.headers)}")
@@ -563,8 +718,8 @@ def handle_sell_flow(bet_slip_id: int, bet_slip_data, proxied_bet_ids: list):
                     # New API format returns {"transactionId": "...", "collateralReceived": 3.536336}
                     collateral_received = response_data.get('collateralReceived', 0)
                     if not collateral_received:
-                        # Fallback estimation
-                        collateral_received = shares_to_sell  # Rough estimate
+                        # Fallback to the planned quote, or a rough estimate without one
+                        collateral_received = expected_proceeds if expected_proceeds is not None else shares_to_sell
                     
                     # Record the sell on the contract using recordProxiedBetSold
                     if record_proxied_bet_sold(bet_id, shares_to_sell, collateral_received):
@@ -590,11 +745,15 @@ def handle_sell_flow(bet_slip_id: int, bet_slip_data, proxied_bet_ids: list):
         print(f"  ✅ Successfully sold {successful_sales}/{len(proxied_bet_ids)} bets")
         
         # Update bet slip status to "Closed" after successful selling
-        if successful_sales > 0:
+        if partial_sales > 0:
+            print(f"  ⚠️  {partial_sales} bet(s) only partly sold, keeping current status")
+            record_slip_outcome("sell", "PartialSale")
+        elif successful_sales > 0:
             print(f"  📝 Updating bet slip status to 'Closed'...")
             update_bet_slip_status_to_closed(bet_slip_id)
         else:
             print(f"  ❌ No successful sales, keeping current status")
+            record_slip_outcome("sell", "NoSales")
 
     except Exception as e:
         print(f"🚨 Error in sell flow: {e}")
@@ -638,14 +797,19 @@ def record_proxied_bet_sold(bet_id: bytes, shares_sold: int, collateral_received
         })
         
         # Sign and send transaction
-        signed_tx = w3.eth.account.sign_transaction(record_tx, private_key=PRIVATE_KEY)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        with span("tx.send", function="recordProxiedBetSold"):
+            signed_tx = w3.eth.account.sign_transaction(record_tx, private_key=PRIVATE_KEY)
+            tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
         
         print(f"     Transaction sent. Tx Hash: {tx_hash.hex()}")
         
         # Wait for transaction to be mined
         try:
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            with span("tx.receipt", function="recordProxiedBetSold") as s:
+                receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+                s.set("gas_used", receipt.gasUsed)
+                if receipt.status != 1:
+                    s.record_error("reverted")
             
             if receipt.status == 1:
                 print(f"     ✅ Proxied bet sale recorded successfully!")
@@ -714,22 +878,30 @@ def update_bet_slip_status(bet_slip_id: int, pool_configs, execution_result, fai
         })
 
         # Sign and send transaction
-        signed_tx = w3.eth.account.sign_transaction(update_tx, private_key=PRIVATE_KEY)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        with span("tx.send", function="updateBetSlipStatus", status=status_name):
+            signed_tx = w3.eth.account.sign_transaction(update_tx, private_key=PRIVATE_KEY)
+            tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
         print(f"  Transaction sent to update status. Tx Hash: {tx_hash.hex()}")
 
         # Wait for the transaction to be mined
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        with span("tx.receipt", function="updateBetSlipStatus", status=status_name) as s:
+            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            s.set("gas_used", receipt.gasUsed)
+            if receipt.status != 1:
+                s.record_error("reverted")
 
         if receipt.status == 1:
             print(f"  ✅ Transaction successful! Status for BetSlip ID {bet_slip_id} is now '{status_name}'.")
+            record_slip_outcome("buy", status_name)
         else:
             print(f"  ❌ Transaction failed! Could not update status for BetSlip ID {bet_slip_id}.")
             print(f"  Receipt: {receipt}")
+            record_slip_outcome("buy", "StatusUpdateFailed")
 
     except Exception as e:
         print(f"🚨 Error updating bet slip status: {e}")
+        record_slip_outcome("buy", "StatusUpdateFailed")
 
 
 def update_bet_slip_status_to_closed(bet_slip_id: int):
@@ -762,22 +934,30 @@ def update_bet_slip_status_to_closed(bet_slip_id: int):
         })
 
         # Sign and send transaction
-        signed_tx = w3.eth.account.sign_transaction(update_tx, private_key=PRIVATE_KEY)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        with span("tx.send", function="updateBetSlipStatus", status=status_name):
+            signed_tx = w3.eth.account.sign_transaction(update_tx, private_key=PRIVATE_KEY)
+            tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
         print(f"  Transaction sent to update status. Tx Hash: {tx_hash.hex()}")
 
         # Wait for the transaction to be mined
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        with span("tx.receipt", function="updateBetSlipStatus", status=status_name) as s:
+            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            s.set("gas_used", receipt.gasUsed)
+            if receipt.status != 1:
+                s.record_error("reverted")
 
         if receipt.status == 1:
             print(f"  ✅ Transaction successful! Status for BetSlip ID {bet_slip_id} is now '{status_name}'.")
+            record_slip_outcome("sell", status_name)
         else:
             print(f"  ❌ Transaction failed! Could not update status for BetSlip ID {bet_slip_id}.")
             print(f"  Receipt: {receipt}")
+            record_slip_outcome("sell", "StatusUpdateFailed")
 
     except Exception as e:
         print(f"🚨 Error updating bet slip status to closed: {e}")
+        record_slip_outcome("sell", "StatusUpdateFailed")
 
 
 async def log_loop(poll_interval):
@@ -794,25 +974,30 @@ async def log_loop(poll_interval):
 
     while True:
         current_block = w3.eth.block_number
+        CHAIN_HEAD_LAG_BLOCKS.set(current_block - last_processed_block)
 
         if current_block > last_processed_block:
             try:
-                # Get logs for BetSlipCreated events
-                bet_slip_created_logs = contract.events.BetSlipCreated.get_logs(
-                    from_block=last_processed_block + 1, to_block=current_block
-                )
-
-                # Get logs for BetSlipSellingStateUpdate events
-                bet_slip_selling_logs = contract.events.BetSlipSellingStateUpdate.get_logs(
-                    from_block=last_processed_block + 1, to_block=current_block
-                )
+                with span("event_fetch", from_block=last_processed_block + 1, to_block=current_block) as s:
+                    # Get logs for BetSlipCreated events
+                    bet_slip_created_logs = contract.events.BetSlipCreated.get_logs(
+                        from_block=last_processed_block + 1, to_block=current_block
+                    )
+
+                    # Get logs for BetSlipSellingStateUpdate events
+                    bet_slip_selling_logs = contract.events.BetSlipSellingStateUpdate.get_logs(
+                        from_block=last_processed_block + 1, to_block=current_block
+                    )
+                    s.set("events", len(bet_slip_created_logs) + len(bet_slip_selling_logs))
 
                 # Process BetSlipCreated events
                 for log in bet_slip_created_logs:
+                    EVENT_LAG_BLOCKS.observe(current_block - log["blockNumber"])
                     handle_bet_slip_created_event(log)
 
                 # Process BetSlipSellingStateUpdate events
                 for log in bet_slip_selling_logs:
+                    EVENT_LAG_BLOCKS.observe(current_block - log["blockNumber"])
                     handle_bet_slip_selling_state_update_event(log)
 
                 last_processed_block = current_block
@@ -833,6 +1018,14 @@ async def main():
     print(f"Using RPC URL: {SAPPHIRETESTNET_RPC_URL}")
     print("Press Ctrl+C to stop.")
 
+    if w3 is None:
+        init_web3()
+
+    add_span_listener(record_span)
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
+        print(f"📈 Serving metrics on :{METRICS_PORT}/metrics")
+
     # Start the event listener
     try:
         await log_loop(poll_interval=2)
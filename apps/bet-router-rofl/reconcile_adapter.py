@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Bet Router ROFL - Adapter Reconciliation
+
+Replays recorded adapter trades through lmsr_fixed_point and lmsr_calculator
+and checks that the fixed-point quote matches what the adapter returned
+(sharesMinted / collateralReceived) to the base unit. Exits non-zero on any
+mismatch, so it can gate changes to the LMSR engines.
+
+RECORDINGS:
+- Run the router with ADAPTER_RECORDING_PATH=/path/trades.jsonl against the
+  live adapter; every filled buy is appended with the pool snapshot it was
+  quoted against
+
+USAGE:
+    python reconcile_adapter.py trades.jsonl
+"""
+
+import argparse
+import sys
+
+from bet_execution.adapter_reconciliation import load_recorded_trades, reconcile_trades
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile LMSR quotes against recorded adapter trades")
+    parser.add_argument("recording", help="JSON-lines trade recording to replay")
+    args = parser.parse_args()
+
+    trades = load_recorded_trades(args.recording)
+    if isinstance(trades, Exception):
+        print(f"❌ {trades}", file=sys.stderr)
+        sys.exit(2)
+
+    report = reconcile_trades(trades)
+    print(report)
+    sys.exit(0 if report.exact else 1)
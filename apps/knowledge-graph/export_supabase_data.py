@@ -1,15 +1,80 @@
 #!/usr/bin/env python3
 """
-Script to export Supabase tables to CSV files
+Script to export Supabase tables to CSV, gzip NDJSON or Parquet files
 Exports: external_markets, marketplaces, markets
+
+NDJSON and Parquet follow the explicit TABLE_SCHEMAS below (typed columns,
+a <table>.schema.json sidecar), so consumers can read only the columns they
+need; Parquet requires pyarrow.
+
+Usage:
+    python export_supabase_data.py                    # full CSV export
+    python export_supabase_data.py --incremental      # only new/changed rows since the last run
+    python export_supabase_data.py --incremental --full-every 6   # ...with a full export at least every 6 hours
+    python export_supabase_data.py --format parquet   # or --format ndjson
 """
 
 import os
+import ast
 import csv
 import sys
+import gzip
+import json
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from supabase import create_client, Client
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Column types of the exported tables (json columns are written as JSON text)
+TABLE_SCHEMAS = {
+    'external_markets': [
+        ('id', 'int64'),
+        ('question', 'string'),
+        ('price_lookup_params', 'json'),
+        ('price_lookup_method', 'string'),
+        ('parent_market', 'int64'),
+        ('url', 'string'),
+        ('marketplace_id', 'int64'),
+    ],
+    'marketplaces': [
+        ('id', 'int64'),
+        ('name', 'string'),
+        ('chain_id', 'int64'),
+        ('chain_name', 'string'),
+        ('chain_family', 'string'),
+        ('warp_router_id', 'string'),
+        ('marketplace_proxy', 'string'),
+        ('address', 'string'),
+        ('price_strategy', 'string'),
+        ('active', 'bool'),
+    ],
+    'markets': [
+        ('id', 'int64'),
+        ('common_question', 'string'),
+        ('options', 'list<string>'),
+        ('url', 'string'),
+    ],
+}
+
+ARROW_TYPES = {
+    'int64': pa.int64(),
+    'string': pa.string(),
+    'bool': pa.bool_(),
+    'json': pa.string(),
+    'list<string>': pa.list_(pa.string()),
+} if PYARROW_AVAILABLE else {}
+
+# Per-table high-water marks for --incremental, kept next to the export
+STATE_FILENAME = '.export_state.json'
+
 def load_env_vars():
     """Load environment variables from .env file"""
     env_vars = {}
@@ -44,39 +109,344 @@ def create_supabase_client(env_vars):
     
     return create_client(url, key)
 
-def export_table_to_csv(supabase: Client, table_name: str, output_dir: str = 'export'):
-    """Export a table to CSV file"""
-    print(f"Exporting {table_name}...")
+def iter_table_pages(supabase: Client, table_name: str, page_size: int = 1000, key: str = 'id', after=None, changed_since=None):
+    """
+    Yield a table's rows one page at a time using keyset pagination.
+
+    Each request asks for rows with key > the last key seen, ordered by key,
+    so every page costs the same regardless of how deep into the table it is
+    (unlike offset paging) and only one page is held in memory. With
+    changed_since=(column, value) only rows with column > value are returned.
+    """
+    while True:
+        query = supabase.table(table_name).select("*").order(key).limit(page_size)
+        if after is not None:
+            query = query.gt(key, after)
+        if changed_since is not None:
+            query = query.gt(*changed_since)
+        rows = query.execute().data or []
+        
+        if rows:
+            yield rows
+            after = rows[-1][key]
+        if len(rows) < page_size:
+            return
+
+def load_export_state(output_dir: str) -> dict:
+    """High-water marks of previous incremental exports, per table"""
+    try:
+        with open(os.path.join(output_dir, STATE_FILENAME), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_export_state(output_dir: str, state: dict):
+    state_path = os.path.join(output_dir, STATE_FILENAME)
+    with open(f"{state_path}.tmp", 'w') as f:
+        json.dump(state, f, indent=2, default=str)
+    os.replace(f"{state_path}.tmp", state_path)
+
+def coerce_value(value, column_type):
+    """Convert a Supabase value to its schema type (None stays None)"""
+    if value is None or value == '':
+        return None
+    if column_type == 'int64':
+        return int(value)
+    if column_type == 'bool':
+        return value if isinstance(value, bool) else str(value).lower() == 'true'
+    if column_type == 'json':
+        # Stored as JSON text so every format (and Parquet) has one type
+        return value if isinstance(value, str) else json.dumps(value)
+    if column_type == 'list<string>':
+        if isinstance(value, str):
+            value = ast.literal_eval(value)  # CSV round-trip of a Python list
+        return [str(item) for item in value]
+    return str(value)
+
+def table_schema(table_name: str, sample_row: dict):
+    """Explicit schema for known tables; unknown tables export every column as string"""
+    schema = TABLE_SCHEMAS.get(table_name)
+    if schema is None:
+        return [(column, 'string') for column in sample_row]
+    missing = [column for column in sample_row if column not in dict(schema)]
+    if missing:
+        print(f"⚠️ {table_name} has columns outside its export schema, skipping: {', '.join(missing)}")
+    return schema
+
+def export_schema(table_name: str, sample_row: dict, export_format: str):
+    """Columns to write: CSV keeps every column the table returns, as before"""
+    schema = table_schema(table_name, sample_row) if export_format != 'csv' else None
+    if schema is None:
+        known = dict(TABLE_SCHEMAS.get(table_name, []))
+        schema = [(column, known.get(column, 'string')) for column in sample_row]
+    return schema
+
+def read_csv_header(csv_filename: str):
+    with open(csv_filename, 'r', newline='', encoding='utf-8') as csvfile:
+        return next(csv.reader(csvfile), None)
+
+class CsvExportWriter:
+    """Original CSV output: every column, values as the client returns them"""
+    
+    def __init__(self, path: str, schema):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=[column for column, _ in schema], extrasaction='ignore')
+        
+        # Write header
+        self.writer.writeheader()
+    
+    def write(self, rows):
+        self.writer.writerows(rows)
+    
+    def close(self):
+        self.file.close()
+
+class NdjsonExportWriter:
+    """gzip-compressed NDJSON, one schema-typed object per line"""
+    
+    def __init__(self, path: str, schema):
+        self.schema = schema
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+    
+    def write(self, rows):
+        for row in rows:
+            typed = {column: coerce_value(row.get(column), column_type) for column, column_type in self.schema}
+            self.file.write(json.dumps(typed, separators=(',', ':')) + '\n')
+    
+    def close(self):
+        self.file.close()
+
+class ParquetExportWriter:
+    """Parquet (zstd) written one row group per page"""
+    
+    def __init__(self, path: str, schema):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.schema = schema
+        self.arrow_schema = pa.schema([(column, ARROW_TYPES[column_type]) for column, column_type in schema])
+        self.writer = pq.ParquetWriter(path, self.arrow_schema, compression='zstd')
+    
+    def write(self, rows):
+        typed = [
+            {column: coerce_value(row.get(column), column_type) for column, column_type in self.schema}
+            for row in rows
+        ]
+        self.writer.write_table(pa.Table.from_pylist(typed, schema=self.arrow_schema))
+    
+    def close(self):
+        self.writer.close()
+
+EXPORT_FORMATS = {
+    'csv': ('csv', CsvExportWriter),
+    'ndjson': ('ndjson.gz', NdjsonExportWriter),
+    'parquet': ('parquet', ParquetExportWriter),
+}
+
+def iter_existing_rows(path: str, export_format: str):
+    """Stream rows back out of a previous export"""
+    if export_format == 'csv':
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+    elif export_format == 'ndjson':
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+    else:
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+
+def write_schema_file(output_dir: str, table_name: str, schema, export_format: str):
+    """Sidecar <table>.schema.json describing the exported columns"""
+    with open(os.path.join(output_dir, f"{table_name}.schema.json"), 'w') as f:
+        json.dump({
+            'table': table_name,
+            'format': export_format,
+            'columns': [{'name': column, 'type': column_type} for column, column_type in schema],
+        }, f, indent=2)
+
+def export_table(supabase: Client, table_name: str, output_dir: str = 'export', page_size: int = 1000, table_state: dict = None, export_format: str = 'csv'):
+    """
+    Stream a table to an export file page by page (constant memory).
+
+    With table_state from a previous run the export is incremental: only rows
+    past the stored high-water mark are pulled and merged into the existing
+    file. The mark is `updated_at` when the table has one (new and edited
+    rows), otherwise `id` (new rows only; edits and deletes wait for the next
+    full export, see export_tables' full_every).
+
+    An empty table is not a failure: any previous export of it is removed and
+    its state records 0 rows.
+
+    Returns:
+        The table's new state ({"column", "high_water", "rows", "format",
+        "full_exported_at"}), or None on failure
+    """
+    extension, writer_class = EXPORT_FORMATS[export_format]
+    filename = os.path.join(output_dir, f"{table_name}.{extension}")
+    incremental = bool(
+        table_state and table_state.get('high_water') is not None
+        and table_state.get('format', 'csv') == export_format
+        and os.path.exists(filename)
+    )
+    if table_state and table_state.get('rows') and not incremental:
+        print(f"No usable previous {export_format} export of {table_name}, falling back to a full export")
+    print(f"Exporting {table_name} as {export_format}{' (incremental)' if incremental else ''}...")
+    
+    # Write to a temporary file so a failed export never truncates the previous one
+    tmp_filename = f"{filename}.tmp"
+    column = table_state.get('column', 'id') if incremental else None
+    high_water = table_state.get('high_water') if incremental else None
+    writer = None
     
     try:
-        # Fetch all data from the table
-        response = supabase.table(table_name).select("*").execute()
+        if incremental:
+            if column == 'id':
+                print(f"⚠️ {table_name} has no updated_at; only new rows are picked up until the next full export")
+            pages = iter_table_pages(
+                supabase, table_name, page_size,
+                after=high_water if column == 'id' else None,
+                changed_since=(column, high_water) if column != 'id' else None
+            )
+            # Changed rows are few; buffer them so existing copies can be dropped
+            changed = [row for page in pages for row in page]
+            if not changed:
+                print(f"✓ {table_name} is up to date")
+                return table_state
+            schema = export_schema(table_name, changed[0], export_format)
+            if export_format == 'csv' and [name for name, _ in schema] != read_csv_header(filename):
+                print(f"Columns of {table_name} changed, running a full export")
+                return export_table(supabase, table_name, output_dir, page_size, None, export_format)
+            
+            changed_ids = {str(row['id']) for row in changed}
+            writer = writer_class(tmp_filename, schema)
+            kept = 0
+            page = []
+            for row in iter_existing_rows(filename, export_format):
+                if str(row['id']) not in changed_ids:
+                    page.append(row)
+                    kept += 1
+                if len(page) >= page_size:
+                    writer.write(page)
+                    page = []
+            writer.write(page + changed)
+            writer.close()
+            writer = None
+            
+            os.replace(tmp_filename, filename)
+            row_count = kept + len(changed)
+            high_water = max(row[column] for row in changed)
+            print(f"✓ Merged {len(changed)} new/changed rows into {filename} ({row_count} rows)")
+            return {
+                'column': column,
+                'high_water': high_water,
+                'rows': row_count,
+                'format': export_format,
+                'full_exported_at': table_state.get('full_exported_at'),
+            }
         
-        if not response.data:
-            print(f"No data found in {table_name}")
-            return
+        row_count = 0
+        for page in iter_table_pages(supabase, table_name, page_size):
+            if writer is None:
+                schema = export_schema(table_name, page[0], export_format)
+                writer = writer_class(tmp_filename, schema)
+                column = 'updated_at' if 'updated_at' in page[0] else 'id'
+            
+            # Write data
+            writer.write(page)
+            row_count += len(page)
+            page_high = max((row[column] for row in page if row.get(column) is not None), default=None)
+            if page_high is not None and (high_water is None or page_high > high_water):
+                high_water = page_high
         
-        # Create CSV file
-        csv_filename = os.path.join(output_dir, f"{table_name}.csv")
+        full_exported_at = datetime.now().isoformat()
+        if not row_count:
+            print(f"No data found in {table_name}")
+            # Don't leave a stale export of rows that are gone behind
+            for stale in (filename, os.path.join(output_dir, f"{table_name}.schema.json")):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            return {'column': 'id', 'high_water': None, 'rows': 0, 'format': export_format, 'full_exported_at': full_exported_at}
         
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            if response.data:
-                fieldnames = response.data[0].keys()
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                # Write header
-                writer.writeheader()
-                
-                # Write data
-                writer.writerows(response.data)
-                
-        print(f"✓ Exported {len(response.data)} rows to {csv_filename}")
+        writer.close()
+        writer = None
+        os.replace(tmp_filename, filename)
+        if export_format != 'csv':
+            write_schema_file(output_dir, table_name, schema, export_format)
+        print(f"✓ Exported {row_count} rows to {filename}")
+        return {'column': column, 'high_water': high_water, 'rows': row_count, 'format': export_format, 'full_exported_at': full_exported_at}
         
     except Exception as e:
         print(f"Error exporting {table_name}: {str(e)}")
+        return None
+    finally:
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+def is_full_export_due(table_state: dict, full_every: float = None) -> bool:
+    """Whether an incremental table is past its full-export age (full_every in hours)"""
+    if full_every is None or not table_state:
+        return False
+    last_full = table_state.get('full_exported_at')
+    if last_full is None:
+        return True
+    return (datetime.now() - datetime.fromisoformat(last_full)).total_seconds() >= full_every * 3600
+
+def export_tables(supabase: Client, tables, output_dir: str = 'export', incremental: bool = False, workers: int = 4, page_size: int = 1000, export_format: str = 'csv', full_every: float = None) -> bool:
+    """
+    Export tables concurrently, recording each table's high-water mark.
+
+    With full_every (hours), an incremental run re-exports a table in full
+    once its last full export is that old, so edited and deleted rows of
+    tables without updated_at are eventually picked up.
+
+    Returns:
+        True if every table exported successfully
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    state = load_export_state(output_dir)
+    state_lock = threading.Lock()
+    failures = []
+    
+    def export_one(table_name):
+        table_state = state.get(table_name) if incremental else None
+        if is_full_export_due(table_state, full_every):
+            print(f"Last full export of {table_name} is older than {full_every:g}h, running a full export")
+            table_state = None
+        result = export_table(supabase, table_name, output_dir, page_size, table_state, export_format)
+        with state_lock:
+            if result is None:
+                failures.append(table_name)
+                return
+            state[table_name] = {**result, 'exported_at': datetime.now().isoformat()}
+            save_export_state(output_dir, state)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tables)))) as pool:
+        list(pool.map(export_one, tables))
+    
+    if failures:
+        print(f"✗ Failed to export: {', '.join(failures)}")
+    return not failures
 
 def main():
     """Main function to export all tables"""
+    parser = argparse.ArgumentParser(description="Export Supabase tables for the knowledge graph")
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv', help="csv, gzip NDJSON or Parquet (needs pyarrow)")
+    parser.add_argument('--incremental', action='store_true', help="Only pull rows past the last export's high-water mark")
+    parser.add_argument('--full-every', type=float, default=24.0, help="With --incremental, re-export a table in full once its last full export is this many hours old")
+    parser.add_argument('--workers', type=int, default=4, help="Tables exported concurrently")
+    parser.add_argument('--page-size', type=int, default=1000, help="Rows per request")
+    parser.add_argument('--output-dir', default='export', help="Export directory")
+    args = parser.parse_args()
+    
+    if args.format == 'parquet' and not PYARROW_AVAILABLE:
+        print("Error: --format parquet requires pyarrow (pip install pyarrow)")
+        sys.exit(1)
+    
     print("Starting Supabase data export...")
     print(f"Timestamp: {datetime.now().isoformat()}")
     
@@ -93,12 +463,11 @@ def main():
         'markets'
     ]
     
-    # Export each table
-    for table in tables:
-        export_table_to_csv(supabase, table)
+    if not export_tables(supabase, tables, args.output_dir, args.incremental, args.workers, args.page_size, args.format, args.full_every):
+        sys.exit(1)
     
     print("\n✓ Export completed successfully!")
-    print(f"CSV files saved in 'export/' directory")
+    print(f"{args.format.upper()} files saved in '{args.output_dir}/' directory")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()